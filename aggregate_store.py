@@ -0,0 +1,174 @@
+"""
+Append-only Aggregate Store
+====================================
+Persists the running counts, sums and co-moments behind every statistic the
+reports use, so a daily data drop costs O(new rows) instead of a full rescan:
+
+- per-Occupation sums, Occupation × Gender stress, stress-group weekday /
+  weekend screen time, high/low stress profile, Stress_Level histogram
+  (aggregates.AggregateSums)
+- shifted moments and pairwise cross-products of the numeric columns for the
+  correlation matrix (streaming.MomentAccumulator)
+
+For each ingested CSV the store remembers the byte offset it has read up to,
+so re-ingesting an append-only file folds in only the rows added since.
+
+Run:
+    python aggregate_store.py ingest data.csv [more.csv ...] [--store PATH]
+    python aggregate_store.py show [--store PATH]
+    python smartphone_analysis.py --store PATH     # render from the store
+"""
+
+import argparse
+import hashlib
+import io
+import os
+import pickle
+
+import pandas as pd
+
+from aggregates import GENDERS, OCCS, AggregateSums, aggregate_sums
+from loader import NUMERIC_COLUMNS, SCHEMA
+from streaming import DEFAULT_CHUNKSIZE, MomentAccumulator
+
+DEFAULT_STORE = "aggregate_store.pkl"
+_TAIL_BYTES   = 4096         # bytes before the offset used to detect rewrites
+
+
+class _ByteRange(io.RawIOBase):
+    """Read-only view of f[start:end] so a parse never runs past a partial line."""
+
+    def __init__(self, f, start, end):
+        self.f, self.end = f, end
+        self.f.seek(start)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buf):
+        n = min(len(buf), self.end - self.f.tell())
+        if n <= 0:
+            return 0
+        data = self.f.read(n)
+        buf[:len(data)] = data
+        return len(data)
+
+
+def _tail_hash(f, offset):
+    f.seek(max(offset - _TAIL_BYTES, 0))
+    return hashlib.blake2b(f.read(min(offset, _TAIL_BYTES)), digest_size=12).hexdigest()
+
+
+def _complete_end(f, size):
+    """Offset just past the last newline — rows still being written are left for later."""
+    pos = size
+    while pos > 0:
+        step = min(pos, 1 << 16)
+        f.seek(pos - step)
+        block = f.read(step)
+        nl = block.rfind(b"\n")
+        if nl >= 0:
+            return pos - step + nl + 1
+        pos -= step
+    return 0
+
+
+class AggregateStore:
+    def __init__(self, occs=OCCS, genders=GENDERS):
+        self.sums = AggregateSums(occs=list(occs), genders=list(genders))
+        self.moments = MomentAccumulator(NUMERIC_COLUMNS)
+        self.sources = {}     # abs path -> {"offset", "rows", "tail"}
+
+    # Persistence ─────────────────────────────────────────────────────────
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+        store = cls(state["sums"].occs, state["sums"].genders)
+        store.sums, store.moments, store.sources = state["sums"], state["moments"], state["sources"]
+        return store
+
+    @classmethod
+    def load_or_create(cls, path, occs=OCCS, genders=GENDERS):
+        return cls.load(path) if os.path.exists(path) else cls(occs, genders)
+
+    def save(self, path):
+        state = {"sums": self.sums, "moments": self.moments, "sources": self.sources}
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    # Ingest ──────────────────────────────────────────────────────────────
+    def fold(self, df):
+        """Fold an in-memory frame of new rows into the store."""
+        self.sums.merge(aggregate_sums(df, self.sums.occs, self.sums.genders))
+        self.moments.update(df)
+        return len(df)
+
+    def ingest(self, csv_path, chunksize=DEFAULT_CHUNKSIZE):
+        """Fold rows of `csv_path` not seen by a previous ingest; returns rows added."""
+        key = os.path.abspath(csv_path)
+        seen = self.sources.get(key)
+        added = 0
+        with open(key, "rb") as f:
+            header = f.readline()
+            columns = header.decode().strip().split(",")
+            size = os.fstat(f.fileno()).st_size
+            if seen is None:
+                start = len(header)
+            else:
+                start = seen["offset"]
+                if size < start or _tail_hash(f, start) != seen["tail"]:
+                    raise ValueError(f"{csv_path} was rewritten since the last ingest; "
+                                     f"rebuild the store")
+            end = max(_complete_end(f, size), start)
+            if end > start:
+                reader = io.BufferedReader(_ByteRange(f, start, end))
+                dtype = {c: t for c, t in SCHEMA.items() if c in columns}
+                for chunk in pd.read_csv(reader, names=columns, header=None,
+                                         dtype=dtype, chunksize=chunksize):
+                    added += self.fold(chunk)
+            self.sources[key] = {
+                "offset": end,
+                "rows": (seen["rows"] if seen else 0) + added,
+                "tail": _tail_hash(f, end),
+            }
+        return added
+
+    # Results ─────────────────────────────────────────────────────────────
+    def report_aggregates(self, names=None):
+        return self.sums.finalize(names)
+
+    def corr(self):
+        return self.moments.corr()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Append-only aggregate store.")
+    parser.add_argument("--store", default=DEFAULT_STORE, help="store file")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_ingest = sub.add_parser("ingest", help="fold new rows of CSV files into the store")
+    p_ingest.add_argument("csv_paths", nargs="+")
+    p_ingest.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    sub.add_parser("show", help="print the stored summaries")
+    args = parser.parse_args(argv)
+
+    store = AggregateStore.load_or_create(args.store)
+    if args.command == "ingest":
+        for csv_path in args.csv_paths:
+            added = store.ingest(csv_path, chunksize=args.chunksize)
+            print(f"{csv_path}: +{added} rows")
+        store.save(args.store)
+        print(f"Store {args.store}: {store.sums.n_rows} rows total")
+    else:
+        agg = store.report_aggregates()
+        print(f"{agg.n_rows} rows from {len(store.sources)} source(s)")
+        for name, value in vars(agg).items():
+            if name != "n_rows":
+                print(f"\n{name}:\n{value}")
+        print(f"\ncorrelation:\n{store.corr().round(3)}")
+
+
+if __name__ == "__main__":
+    main()
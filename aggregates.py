@@ -0,0 +1,417 @@
+"""
+Single-pass Report Aggregation
+====================================
+Computes every summary the smartphone report needs from one factorize pass
+over the grouping columns, followed by one weighted bincount sweep per metric.
+Replaces the separate groupby / boolean-mask calls that each re-hashed and
+re-scanned the whole frame.
+
+Usage:
+    from aggregates import compute_aggregates
+    agg = compute_aggregates(df)
+    agg.phone_occ, agg.stress_gender, agg.high_s, ...
+
+    from aggregates import bucketed_profile
+    bucketed_profile(df, "Age", AGE_BINS, ["Stress_Level", "Sleep_Hours"], AGE_BANDS)
+
+High- vs low-stress habits are also kept as per-cohort value counts, from
+which cohort_test (cohorts.compare_counts: effect sizes, Welch tests,
+bootstrap intervals) is computed with a fixed seed.
+
+Per-respondent distributions (usage_density, phone_hist) are binned here on
+fixed edges (DENSITY_X / DENSITY_Y), so the report draws a fixed number of
+cells however many rows there are, and chunk / store sums simply add up.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from cohorts import compare_counts, grouped_value_counts, merge_counts
+from profiling import stage
+
+# ── Config ──────────────────────────────────────────────────────────────────
+OCCS    = ["Business Owner", "Freelancer", "Professional", "Student"]
+GENDERS = ["Female", "Male", "Other"]
+DEVICE_TYPES = ["Android", "iOS"]
+
+STRESS_BINS   = [0, 3, 6, 10]
+STRESS_GROUPS = ["Low (1–3)", "Medium (4–6)", "High (7–10)"]
+
+# right-closed like STRESS_BINS; the open ends keep every age in some band
+AGE_BINS  = [-np.inf, 25, 35, 50, 65, np.inf]
+AGE_BANDS = ["≤25", "26–35", "36–50", "51–65", "66+"]
+
+OCC_METRICS = {
+    "phone_occ":  "Daily_Phone_Hours",
+    "stress_occ": "Stress_Level",
+    "social_occ": "Social_Media_Hours",
+    "caff_occ":   "Caffeine_Intake_Cups",
+    "sleep_occ":  "Sleep_Hours",
+}
+PROFILE_COLS = ["Daily_Phone_Hours", "Social_Media_Hours",
+                "Sleep_Hours", "Caffeine_Intake_Cups"]
+OVERALL_COLS = list(OCC_METRICS.values())
+
+# (column, low edge, high edge, bins) of the 2-D usage histogram; values
+# outside the edges land in the first / last bin. Hours are recorded in
+# 0.1 h steps: 0.2 h bins whose edges fall halfway between two steps keep
+# every bin at two recorded values (no aliasing stripes).
+DENSITY_X = ("Daily_Phone_Hours", -0.05, 15.95, 80)
+DENSITY_Y = ("Social_Media_Hours", -0.05, 11.95, 60)
+
+# Bootstrap resamples behind the report's cohort_test (one seeded block);
+# cohorts.py runs as many as wanted for a stand-alone analysis
+REPORT_BOOT = 500
+
+# Input columns behind each aggregate (drives the incremental report cache)
+AGGREGATE_INPUTS = {
+    **{name: ["Occupation", col] for name, col in OCC_METRICS.items()},
+    "occ_counts":    ["Occupation"],
+    "stress_dist":   ["Stress_Level"],
+    "stress_gender": ["Occupation", "Gender", "Stress_Level"],
+    "wknd_stress":   ["Stress_Level", "Weekend_Screen_Time_Hours"],
+    "wkdy_stress":   ["Stress_Level", "Daily_Phone_Hours"],
+    "high_s":        ["Stress_Level"] + PROFILE_COLS,
+    "low_s":         ["Stress_Level"] + PROFILE_COLS,
+    "cohort_test":   ["Stress_Level"] + PROFILE_COLS,
+    "overall":       OVERALL_COLS,
+    "usage_density": [DENSITY_X[0], DENSITY_Y[0]],
+    "phone_hist":    ["Stress_Level", DENSITY_X[0]],
+}
+
+
+# ── Result object ─────────────────────────────────────────────────────────
+@dataclass
+class ReportAggregates:
+    """Report summaries; fields not requested from compute_aggregates stay None."""
+    n_rows: int
+    phone_occ: Optional[pd.Series] = None
+    stress_occ: Optional[pd.Series] = None
+    social_occ: Optional[pd.Series] = None
+    caff_occ: Optional[pd.Series] = None
+    sleep_occ: Optional[pd.Series] = None
+    occ_counts: Optional[pd.Series] = None
+    stress_dist: Optional[pd.Series] = None
+    stress_gender: Optional[pd.DataFrame] = None
+    wknd_stress: Optional[pd.Series] = None
+    wkdy_stress: Optional[pd.Series] = None
+    high_s: Optional[pd.Series] = None
+    low_s: Optional[pd.Series] = None
+    cohort_test: Optional[pd.DataFrame] = None  # PROFILE_COLS × cohorts.COLUMNS, high − low
+    overall: Optional[pd.DataFrame] = None    # OVERALL_COLS × count/mean/min/max
+    usage_density: Optional[np.ndarray] = None  # DENSITY_X bins × DENSITY_Y bins, counts
+    phone_hist: Optional[np.ndarray] = None     # STRESS_GROUPS × DENSITY_X bins, counts
+
+
+# ── Low-level kernels ─────────────────────────────────────────────────────
+def factorize(values, categories):
+    """Map values onto the positions of `categories`; unknown / missing -> -1."""
+    return pd.Categorical(values, categories=categories).codes.astype(np.int64)
+
+
+def bucket_codes(values, bins, right=True):
+    """
+    Bucket index of each value for edges `bins`, same intervals as
+    pd.cut(values, bins, right=right); values outside the edges or NaN -> -1.
+    """
+    values = np.asarray(values)
+    edges = np.asarray(bins, dtype=np.float64)
+    codes = np.searchsorted(edges, values, side="left" if right else "right") - 1
+    codes[(codes < 0) | (codes >= len(edges) - 1)] = -1
+    return codes
+
+
+def stress_codes(stress, bins=STRESS_BINS):
+    """Right-closed bucket codes matching pd.cut(stress, bins); outside -> -1."""
+    return bucket_codes(stress, bins)
+
+
+def bin_codes(values, spec):
+    """
+    Fixed-width bin of each value for spec (column, lo, hi, bins); values
+    outside [lo, hi) are clipped into the end bins, NaN -> -1.
+    """
+    _, lo, hi, bins = spec
+    values = np.asarray(values, dtype=np.float64)
+    codes = np.floor((values - lo) * (bins / (hi - lo)))
+    np.clip(codes, 0, bins - 1, out=codes)
+    return np.where(np.isnan(values), -1, codes).astype(np.int64)
+
+
+def binned_counts(codes, n_groups):
+    """np.bincount of the codes >= 0, always `n_groups` long."""
+    codes = np.asarray(codes)
+    return np.bincount(np.where(codes >= 0, codes, n_groups),
+                       minlength=n_groups + 1)[:n_groups].astype(np.float64)
+
+
+def grouped_sums(codes, n_groups, columns):
+    """
+    Per-group non-null counts and sums for each column in one bincount sweep.
+    Rows with code -1 or a NaN value are skipped, matching pandas' mean().
+    Skipped rows are routed to a spill bin rather than masked out, so no
+    filtered copies of the columns are made.
+    Returns (counts, sums), both shaped (n_groups, len(columns)).
+    """
+    codes = np.asarray(codes)
+    safe = np.where(codes >= 0, codes, n_groups)
+    rows = None
+    counts = np.zeros((n_groups, len(columns)))
+    sums = np.zeros((n_groups, len(columns)))
+    for j, col in enumerate(columns):
+        vals = np.asarray(col, dtype=np.float64)
+        nan = np.isnan(vals)
+        if nan.any():
+            counts[:, j] = np.bincount(safe, weights=~nan, minlength=n_groups + 1)[:n_groups]
+            vals = np.where(nan, 0.0, vals)
+        else:
+            if rows is None:
+                rows = np.bincount(safe, minlength=n_groups + 1)[:n_groups]
+            counts[:, j] = rows
+        sums[:, j] = np.bincount(safe, weights=vals, minlength=n_groups + 1)[:n_groups]
+    return counts, sums
+
+
+def _means(counts, sums):
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+
+# ── Mergeable sums ────────────────────────────────────────────────────────
+@dataclass
+class AggregateSums:
+    """
+    Raw counts and sums behind ReportAggregates. Sums built on disjoint row
+    sets merge by addition, so they can be accumulated chunk by chunk or
+    persisted and topped up with new rows (see aggregate_store.py).
+    Parts not requested from aggregate_sums stay None.
+    """
+    occs: list
+    genders: list
+    n_rows: int = 0
+    occ_rows: Optional[np.ndarray] = None     # (occ,)            row counts
+    occ_cnt: Optional[np.ndarray] = None      # (occ, metric)     OCC_METRICS
+    occ_tot: Optional[np.ndarray] = None
+    pair_cnt: Optional[np.ndarray] = None     # (occ × gender, 1) Stress_Level
+    pair_tot: Optional[np.ndarray] = None
+    wk_cnt: Optional[np.ndarray] = None       # (stress group, 2) weekday, weekend
+    wk_tot: Optional[np.ndarray] = None
+    cohort_cnt: Optional[np.ndarray] = None   # (low/high, PROFILE_COLS)
+    cohort_tot: Optional[np.ndarray] = None
+    stress_hist: Optional[pd.Series] = None   # Stress_Level -> count
+    cohort_vals: Optional[list] = None        # [low, high] -> PROFILE_COLS value counts
+    dens_cnt: Optional[np.ndarray] = None     # (DENSITY_X bins, DENSITY_Y bins)
+    hist_cnt: Optional[np.ndarray] = None     # (stress group, DENSITY_X bins)
+    col_cnt: Optional[np.ndarray] = None      # (OVERALL_COLS,)   all rows
+    col_tot: Optional[np.ndarray] = None
+    col_min: Optional[np.ndarray] = None
+    col_max: Optional[np.ndarray] = None
+
+    def merge(self, other):
+        if (self.occs, self.genders) != (other.occs, other.genders):
+            raise ValueError("cannot merge sums built for different categories")
+        self.n_rows += other.n_rows
+        for name in ("occ_rows", "occ_cnt", "occ_tot", "pair_cnt", "pair_tot",
+                     "wk_cnt", "wk_tot", "cohort_cnt", "cohort_tot", "col_cnt", "col_tot",
+                     "col_min", "col_max", "dens_cnt", "hist_cnt"):
+            mine, theirs = getattr(self, name), getattr(other, name)
+            if theirs is None:
+                continue
+            if mine is None:
+                setattr(self, name, theirs.copy())
+            elif name == "col_min":
+                self.col_min = np.fmin(mine, theirs)
+            elif name == "col_max":
+                self.col_max = np.fmax(mine, theirs)
+            else:
+                setattr(self, name, mine + theirs)
+        if other.cohort_vals is not None:
+            self.cohort_vals = (other.cohort_vals if self.cohort_vals is None else
+                                [[merge_counts(m, t) for m, t in zip(mine, theirs)]
+                                 for mine, theirs in zip(self.cohort_vals, other.cohort_vals)])
+        if other.stress_hist is not None:
+            self.stress_hist = (other.stress_hist.copy() if self.stress_hist is None
+                                else self.stress_hist.add(other.stress_hist, fill_value=0)
+                                                     .astype(np.int64))
+        return self
+
+    def finalize(self, names=None):
+        """Turn the sums into the ReportAggregates the report renders."""
+        wanted = set(AGGREGATE_INPUTS if names is None else names)
+        out = {}
+        occ_index = pd.Index(self.occs, name="Occupation")
+
+        if self.occ_cnt is not None:
+            occ_means = _means(self.occ_cnt, self.occ_tot)
+            for j, (name, col) in enumerate(OCC_METRICS.items()):
+                out[name] = pd.Series(occ_means[:, j], index=occ_index, name=col)
+        if self.occ_rows is not None:
+            out["occ_counts"] = pd.Series(self.occ_rows.astype(np.int64),
+                                          index=occ_index, name="count")
+        if self.pair_cnt is not None:
+            out["stress_gender"] = pd.DataFrame(
+                _means(self.pair_cnt, self.pair_tot).reshape(len(self.occs), len(self.genders)),
+                index=occ_index, columns=pd.Index(self.genders, name="Gender"))
+        if self.wk_cnt is not None:
+            wk_means = _means(self.wk_cnt, self.wk_tot)
+            sg_index = pd.Index(STRESS_GROUPS, name="stress_group")
+            out["wkdy_stress"] = pd.Series(wk_means[:, 0], index=sg_index, name="Daily_Phone_Hours")
+            out["wknd_stress"] = pd.Series(wk_means[:, 1], index=sg_index,
+                                           name="Weekend_Screen_Time_Hours")
+        if self.cohort_cnt is not None:
+            prof = _means(self.cohort_cnt, self.cohort_tot)
+            out["low_s"] = pd.Series(prof[0], index=PROFILE_COLS)
+            out["high_s"] = pd.Series(prof[1], index=PROFILE_COLS)
+        if self.cohort_vals is not None and "cohort_test" in wanted:
+            low, high = self.cohort_vals
+            out["cohort_test"] = compare_counts(high, low, PROFILE_COLS, n_boot=REPORT_BOOT,
+                                                labels=("High (7–10)", "Low (1–3)"))
+        if self.stress_hist is not None:
+            out["stress_dist"] = self.stress_hist.sort_index()
+        if self.col_cnt is not None:
+            out["overall"] = pd.DataFrame(
+                {"count": self.col_cnt, "mean": _means(self.col_cnt, self.col_tot),
+                 "min": self.col_min, "max": self.col_max},
+                index=pd.Index(OVERALL_COLS, name="metric"))
+        if self.dens_cnt is not None:
+            out["usage_density"] = self.dens_cnt.astype(np.int64)
+        if self.hist_cnt is not None:
+            out["phone_hist"] = self.hist_cnt.astype(np.int64)
+
+        return ReportAggregates(n_rows=self.n_rows,
+                                **{k: v for k, v in out.items() if k in wanted})
+
+
+def aggregate_sums(df, occs=OCCS, genders=GENDERS, names=None):
+    """
+    One factorize pass per grouping key plus one bincount sweep per metric.
+    `names` limits the work to the parts feeding those AGGREGATE_INPUTS entries.
+    """
+    wanted = set(AGGREGATE_INPUTS if names is None else names)
+    sums = AggregateSums(occs=list(occs), genders=list(genders), n_rows=len(df))
+
+    columns = {}                            # each column converted to float64 once
+
+    def col(name):
+        if name not in columns:
+            columns[name] = df[name].to_numpy(dtype=np.float64)
+        return columns[name]
+
+    occ = stress = None
+    with stage("aggregate:factorize"):
+        if wanted & (set(OCC_METRICS) | {"occ_counts", "stress_gender"}):
+            occ = factorize(df["Occupation"], occs)
+        if wanted - set(OCC_METRICS) - {"occ_counts"}:
+            stress = col("Stress_Level")
+
+    # Occupation: metric sums + row counts
+    if wanted & set(OCC_METRICS):
+        with stage("aggregate:occ_means"):
+            sums.occ_cnt, sums.occ_tot = grouped_sums(
+                occ, len(occs), [col(c) for c in OCC_METRICS.values()])
+    if "occ_counts" in wanted:
+        with stage("aggregate:occ_counts"):
+            sums.occ_rows = np.bincount(occ[occ >= 0], minlength=len(occs)).astype(np.float64)
+
+    # Occupation × Gender stress
+    if "stress_gender" in wanted:
+        with stage("aggregate:stress_gender"):
+            gen = factorize(df["Gender"], genders)
+            pair = np.where((occ >= 0) & (gen >= 0), occ * len(genders) + gen, -1)
+            sums.pair_cnt, sums.pair_tot = grouped_sums(pair, len(occs) * len(genders), [stress])
+
+    # Stress group: weekday vs weekend screen time
+    if wanted & {"wkdy_stress", "wknd_stress"}:
+        with stage("aggregate:wkdy_stress/wknd_stress"):
+            sums.wk_cnt, sums.wk_tot = grouped_sums(
+                stress_codes(stress), len(STRESS_GROUPS),
+                [col("Daily_Phone_Hours"), col("Weekend_Screen_Time_Hours")])
+
+    # High (>= 7) vs low (<= 3) stress habit profile
+    if wanted & {"high_s", "low_s", "cohort_test"}:
+        cohort = np.full(len(stress), -1, dtype=np.int64)
+        cohort[stress <= 3] = 0
+        cohort[stress >= 7] = 1
+    if wanted & {"high_s", "low_s"}:
+        with stage("aggregate:high_s/low_s"):
+            sums.cohort_cnt, sums.cohort_tot = grouped_sums(
+                cohort, 2, [col(c) for c in PROFILE_COLS])
+    if "cohort_test" in wanted:
+        with stage("aggregate:cohort_test"):
+            per_column = [grouped_value_counts(cohort, 2, col(c)) for c in PROFILE_COLS]
+            sums.cohort_vals = [list(counts) for counts in zip(*per_column)]   # [low, high]
+
+    # Stress level histogram (value_counts().sort_index())
+    if "stress_dist" in wanted:
+        with stage("aggregate:stress_dist"):
+            levels, counts = np.unique(stress[~np.isnan(stress)], return_counts=True)
+            if np.all(levels == np.round(levels)):
+                levels = levels.astype(np.int64)
+            sums.stress_hist = pd.Series(counts, index=pd.Index(levels, name="Stress_Level"),
+                                         name="count")
+
+    # Whole-dataset count / mean / range of the headline metrics
+    if "overall" in wanted:
+        with stage("aggregate:overall"):
+            cnt, tot, lo, hi = [], [], [], []
+            for c in OVERALL_COLS:
+                vals = col(c)
+                cnt.append(np.count_nonzero(~np.isnan(vals)))
+                tot.append(np.nansum(vals))
+                lo.append(np.nanmin(vals) if cnt[-1] else np.nan)
+                hi.append(np.nanmax(vals) if cnt[-1] else np.nan)
+            sums.col_cnt, sums.col_tot = np.array(cnt, dtype=np.float64), np.array(tot)
+            sums.col_min, sums.col_max = np.array(lo), np.array(hi)
+
+    # Per-respondent distributions on fixed bins
+    if wanted & {"usage_density", "phone_hist"}:
+        with stage("aggregate:usage_density/phone_hist"):
+            x = bin_codes(col(DENSITY_X[0]), DENSITY_X)
+            nx, ny = DENSITY_X[3], DENSITY_Y[3]
+            if "usage_density" in wanted:
+                y = bin_codes(col(DENSITY_Y[0]), DENSITY_Y)
+                cell = np.where((x >= 0) & (y >= 0), x * ny + y, -1)
+                sums.dens_cnt = binned_counts(cell, nx * ny).reshape(nx, ny)
+            if "phone_hist" in wanted:
+                sg = stress_codes(stress)
+                cell = np.where((x >= 0) & (sg >= 0), sg * nx + x, -1)
+                sums.hist_cnt = binned_counts(cell, len(STRESS_GROUPS) * nx).reshape(-1, nx)
+    return sums
+
+
+# ── Public API ────────────────────────────────────────────────────────────
+def compute_aggregates(df, occs=OCCS, genders=GENDERS, names=None):
+    """
+    Build report summaries from `df` in a single pass per grouping key.
+    `names` limits the work to a subset of AGGREGATE_INPUTS (all when None).
+    """
+    return aggregate_sums(df, occs, genders, names).finalize(names)
+
+
+def bucket_labels(bins, right=True):
+    """pd.cut-style interval labels, e.g. '(0, 3]'."""
+    lo, hi = ("(", "]") if right else ("[", ")")
+    return [f"{lo}{a:g}, {b:g}{hi}" for a, b in zip(bins[:-1], bins[1:])]
+
+
+def bucketed_profile(data, by, bins, metrics, labels=None, right=True):
+    """
+    Per-bucket means of `metrics`, with rows bucketed on column `by` at edges
+    `bins` (pd.cut semantics). Works for any bucket scheme, e.g. stress
+    [0, 3, 6, 10] or age AGE_BINS (labels AGE_BANDS).
+
+    `data` is a DataFrame or any mapping of column name -> array; columns
+    are reduced straight from their arrays with one bincount per metric and
+    no filtered frame copies. Returns a DataFrame indexed by bucket with one
+    column per metric plus the bucket's row count.
+    """
+    codes = bucket_codes(data[by], bins, right)
+    n = len(bins) - 1
+    cnt, tot = grouped_sums(codes, n, [data[m] for m in metrics])
+    out = pd.DataFrame(_means(cnt, tot), columns=list(metrics),
+                       index=pd.Index(labels or bucket_labels(bins, right), name=by))
+    out["count"] = np.bincount(codes[codes >= 0], minlength=n).astype(np.int64)
+    return out
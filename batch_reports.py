@@ -0,0 +1,173 @@
+"""
+Batch Report Runner
+====================================
+Fans smartphone_analysis.py out over many datasets and/or segments of a
+dataset on one bounded process pool, instead of one interpreter per report.
+
+- Each CSV is loaded once as a compact dataset and aggregated, in a worker;
+  with --by it is split into segments there and every segment's aggregates come from that
+  single parse.
+- Every (file, segment) report is then rendered as its own pool job, so
+  parsing of later files overlaps rendering of earlier ones.
+- A failing file or report is logged and skipped; the rest still finish,
+  and the exit status is non-zero if anything failed.
+
+Segments: any categorical column (Device_Type, Gender, Occupation, ...) or
+"age_band" (aggregates.AGE_BINS).
+
+Run:
+    python batch_reports.py "drops/*.csv" --out-dir reports/
+    python batch_reports.py data.csv --by Device_Type --by age_band --out-dir reports/
+"""
+
+import argparse
+import glob
+import os
+import re
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from aggregates import AGE_BANDS, AGE_BINS
+
+DEFAULT_JOBS = min(8, os.cpu_count() or 1)
+
+# segment name -> (source column, bins and labels or None for a categorical column)
+SEGMENTS = {"age_band": ("Age", (AGE_BINS, AGE_BANDS))}
+
+
+def _slug(text):
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", str(text)).strip("_")
+
+
+def segments(data, by):
+    """Yield (label, sub-dataset) for each non-empty segment of a CompactDataset by `by`."""
+    from aggregates import bucket_codes
+
+    column, buckets = SEGMENTS.get(by, (by, None))
+    if column not in data:
+        raise KeyError(f"segment column {column!r} not in data")
+    if buckets is not None:
+        bins, labels = buckets
+        codes = bucket_codes(data.values(column), bins)
+    elif data.is_categorical(column):
+        codes, labels = data.codes(column), data.labels(column)
+    else:
+        codes, labels = data[column].factorize(sort=True)
+    for code, label in enumerate(labels):
+        mask = codes == code
+        if mask.any():
+            yield f"{by}={label}", data.filter(mask)
+
+
+# ── Pool jobs ─────────────────────────────────────────────────────────────
+def aggregate_file(data_path, segment_by=()):
+    """Worker: parse one CSV once and aggregate it whole and/or per segment.
+
+    Returns [(label or None, ReportAggregates)].
+    """
+    import report_pages as report
+    from aggregates import compute_aggregates
+    from dataset import load_compact
+
+    columns = list(report.REPORT_COLUMNS)
+    for by in segment_by:
+        column = SEGMENTS.get(by, (by, None))[0]
+        if column not in columns:
+            columns.append(column)
+    data = load_compact(data_path, columns=columns)
+    if not segment_by:
+        return [(None, compute_aggregates(data, report.OCCS))]
+    return [(label, compute_aggregates(part, report.OCCS))
+            for by in segment_by for label, part in segments(data, by)]
+
+
+def render_job(agg, output_pdf, png_dir=None):
+    """Worker: render one report (pages drawn serially inside the worker)."""
+    import report_pages as report
+
+    start = time.perf_counter()
+    report.render_report(agg, output_pdf, jobs=1, png_dir=png_dir)
+    return time.perf_counter() - start
+
+
+def report_paths(out_dir, data_path, label, png):
+    stem = os.path.splitext(os.path.basename(data_path))[0]
+    name = stem if label is None else f"{stem}__{_slug(label)}"
+    return (os.path.join(out_dir, name + ".pdf"),
+            os.path.join(out_dir, name + "_png") if png else None)
+
+
+# ── Runner ────────────────────────────────────────────────────────────────
+def run_batch(data_paths, out_dir, segment_by=(), jobs=DEFAULT_JOBS, png=False):
+    """Render one report per file (or per file × segment); returns the failures."""
+    os.makedirs(out_dir, exist_ok=True)
+    failed, done, n_reports = [], 0, 0
+    t0 = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=max(1, jobs)) as pool:
+        pending = {pool.submit(aggregate_file, path, tuple(segment_by)): ("parse", path, None)
+                   for path in data_paths}
+        while pending:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                kind, path, target = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as exc:
+                    name = path if target is None else target
+                    print(f"FAILED {kind} {name}: {exc!r}", file=sys.stderr)
+                    failed.append((kind, name, repr(exc)))
+                    if kind == "render":
+                        done += 1
+                    continue
+
+                if kind == "parse":
+                    for label, agg in result:
+                        output_pdf, png_dir = report_paths(out_dir, path, label, png)
+                        pending[pool.submit(render_job, agg, output_pdf, png_dir)] = \
+                            ("render", path, output_pdf)
+                        n_reports += 1
+                    continue
+
+                done += 1
+                parsing = any(k == "parse" for k, _, _ in pending.values())
+                print(f"[{done}/{n_reports}{'+' if parsing else ''}] {target}  ({result:.1f}s)")
+
+    n_ok = n_reports - sum(1 for kind, _, _ in failed if kind == "render")
+    print(f"\n{n_ok}/{n_reports} reports written to {out_dir} "
+          f"in {time.perf_counter() - t0:.1f}s"
+          + (f"; {len(failed)} failure(s)" if failed else ""))
+    return failed
+
+
+def expand_paths(patterns):
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern))
+        if not matches:
+            print(f"warning: {pattern} matched no files", file=sys.stderr)
+        paths += matches
+    return list(dict.fromkeys(paths))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render many smartphone reports in parallel.")
+    parser.add_argument("paths", nargs="+", help="CSV files or glob patterns")
+    parser.add_argument("--out-dir", required=True, help="folder for the PDF reports")
+    parser.add_argument("--by", action="append", default=[], metavar="SEGMENT",
+                        help="one report per value of a column, or 'age_band' (repeatable)")
+    parser.add_argument("--jobs", type=int, default=DEFAULT_JOBS,
+                        help=f"worker processes (default {DEFAULT_JOBS})")
+    parser.add_argument("--png", action="store_true", help="also write per-page PNGs")
+    args = parser.parse_args(argv)
+
+    data_paths = expand_paths(args.paths)
+    if not data_paths:
+        parser.error("no input files")
+    failed = run_batch(data_paths, args.out_dir, args.by, jobs=args.jobs, png=args.png)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+"""
+Pipeline Benchmarks
+====================================
+Times the load, aggregate and per-page render stages of the report (and the
+EDA summary) on synthetic data at several sizes, tracking peak RSS, and
+writes machine-readable JSON so runs can be compared across commits.
+
+Each size runs in a fresh process so RSS figures are not polluted by the
+previous size. `peak_rss_mb` is the process high-water mark after the stage.
+
+Run:
+    python benchmark.py                                  # 50k, 1M, 10M rows
+    python benchmark.py --rows 50000 1000000 --output bench.json
+    python benchmark.py --rows 50000 --compare old.json  # ratio vs a previous run
+"""
+
+import argparse
+import io
+import json
+import multiprocessing as mp
+import os
+import platform
+import subprocess
+import time
+
+from profiling import peak_rss_mb
+
+DEFAULT_ROWS   = [50_000, 1_000_000, 10_000_000]
+DEFAULT_OUTPUT = "bench_results.json"
+WORK_DIR       = ".bench_data"
+
+
+class _Stage:
+    """Context manager appending one timing record to `records`."""
+
+    def __init__(self, records, rows, stage):
+        self.records, self.rows, self.stage = records, rows, stage
+
+    def __enter__(self):
+        self.wall, self.cpu = time.perf_counter(), time.process_time()
+        return self
+
+    def __exit__(self, *exc):
+        self.records.append({
+            "rows": self.rows,
+            "stage": self.stage,
+            "wall_s": round(time.perf_counter() - self.wall, 6),
+            "cpu_s": round(time.process_time() - self.cpu, 6),
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+        })
+
+
+def _run_size(csv_path, rows, render, queue):
+    """Child process: run every stage on one synthetic file."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    from aggregates import compute_aggregates
+    from dataset import load_compact
+    from loader import cache_path, read_csv_typed
+    from streaming import summarize_csv
+    import eda
+    import report_pages as report
+
+    records = []
+    with _Stage(records, rows, "parse_csv"):
+        df = read_csv_typed(csv_path, columns=report.REPORT_COLUMNS)
+    del df
+    if os.path.exists(cache_path(csv_path)):
+        os.remove(cache_path(csv_path))
+    with _Stage(records, rows, "load_cold_cache"):
+        load_compact(csv_path)
+    with _Stage(records, rows, "load_warm_cache"):
+        data = load_compact(csv_path, columns=report.REPORT_COLUMNS)
+    with _Stage(records, rows, "aggregate"):
+        agg = compute_aggregates(data, report.OCCS)
+    del data
+    with _Stage(records, rows, "eda_summary"):
+        eda.summarize_dataset(load_compact(csv_path))
+    with _Stage(records, rows, "eda_stream"):
+        summarize_csv(csv_path)
+    if render:
+        for i, page in enumerate(report.PAGES):
+            with _Stage(records, rows, f"render:{page.__name__}"):
+                fig = report.draw_page(i, agg)
+                report.save_pdf(fig, io.BytesIO())
+                plt.close(fig)
+    queue.put(records)
+
+
+def bench_size(rows, work_dir=WORK_DIR, seed=0, render=True):
+    from synthetic_data import write_csv
+
+    os.makedirs(work_dir, exist_ok=True)
+    csv_path = os.path.join(work_dir, f"synthetic_{rows}_s{seed}.csv")
+    if not os.path.exists(csv_path):
+        print(f"  generating {rows:,} rows …")
+        write_csv(csv_path, rows, seed=seed)
+
+    ctx = mp.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_run_size, args=(csv_path, rows, render, queue))
+    proc.start()
+    records = queue.get()
+    proc.join()
+    return records
+
+
+def run_metadata():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    import numpy, pandas, matplotlib
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": numpy.__version__,
+        "pandas": pandas.__version__,
+        "matplotlib": matplotlib.__version__,
+        "cpus": os.cpu_count(),
+        "platform": platform.platform(),
+    }
+
+
+def print_table(records, baseline=None):
+    base = {(r["rows"], r["stage"]): r for r in (baseline or [])}
+    print(f"\n{'rows':>11}  {'stage':<32}{'wall s':>9}{'cpu s':>9}{'RSS MB':>9}"
+          + ("   vs base" if baseline else ""))
+    for r in records:
+        line = (f"{r['rows']:>11,}  {r['stage']:<32}{r['wall_s']:>9.3f}"
+                f"{r['cpu_s']:>9.3f}{r['peak_rss_mb']:>9.1f}")
+        old = base.get((r["rows"], r["stage"]))
+        if old and old["wall_s"] > 0:
+            line += f"   {r['wall_s'] / old['wall_s']:>6.2f}x"
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the report pipeline stages.")
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="JSON results file")
+    parser.add_argument("--work-dir", default=WORK_DIR, help="where synthetic CSVs are kept")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-render", action="store_true", help="skip the page render stages")
+    parser.add_argument("--compare", default=None, help="previous results JSON to compare against")
+    args = parser.parse_args(argv)
+
+    records = []
+    for rows in args.rows:
+        print(f"Benchmarking {rows:,} rows …")
+        records += bench_size(rows, args.work_dir, args.seed, render=not args.no_render)
+
+    with open(args.output, "w") as f:
+        json.dump({"meta": run_metadata(), "results": records}, f, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+    print_table(records, baseline)
+    print(f"\nResults → {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+"""
+Cohort Comparison
+====================================
+Compares two cohorts of respondents metric by metric. A cohort is a boolean
+mask or a value range such as Stress_Level 7–10 vs 1–3. For every metric:
+mean difference, effect size (Hedges' g), Welch's t-test (Holm-adjusted
+across metrics) and percentile bootstrap confidence intervals of the
+difference and of g.
+
+- Each cohort is reduced to its distinct values and their counts. One
+  bootstrap resample of its n rows is then a multinomial draw of n over those
+  values, so B resamples are a (B × distinct) count matrix and their means a
+  single matrix product: the same distribution as resampling rows, at a cost
+  independent of the row count. Columns with many distinct values fall back
+  to batched (batch × n) index matrices.
+- Cohorts are resampled separately (the design is two independent samples).
+- Resamples are drawn in fixed blocks seeded from one SeedSequence, so the
+  result depends on the seed only, not on --jobs; blocks can run on a
+  process pool.
+- Value counts merge by addition, so aggregates.py keeps them per cohort and
+  the report's high- vs low-stress claims are regenerated from the same sums
+  as its bars.
+
+Run:
+    python cohorts.py data.csv [--a Stress_Level=7:10] [--b Stress_Level=1:3]
+                      [--boot 5000] [--seed 0] [--jobs 4] [--output test.csv]
+Usage:
+    from cohorts import compare
+    result = compare(df, ("Stress_Level", 7, 10), ("Stress_Level", 1, 3),
+                     ["Daily_Phone_Hours", "Sleep_Hours"], n_boot=5000)
+    result.loc["Sleep_Hours", ["diff", "diff_lo", "diff_hi", "g", "p_holm"]]
+"""
+
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from correlation import t_pvalue
+
+DEFAULT_BOOT  = 2000
+DEFAULT_SEED  = 0
+DEFAULT_CI    = 0.95
+BLOCK_SIZE    = 500            # resamples per seeded block (the unit of work)
+INDEX_BUDGET  = 1 << 22        # int64 indices per batch on the index-matrix path
+EFFECT_LABELS = [(0.2, "negligible"), (0.5, "small"), (0.8, "medium"), (np.inf, "large")]
+
+COLUMNS = ["n_a", "n_b", "mean_a", "mean_b", "diff", "diff_lo", "diff_hi",
+           "g", "g_lo", "g_hi", "t", "df", "p", "p_holm"]
+
+
+# ── Cohorts & value counts ────────────────────────────────────────────────
+def cohort_mask(data, cohort):
+    """Boolean row mask of `cohort`: a mask, or (column, lo, hi) inclusive."""
+    if isinstance(cohort, tuple):
+        column, lo, hi = cohort
+        values = np.asarray(data[column], dtype=np.float64)
+        return (values >= lo) & (values <= hi)
+    mask = np.asarray(cohort, dtype=bool)
+    if len(mask) != len(data):
+        raise ValueError(f"cohort mask has {len(mask)} rows, data has {len(data)}")
+    return mask
+
+
+def parse_cohort(text):
+    """'Stress_Level=7:10' -> ("Stress_Level", 7.0, 10.0); 'Age=30' -> a single value."""
+    column, sep, bounds = text.partition("=")
+    if not sep:
+        raise ValueError(f"cohort {text!r} is not COLUMN=LO:HI")
+    lo, _, hi = bounds.partition(":")
+    return column, float(lo), float(hi or lo)
+
+
+def value_counts(values):
+    """(distinct values, counts) of the non-NaN `values`, sorted (no hashing)."""
+    values = np.sort(np.asarray(values, dtype=np.float64))
+    values = values[:len(values) - np.isnan(values).sum()]      # NaNs sort last
+    if not len(values):
+        return np.empty(0), np.empty(0, dtype=np.int64)
+    starts = np.flatnonzero(np.r_[True, values[1:] != values[:-1]])
+    return values[starts], np.diff(np.r_[starts, len(values)])
+
+
+def grouped_value_counts(codes, n_groups, values):
+    """
+    value_counts of `values` for each group code 0..n_groups-1 (code -1 and
+    NaN skipped): one factorize of the column and one bincount over
+    (group, value) cells, no per-group copies.
+    """
+    index, distinct = pd.factorize(np.asarray(values, dtype=np.float64))   # NaN -> -1
+    width = len(distinct) + 1
+    # shifted by one, so code -1 lands in row / column 0 and is sliced away
+    cell = (np.asarray(codes) + 1) * width + (index + 1)
+    counts = np.bincount(cell, minlength=(n_groups + 1) * width)
+    order = np.argsort(distinct)
+    counts = counts.reshape(n_groups + 1, width)[1:, 1:][:, order]
+    distinct = distinct[order]
+    return [(distinct[row > 0], row[row > 0].astype(np.int64)) for row in counts]
+
+
+def merge_counts(first, second):
+    """Value counts of two samples combined."""
+    values = np.concatenate([first[0], second[0]])
+    counts = np.concatenate([first[1], second[1]])
+    order = np.argsort(values, kind="stable")
+    values, counts = values[order], counts[order]
+    if not len(values):
+        return values, counts
+    starts = np.flatnonzero(np.r_[True, values[1:] != values[:-1]])
+    return values[starts], np.add.reduceat(counts, starts)
+
+
+def moments(counts):
+    """(n, mean, sample variance) from value counts."""
+    values, weights = counts
+    n = weights.sum()
+    if n == 0:
+        return 0, np.nan, np.nan
+    mean = weights @ values / n
+    var = weights @ (values - mean) ** 2 / (n - 1) if n > 1 else np.nan
+    return int(n), mean, var
+
+
+# ── Tests & effect sizes ──────────────────────────────────────────────────
+def welch(mean_a, var_a, n_a, mean_b, var_b, n_b):
+    """Welch's t, its Welch–Satterthwaite degrees of freedom and two-sided p."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sa, sb = var_a / n_a, var_b / n_b
+        t = (mean_a - mean_b) / np.sqrt(sa + sb)
+        df = (sa + sb) ** 2 / (sa ** 2 / (n_a - 1) + sb ** 2 / (n_b - 1))
+    return t, df, t_pvalue(t, df)
+
+
+def hedges_g(mean_a, var_a, n_a, mean_b, var_b, n_b):
+    """Standardized mean difference over the pooled SD, small-sample corrected."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        pooled = np.sqrt(((n_a - 1) * var_a + (n_b - 1) * var_b) / (n_a + n_b - 2))
+        return (mean_a - mean_b) / pooled * (1 - 3 / (4 * (n_a + n_b) - 9))
+
+
+def holm(p):
+    """Holm step-down adjusted p-values (family = the metrics compared)."""
+    p = np.asarray(p, dtype=np.float64)
+    order = np.argsort(p)
+    adjusted = np.maximum.accumulate(p[order] * (len(p) - np.arange(len(p))))
+    out = np.empty_like(p)
+    out[order] = np.minimum(adjusted, 1.0)
+    return out
+
+
+def effect_label(g):
+    """Cohen's conventional size of |g|: negligible / small / medium / large."""
+    if not np.isfinite(g):
+        return "n/a"
+    return next(label for bound, label in EFFECT_LABELS if abs(g) < bound)
+
+
+# ── Bootstrap ─────────────────────────────────────────────────────────────
+def resample_moments(counts, n_boot, rng):
+    """Means and sample variances of `n_boot` row resamples of one cohort."""
+    values, weights = counts
+    n = int(weights.sum())
+    center = weights @ values / n
+    shifted = values - center                  # centred: no cancellation in E[x²] − E[x]²
+    if len(values) * 4 <= n:
+        draws = rng.multinomial(n, weights / n, size=n_boot)          # (B, distinct)
+        mean = draws @ shifted / n
+        var = (draws @ shifted ** 2 / n - mean ** 2) * (n / (n - 1))
+        return center + mean, var
+    rows = np.repeat(shifted, weights)
+    batch = max(1, INDEX_BUDGET // n)
+    mean, var = np.empty(n_boot), np.empty(n_boot)
+    for lo in range(0, n_boot, batch):
+        hi = min(lo + batch, n_boot)
+        x = rows[rng.integers(0, n, size=(hi - lo, n))]                # (batch, n)
+        mean[lo:hi], var[lo:hi] = x.mean(axis=1), x.var(axis=1, ddof=1)
+    return center + mean, var
+
+
+def _bootstrap_block(counts_a, counts_b, n_boot, seed):
+    """(metric, {diff, g}, resample) array for one seeded block."""
+    rng = np.random.default_rng(seed)
+    out = np.empty((len(counts_a), 2, n_boot))
+    for i, (a, b) in enumerate(zip(counts_a, counts_b)):
+        mean_a, var_a = resample_moments(a, n_boot, rng)
+        mean_b, var_b = resample_moments(b, n_boot, rng)
+        n_a, n_b = a[1].sum(), b[1].sum()
+        out[i, 0] = mean_a - mean_b
+        out[i, 1] = hedges_g(mean_a, var_a, n_a, mean_b, var_b, n_b)
+    return out
+
+
+def bootstrap(counts_a, counts_b, n_boot=DEFAULT_BOOT, seed=DEFAULT_SEED, jobs=1):
+    """
+    Bootstrap distribution of (diff, g) per metric: (metric, 2, n_boot).
+    Blocks of BLOCK_SIZE resamples get their own child seed, so the result
+    is the same for any `jobs`.
+    """
+    sizes = [min(BLOCK_SIZE, n_boot - lo) for lo in range(0, n_boot, BLOCK_SIZE)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    if jobs <= 1 or len(sizes) <= 1:
+        blocks = [_bootstrap_block(counts_a, counts_b, size, s) for size, s in zip(sizes, seeds)]
+    else:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(sizes))) as pool:
+            blocks = list(pool.map(_bootstrap_block, [counts_a] * len(sizes),
+                                   [counts_b] * len(sizes), sizes, seeds))
+    return np.concatenate(blocks, axis=2)
+
+
+# ── Comparison ────────────────────────────────────────────────────────────
+def compare_counts(counts_a, counts_b, metrics, n_boot=DEFAULT_BOOT, seed=DEFAULT_SEED,
+                   ci=DEFAULT_CI, jobs=1, labels=("a", "b")):
+    """
+    Cohort a vs b from per-metric value counts (lists aligned with `metrics`).
+    One row per metric (COLUMNS); diff and g are a − b. The bootstrap
+    settings and cohort labels are kept in `.attrs`.
+    """
+    rows = []
+    for a, b in zip(counts_a, counts_b):
+        n_a, mean_a, var_a = moments(a)
+        n_b, mean_b, var_b = moments(b)
+        t, df, p = welch(mean_a, var_a, n_a, mean_b, var_b, n_b)
+        rows.append({"n_a": n_a, "n_b": n_b, "mean_a": mean_a, "mean_b": mean_b,
+                     "diff": mean_a - mean_b,
+                     "g": hedges_g(mean_a, var_a, n_a, mean_b, var_b, n_b),
+                     "t": float(t), "df": float(df), "p": float(p)})
+    result = pd.DataFrame(rows, index=pd.Index(list(metrics), name="metric"))
+
+    testable = [i for i, (a, b) in enumerate(zip(counts_a, counts_b))
+                if a[1].sum() > 1 and b[1].sum() > 1]
+    tails = [(1 - ci) / 2 * 100, (1 + ci) / 2 * 100]
+    for name in ("diff", "g"):
+        result[f"{name}_lo"] = result[f"{name}_hi"] = np.nan
+    if testable and n_boot:
+        boot = bootstrap([counts_a[i] for i in testable], [counts_b[i] for i in testable],
+                         n_boot, seed, jobs)
+        for j, name in enumerate(("diff", "g")):
+            lo, hi = np.nanpercentile(boot[:, j], tails, axis=1)
+            result.iloc[testable, result.columns.get_loc(f"{name}_lo")] = lo
+            result.iloc[testable, result.columns.get_loc(f"{name}_hi")] = hi
+    result["p_holm"] = np.nan
+    ok = result["p"].notna().to_numpy()
+    result.loc[ok, "p_holm"] = holm(result.loc[ok, "p"])
+    result = result[COLUMNS]
+    result.attrs = {"cohorts": list(labels), "n_boot": n_boot, "seed": seed, "ci": ci}
+    return result
+
+
+def compare(data, a, b, metrics, **kwargs):
+    """Cohorts `a` and `b` (masks or (column, lo, hi)) of a DataFrame / CompactDataset."""
+    mask_a, mask_b = cohort_mask(data, a), cohort_mask(data, b)
+    counts_a, counts_b = [], []
+    for metric in metrics:
+        values = np.asarray(data[metric], dtype=np.float64)
+        counts_a.append(value_counts(values[mask_a]))
+        counts_b.append(value_counts(values[mask_b]))
+    kwargs.setdefault("labels", (_label(a), _label(b)))
+    return compare_counts(counts_a, counts_b, metrics, **kwargs)
+
+
+def meaningful(result, alpha=0.05, min_g=0.2):
+    """Metrics whose gap is significant (Holm) and at least a small effect."""
+    hit = (result["p_holm"] < alpha) & (result["g"].abs() >= min_g)
+    return list(result.index[hit])
+
+
+def _label(cohort):
+    if isinstance(cohort, tuple):
+        column, lo, hi = cohort
+        return f"{column} {lo:g}–{hi:g}" if lo != hi else f"{column} {lo:g}"
+    return "mask"
+
+
+def main(argv=None):
+    from aggregates import PROFILE_COLS
+    from dataset import load_compact
+
+    parser = argparse.ArgumentParser(description="Compare two respondent cohorts.")
+    parser.add_argument("path", help="input CSV or dataset snapshot")
+    parser.add_argument("--a", default="Stress_Level=7:10", help="first cohort COLUMN=LO:HI")
+    parser.add_argument("--b", default="Stress_Level=1:3", help="second cohort COLUMN=LO:HI")
+    parser.add_argument("--metric", action="append", default=None,
+                        help=f"metric to compare (repeatable; default {PROFILE_COLS})")
+    parser.add_argument("--boot", type=int, default=DEFAULT_BOOT, help="bootstrap resamples")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--ci", type=float, default=DEFAULT_CI, help="confidence level")
+    parser.add_argument("--jobs", type=int, default=1, help="processes for the bootstrap")
+    parser.add_argument("--output", default=None, help="export .csv / .json")
+    args = parser.parse_args(argv)
+
+    a, b = parse_cohort(args.a), parse_cohort(args.b)
+    metrics = args.metric or PROFILE_COLS
+    data = load_compact(args.path, columns=sorted({a[0], b[0], *metrics}))
+    start = time.perf_counter()
+    result = compare(data, a, b, metrics, n_boot=args.boot, seed=args.seed, ci=args.ci,
+                     jobs=args.jobs)
+    seconds = time.perf_counter() - start
+    print(f"{result.attrs['cohorts'][0]} (a) vs {result.attrs['cohorts'][1]} (b): "
+          f"{len(data):,} rows, {args.boot} resamples, seed {args.seed}, {seconds:.2f}s\n")
+    print(result.to_string(float_format=lambda v: f"{v:.4g}"))
+    sizes = ", ".join(f"{m}: {effect_label(g)}" for m, g in result["g"].items())
+    print(f"\nEffect sizes — {sizes}")
+    if args.output:
+        if args.output.endswith(".json"):
+            result.reset_index().to_json(args.output, orient="records", indent=1)
+        else:
+            result.to_csv(args.output)
+        print(f"Exported → {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+"""
+Correlation Engine
+====================================
+One-pass, bounded-memory correlation analysis of the numeric columns, overall
+and per group (Occupation by default), exported as data rather than a heatmap.
+
+- Pearson: pairwise-complete co-moments (streaming.MomentAccumulator).
+- Spearman: each column is binned on edges fixed from the first chunk (the
+  distinct values themselves when there are at most `rank_bins` of them, else
+  quantile edges) and pairwise joint bin counts are accumulated; ranks are the
+  bins' mid-ranks. Exact, ties included, for columns with few distinct values
+  (every column of this dataset); otherwise ties within a bin are the only
+  approximation.
+- p-values: two-sided t-test of r = 0 with n - 2 degrees of freedom.
+
+Run:
+    python correlation.py data.csv [--by Occupation] [--output corr.csv]
+Usage:
+    from correlation import correlate_csv
+    result = correlate_csv("big.csv")
+    result.matrix("spearman", group="Student", stat="p")
+    result.to_frame()        # tidy: group, method, x, y, r, n, p
+"""
+
+import argparse
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+from loader import NUMERIC_COLUMNS, read_csv_typed
+from streaming import DEFAULT_CHUNKSIZE, MomentAccumulator
+
+try:
+    from scipy.special import betainc
+except ImportError:
+    betainc = None
+
+DEFAULT_GROUP     = "Occupation"
+DEFAULT_RANK_BINS = 128
+ALL               = "All"      # label of the whole-population matrices
+METHODS           = ("pearson", "spearman")
+
+
+# ── Significance ──────────────────────────────────────────────────────────
+def _betacf(a, b, x, max_iter=10_000, eps=3e-16, tiny=1e-300):
+    """Continued fraction for the incomplete beta function (modified Lentz)."""
+    c, d = 1.0, 1.0 - (a + b) * x / (a + 1)
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, max_iter + 1):
+        m2 = 2 * m
+        for aa in (m * (b - m) * x / ((a - 1 + m2) * (a + m2)),
+                   -(a + m) * (a + b + m) * x / ((a + m2) * (a + 1 + m2))):
+            d = 1.0 + aa * d
+            d = 1.0 / (d if abs(d) > tiny else tiny)
+            c = 1.0 + aa / c
+            c = c if abs(c) > tiny else tiny
+            h *= d * c
+        if abs(d * c - 1.0) < eps:
+            break
+    return h
+
+
+def _betainc(a, b, x):
+    """Regularized incomplete beta I_x(a, b) (scipy.special.betainc fallback)."""
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+    front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b)
+                     + a * math.log(x) + b * math.log1p(-x))
+    if x < (a + 1) / (a + b + 2):
+        return front * _betacf(a, b, x) / a
+    return 1.0 - front * _betacf(b, a, 1.0 - x) / b
+
+
+def t_pvalue(t, df):
+    """Two-sided p-value of Student's t statistic(s) `t` with `df` degrees of freedom."""
+    t, df = np.broadcast_arrays(np.asarray(t, dtype=np.float64),
+                                np.asarray(df, dtype=np.float64))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        x = df / (df + t * t)
+    if betainc is not None:
+        p = betainc(df / 2, 0.5, x)
+    else:
+        p = np.array([_betainc(d / 2, 0.5, v) if v == v and d > 0 else np.nan
+                      for d, v in zip(df.ravel(), x.ravel())]).reshape(x.shape)
+    return p
+
+
+def t_critical(df, level=0.95):
+    """Two-sided critical value of Student's t: P(|T| > t) = 1 - level at `df`."""
+    if not df > 0:
+        return np.nan
+    lo, hi = 0.0, 1.0
+    while t_pvalue(hi, df) > 1 - level:
+        hi *= 2
+    for _ in range(60):                    # bisection on the p-value
+        mid = (lo + hi) / 2
+        lo, hi = (mid, hi) if t_pvalue(mid, df) > 1 - level else (lo, mid)
+    return (lo + hi) / 2
+
+
+def corr_pvalue(r, n):
+    """p-value of H0: correlation = 0 for coefficient(s) `r` over `n` pairs."""
+    r, n = np.asarray(r, dtype=np.float64), np.asarray(n, dtype=np.float64)
+    df = n - 2
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t = r * np.sqrt(df / np.maximum(1.0 - r * r, 0.0))
+    p = t_pvalue(t, df)
+    return np.where(df > 0, p, np.nan)
+
+
+# ── Spearman via binned ranks ─────────────────────────────────────────────
+def rank_edges(values, rank_bins=DEFAULT_RANK_BINS):
+    """Inner bin edges for one column: between distinct values, or at quantiles."""
+    values = values[~np.isnan(values)]
+    distinct = np.unique(values)
+    if len(distinct) <= rank_bins:
+        return (distinct[:-1] + distinct[1:]) / 2
+    return np.unique(np.quantile(values, np.linspace(0, 1, rank_bins + 1)[1:-1]))
+
+
+def _rank_corr(joint):
+    """Spearman rho and n from a 2-D histogram of (bin_x, bin_y) counts."""
+    nx, ny = joint.sum(axis=1), joint.sum(axis=0)
+    n = nx.sum()
+    if n < 2:
+        return np.nan, n
+    rx = np.cumsum(nx) - nx + (nx + 1) / 2 - (n + 1) / 2     # centred mid-ranks
+    ry = np.cumsum(ny) - ny + (ny + 1) / 2 - (n + 1) / 2
+    cov = rx @ joint @ ry
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rho = cov / np.sqrt((nx * rx * rx).sum() * (ny * ry * ry).sum())
+    return float(np.clip(rho, -1.0, 1.0)), n
+
+
+# ── Accumulator ───────────────────────────────────────────────────────────
+class CorrelationAccumulator:
+    """
+    Pearson co-moments and Spearman joint rank histograms for `columns`,
+    overall and per value of `group_by`, folded chunk by chunk.
+    Accumulators merge only if they share rank edges (pass `edges=`).
+    """
+
+    def __init__(self, columns=NUMERIC_COLUMNS, group_by=DEFAULT_GROUP,
+                 rank_bins=DEFAULT_RANK_BINS, spearman=True, edges=None):
+        self.columns = list(columns)
+        self.group_by = group_by
+        self.rank_bins = rank_bins
+        self.spearman = spearman
+        self.edges = edges                          # per column inner edges
+        self.pairs = [(i, j) for i in range(len(self.columns))
+                      for j in range(i + 1, len(self.columns))]
+        self.moments = {ALL: MomentAccumulator(self.columns)}
+        self.joint = {}                             # group -> (pairs, B, B) counts
+
+    @property
+    def n_bins(self):
+        return max(len(e) for e in self.edges) + 1 if self.edges else 1
+
+    def update(self, chunk):
+        self.moments[ALL].update(chunk)
+        labels, codes = [ALL], None
+        if self.group_by is not None:
+            codes, uniques = pd.factorize(chunk[self.group_by], sort=True)
+            labels = [str(u) for u in uniques]
+            for code, label in enumerate(labels):
+                part = chunk[codes == code]
+                self.moments.setdefault(label, MomentAccumulator(self.columns)).update(part)
+        if self.spearman:
+            self._update_ranks(chunk, codes, labels)
+        return self
+
+    def _update_ranks(self, chunk, codes, labels):
+        x = chunk[self.columns].to_numpy(dtype=np.float64)
+        if self.edges is None:
+            self.edges = [rank_edges(x[:, k], self.rank_bins) for k in range(x.shape[1])]
+        B = self.n_bins
+        valid = ~np.isnan(x)
+        bins = np.column_stack([np.searchsorted(e, x[:, k], side="right")
+                                for k, e in enumerate(self.edges)])
+        if codes is None:
+            codes = np.zeros(len(x), dtype=np.intp)
+        # rows without a group still count towards the overall matrices
+        g = np.where(codes >= 0, codes, len(labels))
+        n_groups = len(labels) + 1
+        counts = np.empty((n_groups, len(self.pairs), B, B), dtype=np.int64)
+        for p, (i, j) in enumerate(self.pairs):
+            ok = valid[:, i] & valid[:, j]
+            flat = (g[ok] * B + bins[ok, i]) * B + bins[ok, j]
+            counts[:, p] = np.bincount(flat, minlength=n_groups * B * B).reshape(n_groups, B, B)
+        self._add_joint(ALL, counts.sum(axis=0))
+        if self.group_by is not None:
+            for code, label in enumerate(labels):
+                self._add_joint(label, counts[code])
+
+    def _add_joint(self, label, counts):
+        if label in self.joint:
+            self.joint[label] += counts
+        else:
+            self.joint[label] = counts.copy()
+
+    def merge(self, other):
+        if other.edges is not None and self.edges is not None and not all(
+                np.array_equal(a, b) for a, b in zip(self.edges, other.edges)):
+            raise ValueError("cannot merge correlation accumulators with different rank edges")
+        self.edges = self.edges if self.edges is not None else other.edges
+        for label, acc in other.moments.items():
+            self.moments.setdefault(label, MomentAccumulator(self.columns)).merge(acc)
+        for label, counts in other.joint.items():
+            self._add_joint(label, counts)
+        return self
+
+    # Results ─────────────────────────────────────────────────────────────
+    def _spearman(self, label):
+        k = len(self.columns)
+        r, n = np.eye(k), np.zeros((k, k))
+        joint = self.joint.get(label)
+        if joint is None:
+            return np.full((k, k), np.nan), n
+        for p, (i, j) in enumerate(self.pairs):
+            rho, pairs = _rank_corr(joint[p])
+            r[i, j] = r[j, i] = rho
+            n[i, j] = n[j, i] = pairs
+        for i in range(k):
+            n[i, i] = self.moments[label].n[i]
+        return r, n
+
+    def result(self):
+        matrices = {}
+        for label, acc in self.moments.items():
+            found = {"pearson": (acc.corr().to_numpy(), acc.pn)}
+            if self.spearman:
+                found["spearman"] = self._spearman(label)
+            for method, (r, n) in found.items():
+                p = corr_pvalue(r, n)
+                np.fill_diagonal(p, 0.0)
+                matrices[(label, method)] = {"r": r, "n": n, "p": p}
+        return CorrelationResult(self.columns, matrices, self.group_by)
+
+
+class CorrelationResult:
+    """Correlation / pair-count / p-value matrices keyed by (group, method)."""
+
+    def __init__(self, columns, matrices, group_by=None):
+        self.columns = columns
+        self.matrices = matrices
+        self.group_by = group_by
+
+    @property
+    def groups(self):
+        return list(dict.fromkeys(label for label, _ in self.matrices))
+
+    def matrix(self, method="pearson", group=ALL, stat="r"):
+        values = self.matrices[(group, method)][stat]
+        return pd.DataFrame(values, index=self.columns, columns=self.columns)
+
+    def to_frame(self):
+        """Tidy frame, one row per (group, method, unordered column pair)."""
+        iu = np.triu_indices(len(self.columns), k=1)
+        cols = np.asarray(self.columns)
+        frames = []
+        for (label, method), m in self.matrices.items():
+            frames.append(pd.DataFrame({
+                "group": label, "method": method,
+                "x": cols[iu[0]], "y": cols[iu[1]],
+                "r": m["r"][iu], "n": m["n"][iu].astype(np.int64), "p": m["p"][iu],
+            }))
+        return pd.concat(frames, ignore_index=True)
+
+    def export(self, path):
+        """Write to_frame() as .csv, .json or .parquet (by extension)."""
+        frame = self.to_frame()
+        ext = os.path.splitext(path)[1].lower()
+        if ext == ".json":
+            frame.to_json(path, orient="records", indent=1)
+        elif ext == ".parquet":
+            frame.to_parquet(path, index=False)
+        else:
+            frame.to_csv(path, index=False)
+        return path
+
+
+def correlate_frame(df, columns=None, group_by=DEFAULT_GROUP, rank_bins=DEFAULT_RANK_BINS):
+    """In-memory counterpart of correlate_csv."""
+    columns = [c for c in (columns or NUMERIC_COLUMNS) if c in df.columns]
+    if group_by is not None and group_by not in df.columns:
+        group_by = None
+    return CorrelationAccumulator(columns, group_by, rank_bins).update(df).result()
+
+
+def correlate_csv(path, columns=None, group_by=DEFAULT_GROUP, rank_bins=DEFAULT_RANK_BINS,
+                  chunksize=DEFAULT_CHUNKSIZE):
+    """Stream `path` in chunks and return its CorrelationResult."""
+    columns = list(columns or NUMERIC_COLUMNS)
+    usecols = columns + ([group_by] if group_by is not None else [])
+    acc = CorrelationAccumulator(columns, group_by, rank_bins)
+    rows = 0
+    for chunk in read_csv_typed(path, columns=usecols, chunksize=chunksize):
+        acc.update(chunk)
+        rows += len(chunk)
+    if not rows:
+        raise ValueError(f"{path} contains no rows")
+    return acc.result()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Streaming correlation analysis.")
+    parser.add_argument("path", help="input CSV")
+    parser.add_argument("--by", default=DEFAULT_GROUP,
+                        help=f"per-group matrices by this column (default {DEFAULT_GROUP}; "
+                             f"'none' to skip)")
+    parser.add_argument("--rank-bins", type=int, default=DEFAULT_RANK_BINS,
+                        help="max rank bins per column for Spearman")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--output", default=None, help="export .csv / .json / .parquet")
+    args = parser.parse_args(argv)
+
+    group_by = None if args.by.lower() == "none" else args.by
+    result = correlate_csv(args.path, group_by=group_by, rank_bins=args.rank_bins,
+                           chunksize=args.chunksize)
+    for method in METHODS:
+        print(f"\n{method} ({ALL}):\n{result.matrix(method).round(3)}")
+    tidy = result.to_frame()
+    strongest = tidy.reindex(tidy["r"].abs().sort_values(ascending=False).index).head(10)
+    print(f"\nStrongest pairs:\n{strongest.to_string(index=False)}")
+    if args.output:
+        print(f"\nExported {len(tidy)} rows → {result.export(args.output)}")
+
+
+if __name__ == "__main__":
+    main()
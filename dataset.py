@@ -0,0 +1,416 @@
+"""
+Compact Dataset
+====================================
+Array-backed, column-oriented container for the smartphone dataset, sized to
+what the data actually needs instead of pandas' defaults:
+
+    Gender / Occupation / Device_Type   int8 dictionary codes (+ label list)
+    User_ID "U123"                      int32/int64 number (+ prefix)
+    one-decimal hours (Sleep_Hours …)   int8/int16 fixed point (tenths)
+    bounded integers (Age, Stress …)    int8 / int16 as in loader.SCHEMA
+
+On the 50k sample that is 17 bytes per respondent (100M respondents in
+~1.7 GB), against ~130 bytes for a default-dtype DataFrame and ~39 for
+loader's typed one.
+
+Columns are read back as pandas Series on demand (`ds["Stress_Level"]`), so
+code written against a DataFrame's column access (aggregates, report_cache)
+runs on a CompactDataset unchanged; the grouped operations the reports use
+(group_mean, value_counts, describe, corr) work on the codes directly.
+
+Snapshots: `convert` writes the compact arrays to a fixed-layout binary file
+(.cds): a JSON header with the encodings (category label lists included),
+then one contiguous, 64-byte aligned little-endian array per column. Opening
+a snapshot parses only the header and maps each column with np.memmap, so it
+is O(1) in the file size, columns are paged in on first touch, and report
+processes on one host share the page cache. load_compact (and so eda.py and
+smartphone_analysis.py --data) accepts a snapshot wherever it accepts a CSV.
+
+Run:
+    python dataset.py convert data.csv [--output data.cds]
+    python dataset.py info data.cds
+
+Usage:
+    from dataset import load_compact
+    ds = load_compact("Smartphone_Usage_Productivity_Dataset_50000.csv")
+    ds.group_mean("Occupation", "Stress_Level"), ds.value_counts("Occupation")
+    ds = load_compact("data.cds")              # memory-mapped snapshot
+"""
+
+import argparse
+import json
+import os
+import re
+import struct
+import time
+
+import numpy as np
+import pandas as pd
+
+from loader import DEFAULT_CHUNKSIZE, load_dataset, read_csv_typed
+
+FIXED_POINT_SCALE = 10        # one-decimal columns are stored as integer tenths
+SNAPSHOT_MAGIC    = b"CDSNAP01"
+SNAPSHOT_EXT      = ".cds"
+_SNAPSHOT_ALIGN   = 64
+_INT_DTYPES = [np.int8, np.int16, np.int32, np.int64]
+
+
+def smallest_int(lo, hi):
+    """Narrowest signed integer dtype holding [lo, hi]."""
+    for dtype in _INT_DTYPES:
+        info = np.iinfo(dtype)
+        if info.min <= lo and hi <= info.max:
+            return np.dtype(dtype)
+    raise OverflowError(f"range [{lo}, {hi}] does not fit in int64")
+
+
+# ── Column encodings ──────────────────────────────────────────────────────
+def _parse_ids(series):
+    """("id", prefix) encoding if every value is one prefix + digits, else None."""
+    if not len(series) or series.isna().any():
+        return None
+    values = series.astype("string")
+    prefix = re.match(r"\D*", values.iloc[0]).group()
+    digits = values.str.slice(len(prefix))
+    if not (values.str.startswith(prefix).all() and digits.str.isdigit().all()):
+        return None
+    if (digits.str.startswith("0") & (digits.str.len() > 1)).any():
+        return None         # zero-padded ids would not round-trip
+    ids = digits.astype(np.int64).to_numpy()
+    return ids.astype(smallest_int(ids.min(), ids.max())), ("id", prefix)
+
+
+def _encode_column(series):
+    """
+    Compact array + encoding for one column:
+        ("category", labels)  codes into labels, -1 = missing
+        ("id", prefix)        "<prefix><int>" strings as integers
+        ("fixed", scale)      integers = round(value * scale)
+        ("plain", None)       the values as they are
+    """
+    dtype = series.dtype
+    if dtype == object or pd.api.types.is_string_dtype(dtype):
+        ids = _parse_ids(series)
+        if ids is not None:
+            return ids
+    if isinstance(dtype, pd.CategoricalDtype) or dtype == object or pd.api.types.is_string_dtype(dtype):
+        cat = series.astype("category")
+        labels = list(cat.cat.categories)
+        return cat.cat.codes.to_numpy().astype(smallest_int(-1, len(labels))), ("category", labels)
+
+    values = series.to_numpy()
+    if np.issubdtype(values.dtype, np.floating) and len(values):
+        scaled = np.round(values.astype(np.float64) * FIXED_POINT_SCALE)
+        finite = ~np.isnan(values)
+        if finite.all() and np.allclose(scaled / FIXED_POINT_SCALE, values, rtol=0, atol=1e-4):
+            return (scaled.astype(smallest_int(scaled.min(), scaled.max())),
+                    ("fixed", FIXED_POINT_SCALE))
+    if np.issubdtype(values.dtype, np.integer) and len(values):
+        return values.astype(smallest_int(values.min(), values.max())), ("plain", None)
+    return values, ("plain", None)
+
+
+class CompactDataset:
+    def __init__(self, arrays, encodings):
+        self.arrays = dict(arrays)          # column -> np.ndarray
+        self.encodings = dict(encodings)    # column -> (kind, detail)
+        lengths = {len(a) for a in self.arrays.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"columns differ in length: {sorted(lengths)}")
+        self._len = lengths.pop() if lengths else 0
+
+    # Construction ────────────────────────────────────────────────────────
+    @classmethod
+    def from_frame(cls, df):
+        arrays, encodings = {}, {}
+        for name in df.columns:
+            arrays[name], encodings[name] = _encode_column(df[name])
+        return cls(arrays, encodings)
+
+    @classmethod
+    def read_csv(cls, path, columns=None, chunksize=DEFAULT_CHUNKSIZE):
+        """Parse `path` chunk by chunk; only the compact arrays are kept."""
+        parts = [cls.from_frame(chunk)
+                 for chunk in read_csv_typed(path, columns=columns, chunksize=chunksize)]
+        if not parts:
+            return cls.from_frame(read_csv_typed(path, columns=columns, nrows=0))
+        return cls.concat(parts)
+
+    @classmethod
+    def concat(cls, parts):
+        """Stack datasets row-wise, re-coding categoricals onto one label list."""
+        first = parts[0]
+        arrays, encodings = {}, {}
+        for name, (kind, detail) in first.encodings.items():
+            encs = [p.encodings[name] for p in parts]
+            if all(e[0] == "category" for e in encs):
+                labels = sorted({l for _, ls in encs for l in ls})
+                pos = {l: i for i, l in enumerate(labels)}
+                dtype = smallest_int(-1, len(labels))
+                chunks = []
+                for p, (_, ls) in zip(parts, encs):
+                    lut = np.array([pos[l] for l in ls] + [-1], dtype=dtype)
+                    chunks.append(lut[p.arrays[name]])   # code -1 picks the trailing -1
+                arrays[name], encodings[name] = np.concatenate(chunks), ("category", labels)
+            elif all(e == encs[0] for e in encs):
+                values = [p.arrays[name] for p in parts]
+                merged = np.concatenate(values)
+                if np.issubdtype(merged.dtype, np.integer) and len(merged):
+                    merged = merged.astype(smallest_int(merged.min(), merged.max()))
+                arrays[name], encodings[name] = merged, (kind, detail)
+            else:   # encodings disagree between chunks: fall back to decoded values
+                column = pd.concat([p[name] for p in parts], ignore_index=True)
+                arrays[name], encodings[name] = _encode_column(column)
+        return cls(arrays, encodings)
+
+    # Introspection ───────────────────────────────────────────────────────
+    def __len__(self):
+        return self._len
+
+    @property
+    def columns(self):
+        return list(self.arrays)
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in self.arrays.values())
+
+    def memory_usage(self):
+        return pd.Series({c: a.nbytes for c, a in self.arrays.items()}, name="bytes")
+
+    def info(self):
+        rows = []
+        for name, arr in self.arrays.items():
+            kind, detail = self.encodings[name]
+            note = {"category": lambda d: f"{len(d)} labels",
+                    "id": lambda d: f"prefix {d!r}",
+                    "fixed": lambda d: f"÷{d}"}.get(kind, lambda d: "")(detail)
+            rows.append((name, str(arr.dtype), kind, note, self.notna(name).sum(), arr.nbytes))
+        table = pd.DataFrame(rows, columns=["column", "dtype", "encoding", "detail",
+                                            "non-null", "bytes"]).set_index("column")
+        return (f"CompactDataset: {len(self)} rows × {len(self.arrays)} columns, "
+                f"{self.nbytes / 2 ** 20:.2f} MiB\n{table.to_string()}")
+
+    # Column access ───────────────────────────────────────────────────────
+    def codes(self, name):
+        """Dictionary codes of a categorical column (-1 = missing)."""
+        return self.arrays[name]
+
+    def labels(self, name):
+        return self.encodings[name][1]
+
+    def is_categorical(self, name):
+        return self.encodings[name][0] == "category"
+
+    def values(self, name, dtype=np.float64):
+        """Decoded numeric values of a non-categorical column."""
+        kind, detail = self.encodings[name]
+        arr = self.arrays[name]
+        if kind == "category":
+            raise TypeError(f"{name} is categorical; use codes() / labels()")
+        if kind == "fixed":
+            arr = arr / detail
+        return arr if dtype is None else arr.astype(dtype, copy=False)
+
+    def notna(self, name):
+        kind, _ = self.encodings[name]
+        arr = self.arrays[name]
+        if kind == "category":
+            return arr >= 0
+        if np.issubdtype(arr.dtype, np.floating):
+            return ~np.isnan(arr)
+        return np.ones(len(arr), dtype=bool)
+
+    def __getitem__(self, name):
+        """Column as a pandas Series, like DataFrame column access."""
+        kind, detail = self.encodings[name]
+        arr = self.arrays[name]
+        if kind == "category":
+            values = pd.Categorical.from_codes(arr, categories=detail, validate=False)
+        elif kind == "id":
+            values = pd.array(np.char.add(detail, arr.astype(str)), dtype="string")
+        elif kind == "fixed":
+            values = arr / detail
+        else:
+            values = arr
+        return pd.Series(values, name=name, copy=False)
+
+    def __contains__(self, name):
+        return name in self.arrays
+
+    def select(self, columns):
+        return CompactDataset({c: self.arrays[c] for c in columns},
+                              {c: self.encodings[c] for c in columns})
+
+    def filter(self, mask):
+        """Rows where `mask` is True (categorical label lists are kept)."""
+        mask = np.asarray(mask)
+        return CompactDataset({c: a[mask] for c, a in self.arrays.items()}, self.encodings)
+
+    def to_frame(self, columns=None):
+        return pd.DataFrame({c: self[c] for c in (columns or self.columns)})
+
+    # Grouped operations ──────────────────────────────────────────────────
+    def _group_codes(self, key):
+        """(codes, labels) for grouping by `key`; integer columns group by value."""
+        if self.is_categorical(key):
+            return self.codes(key).astype(np.intp), pd.Index(self.labels(key), name=key)
+        vals = self.values(key, dtype=None)
+        if self.encodings[key][0] == "plain" and np.issubdtype(vals.dtype, np.integer) and len(vals):
+            lo = int(vals.min())
+            codes = vals.astype(np.intp) - lo
+            return codes, pd.Index(np.arange(lo, lo + codes.max() + 1), name=key)
+        uniques, codes = np.unique(vals, return_inverse=True)
+        return codes.astype(np.intp), pd.Index(uniques, name=key)
+
+    def group_mean(self, key, value):
+        """groupby(key, observed=True)[value].mean() from one bincount sweep."""
+        codes, labels = self._group_codes(key)
+        vals = self.values(value)
+        ok = (codes >= 0) & ~np.isnan(vals)
+        counts = np.bincount(codes[ok], minlength=len(labels))
+        sums = np.bincount(codes[ok], weights=vals[ok], minlength=len(labels))
+        seen = counts > 0
+        return pd.Series(sums[seen] / counts[seen], index=labels[seen], name=value)
+
+    def value_counts(self, name, sort=True):
+        """value_counts(): descending by count (sort=False: in label order)."""
+        codes, labels = self._group_codes(name)
+        counts = np.bincount(codes[codes >= 0], minlength=len(labels))
+        out = pd.Series(counts, index=labels, name="count")[counts > 0]
+        return out.sort_values(ascending=False, kind="stable") if sort else out
+
+    def numeric_columns(self):
+        return [c for c in self.columns if self.encodings[c][0] in ("plain", "fixed")]
+
+    def describe(self):
+        """DataFrame.describe() of the numeric columns."""
+        stats = {}
+        for c in self.numeric_columns():
+            x = self.values(c)
+            x = x[~np.isnan(x)]
+            if not len(x):
+                stats[c] = [0] + [np.nan] * 7
+                continue
+            q = np.quantile(x, [0.25, 0.5, 0.75])
+            stats[c] = [len(x), x.mean(), x.std(ddof=1) if len(x) > 1 else np.nan,
+                        x.min(), *q, x.max()]
+        return pd.DataFrame(stats, index=["count", "mean", "std", "min",
+                                          "25%", "50%", "75%", "max"])
+
+    def corr(self):
+        """Pairwise-complete Pearson correlation of the numeric columns."""
+        cols = self.numeric_columns()
+        return pd.DataFrame({c: self.values(c) for c in cols}).corr()
+
+
+# ── Snapshot files ────────────────────────────────────────────────────────
+def _aligned(n):
+    return -(-n // _SNAPSHOT_ALIGN) * _SNAPSHOT_ALIGN
+
+
+def write_snapshot(ds, path):
+    """Write `ds` as a memory-mappable snapshot (see the module docstring)."""
+    columns, offset, arrays = [], 0, []
+    for name in ds.columns:
+        a = np.ascontiguousarray(ds.arrays[name])
+        a = a.astype(a.dtype.newbyteorder("<"), copy=False)
+        if a.dtype.hasobject:
+            raise TypeError(f"column {name!r} has no fixed-width encoding")
+        columns.append({"name": name, "dtype": a.dtype.str, "offset": offset,
+                        "encoding": list(ds.encodings[name])})
+        arrays.append(a)
+        offset += _aligned(a.nbytes)
+    header = json.dumps({"rows": len(ds), "columns": columns}).encode()
+    start = _aligned(len(SNAPSHOT_MAGIC) + 8 + len(header))
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(SNAPSHOT_MAGIC + struct.pack("<Q", len(header)) + header)
+        for col, a in zip(columns, arrays):
+            f.seek(start + col["offset"])
+            f.write(a.tobytes())
+        f.truncate(start + offset)
+    os.replace(tmp, path)
+    return path
+
+
+def is_snapshot(path):
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(SNAPSHOT_MAGIC)) == SNAPSHOT_MAGIC
+    except OSError:
+        return False
+
+
+def open_snapshot(path, columns=None):
+    """
+    Memory-map a snapshot as a read-only CompactDataset; only the header is
+    read, column data is paged in by the OS as it is accessed.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} is not a dataset snapshot")
+        (size,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(size))
+    start = _aligned(len(SNAPSHOT_MAGIC) + 8 + size)
+    rows = header["rows"]
+    found = {col["name"]: col for col in header["columns"]}
+    missing = [c for c in columns or () if c not in found]
+    if missing:
+        raise KeyError(f"snapshot {path} has no column(s) {missing}")
+    arrays, encodings = {}, {}
+    for name in columns or found:
+        col = found[name]
+        dtype = np.dtype(col["dtype"])
+        arrays[name] = (np.memmap(path, dtype=dtype, mode="r", offset=start + col["offset"],
+                                  shape=(rows,))
+                        if rows else np.empty(0, dtype=dtype))
+        encodings[name] = tuple(col["encoding"])
+    return CompactDataset(arrays, encodings)
+
+
+def load_compact(path, columns=None, cache=True, cache_dir=None):
+    """
+    Load `path` as a CompactDataset. Snapshots are memory-mapped. For a CSV
+    with cache=True the typed columnar cache (loader.load_dataset) is used;
+    otherwise the CSV is parsed in chunks so no full-size DataFrame is ever
+    built.
+    """
+    if is_snapshot(path):
+        return open_snapshot(path, columns)
+    if not cache:
+        return CompactDataset.read_csv(path, columns)
+    return CompactDataset.from_frame(load_dataset(path, columns=columns, cache_dir=cache_dir))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compact dataset snapshots.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_convert = sub.add_parser("convert", help="write a CSV as a memory-mappable snapshot")
+    p_convert.add_argument("csv_path")
+    p_convert.add_argument("--output", default=None,
+                           help=f"snapshot path (default: the CSV's name with {SNAPSHOT_EXT})")
+    p_convert.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    p_info = sub.add_parser("info", help="describe a snapshot")
+    p_info.add_argument("path")
+    args = parser.parse_args(argv)
+
+    if args.command == "convert":
+        output = args.output or os.path.splitext(args.csv_path)[0] + SNAPSHOT_EXT
+        start = time.perf_counter()
+        ds = CompactDataset.read_csv(args.csv_path, chunksize=args.chunksize)
+        write_snapshot(ds, output)
+        print(f"{args.csv_path} → {output}: {len(ds)} rows, "
+              f"{os.path.getsize(output) / 1e6:.1f} MB in {time.perf_counter() - start:.2f}s")
+        return
+
+    start = time.perf_counter()
+    ds = open_snapshot(args.path)
+    elapsed = time.perf_counter() - start
+    print(ds.info())
+    print(f"\nopened in {elapsed * 1e3:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
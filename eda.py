@@ -1,119 +1,244 @@
-import matplotlib
-matplotlib.use("Qt5Agg")
-
-import pandas as pd
-import matplotlib.pyplot as plt
+import argparse
+import os
 import sys
 
-def generate_eda(file_path):
-    # Load dataset
-    df = pd.read_csv(file_path)
+# matplotlib, pandas and the streaming accumulators are imported where they
+# are used, so picking a backend in main() happens before pyplot loads and
+# argument errors / --help return immediately.
+from loader import DEFAULT_CHUNKSIZE
+
+
+def summarize_dataset(ds):
+    """
+    In-memory counterpart of streaming.summarize_csv (same keys) for a
+    dataset.CompactDataset, computed on its codes.
+    """
+    import pandas as pd
+
+    def group_mean(key, value):
+        if key in ds and value in ds:
+            return ds.group_mean(key, value)
+        return None
+
+    numeric = ds.numeric_columns()
+    return {
+        "rows": len(ds),
+        "columns": ds.columns,
+        "non_null": pd.Series({c: int(ds.notna(c).sum()) for c in ds.columns}),
+        "describe": ds.describe(),
+        "corr": ds.corr() if numeric else None,
+        "avg_phone": group_mean("Occupation", "Daily_Phone_Hours"),
+        "avg_stress_occ": group_mean("Occupation", "Stress_Level"),
+        "avg_stress_age": group_mean("Age", "Stress_Level"),
+        "avg_caffeine": group_mean("Occupation", "Caffeine_Intake_Cups"),
+        "stress_counts": (ds.value_counts("Stress_Level", sort=False)
+                          if "Stress_Level" in ds else None),
+        "occupation_counts": (ds.value_counts("Occupation")
+                              if "Occupation" in ds else None),
+    }
+
+
+class ChartSink:
+    """
+    Destination for generate_eda's charts.
+
+    out_dir=None : interactive, each chart opens in a window (plt.show)
+    fmt="png"/"svg" : one image per chart in out_dir/<name>/
+    fmt="pdf"       : every chart as a page of out_dir/<name>_eda.pdf
+    Figures are closed as soon as they are written.
+    """
+
+    def __init__(self, out_dir=None, fmt="png", name="eda"):
+        self.out_dir, self.fmt, self.name = out_dir, fmt, name
+        self.count = 0
+        self._pdf = None
+        if out_dir is None:
+            return
+        if fmt == "pdf":
+            from matplotlib.backends.backend_pdf import PdfPages
+            os.makedirs(out_dir, exist_ok=True)
+            self._pdf = PdfPages(os.path.join(out_dir, f"{name}_eda.pdf"))
+        else:
+            os.makedirs(os.path.join(out_dir, name), exist_ok=True)
+
+    def emit(self, chart):
+        import matplotlib.pyplot as plt
+        fig = plt.gcf()
+        self.count += 1
+        if self.out_dir is None:
+            plt.show()
+        elif self._pdf is not None:
+            self._pdf.savefig(fig)
+        else:
+            fig.savefig(os.path.join(self.out_dir, self.name,
+                                     f"{self.count:02d}_{chart}.{self.fmt}"))
+        plt.close(fig)
+
+    def close(self):
+        if self._pdf is not None:
+            self._pdf.close()
+            self._pdf = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
 
-    print("Dataset Loaded Successfully!\n")
-    print("Basic Info:")
-    print(df.info())
+
+def pie_labels(counts, half_widths=None):
+    """Category labels, with the ± share error when the counts are estimates."""
+    if half_widths is None:
+        return counts.index
+    share = half_widths / counts.sum() * 100
+    return [f"{label}\n(± {s:.1f}%)" for label, s in zip(counts.index, share)]
+
+
+def generate_eda(file_path, stream=False, chunksize=DEFAULT_CHUNKSIZE, sink=None,
+                 preview=None, preview_method="blocks"):
+    import matplotlib.pyplot as plt
+    from dataset import is_snapshot, load_compact
+    from streaming import summarize_csv
+
+    sink = sink or ChartSink()
+    ci = {}
+    if (preview or stream) and is_snapshot(file_path):
+        # A memory-mapped snapshot opens in O(1) and pages in lazily already
+        print("Snapshot input: reading it directly (--preview / --stream apply to CSVs)\n")
+        preview = stream = False
+    if preview:
+        # Quick look: estimates from ~`preview` sampled rows, ± 95% CI
+        from sampling import preview_csv, with_ci
+        summary = preview_csv(file_path, sample_rows=preview, method=preview_method,
+                              chunksize=chunksize)
+        ci, info = summary["ci"], summary["sample"]
+        print(f"Dataset Previewed from {info['rows']} sampled rows "
+              f"({info['method']}, {info['seconds']}s) — estimates ± 95% CI\n")
+        print("Basic Info:")
+        print(f"~{summary['rows']} ± {ci['rows']:.0f} rows, {len(summary['columns'])} columns")
+        print(with_ci(summary["non_null"], ci["non_null"], "{:.0f}")
+              .rename("Non-Null Count").to_string())
+    elif stream:
+        # Out-of-core: fold the CSV chunk by chunk, memory bounded by chunksize
+        summary = summarize_csv(file_path, chunksize=chunksize)
+        print("Dataset Streamed Successfully!\n")
+        print("Basic Info:")
+        print(f"{summary['rows']} rows, {len(summary['columns'])} columns")
+        print(summary["non_null"].rename("Non-Null Count").to_string())
+    else:
+        # Load dataset into compact dictionary-coded / fixed-point arrays
+        ds = load_compact(file_path)
+        summary = summarize_dataset(ds)
+        print("Dataset Loaded Successfully!\n")
+        print("Basic Info:")
+        print(ds.info())
     print("\nStatistical Summary:")
-    print(df.describe())
+    if ci:
+        print(with_ci(summary["describe"], ci["describe"]))
+        for name in ("avg_phone", "avg_stress_occ", "avg_caffeine", "occupation_counts"):
+            if summary[name] is not None:
+                print(f"\n{name}:\n{with_ci(summary[name], ci[name]).to_string()}")
+    else:
+        print(summary["describe"])
 
     # -------------------------------
     # 1️⃣ Daily Phone Usage per Occupation
     # -------------------------------
-    if "Occupation" in df.columns and "Daily_Phone_Hours" in df.columns:
-        avg_phone = df.groupby("Occupation")["Daily_Phone_Hours"].mean()
+    avg_phone = summary["avg_phone"]
+    if avg_phone is not None:
 
         plt.figure()
-        avg_phone.plot(kind="bar")
+        avg_phone.plot(kind="bar", yerr=ci.get("avg_phone"))
         plt.title("Average Daily Phone Usage per Occupation")
         plt.xlabel("Occupation")
         plt.ylabel("Average Daily Phone Hours")
         plt.xticks(rotation=45)
         plt.tight_layout()
-        plt.show()
+        sink.emit("avg_phone_per_occupation")
 
     # -------------------------------
     # 2️⃣ Stress Level per Occupation (Bar)
     # -------------------------------
-    if "Occupation" in df.columns and "Stress_Level" in df.columns:
-        avg_stress_occ = df.groupby("Occupation")["Stress_Level"].mean()
+    avg_stress_occ = summary["avg_stress_occ"]
+    if avg_stress_occ is not None:
 
         plt.figure()
-        avg_stress_occ.plot(kind="bar")
+        avg_stress_occ.plot(kind="bar", yerr=ci.get("avg_stress_occ"))
         plt.title("Average Stress Level per Occupation")
         plt.xlabel("Occupation")
         plt.ylabel("Average Stress Level")
         plt.xticks(rotation=45)
         plt.tight_layout()
-        plt.show()
+        sink.emit("avg_stress_per_occupation")
 
     # -------------------------------
     # 3️⃣ Stress Level by Age (Line)
     # -------------------------------
-    if "Age" in df.columns and "Stress_Level" in df.columns:
-        avg_stress_age = df.groupby("Age")["Stress_Level"].mean()
+    avg_stress_age = summary["avg_stress_age"]
+    if avg_stress_age is not None:
 
         plt.figure()
-        avg_stress_age.plot()
+        avg_stress_age.plot(yerr=ci.get("avg_stress_age"))
         plt.title("Average Stress Level by Age")
         plt.xlabel("Age")
         plt.ylabel("Average Stress Level")
         plt.tight_layout()
-        plt.show()
+        sink.emit("avg_stress_by_age")
 
     # -------------------------------
     # 4️⃣ Caffeine Intake per Occupation
     # -------------------------------
-    if "Occupation" in df.columns and "Caffeine_Intake_Cups" in df.columns:
-        avg_caffeine = df.groupby("Occupation")["Caffeine_Intake_Cups"].mean()
+    avg_caffeine = summary["avg_caffeine"]
+    if avg_caffeine is not None:
 
         plt.figure()
-        avg_caffeine.plot(kind="bar")
+        avg_caffeine.plot(kind="bar", yerr=ci.get("avg_caffeine"))
         plt.title("Average Caffeine Intake per Occupation")
         plt.xlabel("Occupation")
         plt.ylabel("Average Caffeine Intake (Cups)")
         plt.xticks(rotation=45)
         plt.tight_layout()
-        plt.show()
+        sink.emit("avg_caffeine_per_occupation")
 
-    print("Columns in dataset:", df.columns)
+    print("Columns in dataset:", summary["columns"])
 
     # -------------------------------
     # 🥧 Pie Chart – Stress Distribution
     # -------------------------------
-    if "Stress_Level" in df.columns:
-        stress_counts = df["Stress_Level"].value_counts().sort_index()
+    stress_counts = summary["stress_counts"]
+    if stress_counts is not None:
 
         plt.figure()
         plt.pie(
             stress_counts.values,
-            labels=stress_counts.index,
+            labels=pie_labels(stress_counts, ci.get("stress_counts")),
             autopct="%1.1f%%"
         )
         plt.title("Stress Level Distribution")
-        plt.show()
+        sink.emit("stress_distribution")
 
 
     # -------------------------------
     # 🥧 Pie Chart – Occupation Distribution
     # -------------------------------
-    if "Occupation" in df.columns:
-        occupation_counts = df["Occupation"].value_counts()
+    occupation_counts = summary["occupation_counts"]
+    if occupation_counts is not None:
 
         plt.figure()
         plt.pie(
             occupation_counts.values,
-            labels=occupation_counts.index,
+            labels=pie_labels(occupation_counts, ci.get("occupation_counts")),
             autopct="%1.1f%%"
         )
         plt.title("Occupation Distribution")
-        plt.show()
+        sink.emit("occupation_distribution")
 
 
     # -------------------------------
     # 7️⃣ Correlation Matrix
     # -------------------------------
-    numeric_df = df.select_dtypes(include=["int64", "float64"])
-    if not numeric_df.empty:
-        corr = numeric_df.corr()
+    corr = summary["corr"]
+    if corr is not None:
 
         plt.figure()
         plt.imshow(corr)
@@ -122,12 +247,61 @@ def generate_eda(file_path):
         plt.yticks(range(len(corr.columns)), corr.columns)
         plt.colorbar()
         plt.tight_layout()
-        plt.show()
+        sink.emit("correlation_matrix")
+
+
+def run_batch(file_paths, out_dir, fmt="png", stream=False, chunksize=DEFAULT_CHUNKSIZE,
+              preview=None, preview_method="blocks"):
+    """Headless EDA over many CSVs; a failing file is reported and skipped."""
+    failed = []
+    for file_path in file_paths:
+        name = os.path.splitext(os.path.basename(file_path))[0]
+        print(f"\n=== {file_path} ===")
+        try:
+            with ChartSink(out_dir, fmt, name) as sink:
+                generate_eda(file_path, stream=stream, chunksize=chunksize, sink=sink,
+                             preview=preview, preview_method=preview_method)
+        except Exception as exc:
+            print(f"FAILED {file_path}: {exc}")
+            failed.append(file_path)
+    print(f"\n{len(file_paths) - len(failed)}/{len(file_paths)} files written to {out_dir}")
+    return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exploratory data analysis for CSV files.")
+    parser.add_argument("file_paths", nargs="+",
+                        help="path(s) to CSV files or dataset snapshots (dataset.py convert)")
+    parser.add_argument("--stream", action="store_true",
+                        help="read the CSV in chunks (for files larger than RAM)")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE,
+                        help=f"rows per chunk in --stream mode (default {DEFAULT_CHUNKSIZE})")
+    parser.add_argument("--preview", type=int, default=None, metavar="ROWS",
+                        help="approximate EDA from about ROWS sampled rows, with 95%% CIs")
+    parser.add_argument("--preview-method", choices=["blocks", "reservoir"], default="blocks",
+                        help="blocks: seek to random byte blocks (cost independent of file "
+                             "size); reservoir: stream the file, stratified by "
+                             "Occupation × Gender")
+    parser.add_argument("--out-dir", default=None,
+                        help="headless batch mode: write charts here instead of showing them")
+    parser.add_argument("--format", choices=["png", "svg", "pdf"], default="png",
+                        help="chart format in batch mode; pdf = one multi-page PDF per CSV")
+    args = parser.parse_args(argv)
+
+    import matplotlib
+    if args.out_dir:
+        matplotlib.use("Agg")
+        failed = run_batch(args.file_paths, args.out_dir, args.format,
+                           stream=args.stream, chunksize=args.chunksize,
+                           preview=args.preview, preview_method=args.preview_method)
+        return 1 if failed else 0
+
+    matplotlib.use("Qt5Agg")
+    for file_path in args.file_paths:
+        generate_eda(file_path, stream=args.stream, chunksize=args.chunksize,
+                     preview=args.preview, preview_method=args.preview_method)
+    return 0
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python eda_program.py <path_to_csv_file>")
-    else:
-        file_path = sys.argv[1]
-        generate_eda(file_path)
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""
+Typed Dataset Loader
+====================================
+Shared CSV loader for eda.py and smartphone_analysis.py.
+
+- Explicit schema: categoricals for the string fields, int8/int16/float32
+  for the bounded numerics instead of inferred object/int64/float64.
+- Column pruning: callers ask only for the columns they use.
+- Columnar cache: the first parse is written next to the CSV (Parquet when
+  pyarrow is installed, pickle otherwise), keyed by file size, mtime and a
+  hash of the file's head/tail blocks. Re-runs read the cache instead of
+  re-parsing the CSV.
+
+Usage:
+    from loader import load_dataset
+    df = load_dataset("Smartphone_Usage_Productivity_Dataset_50000.csv",
+                      columns=["Occupation", "Stress_Level"])
+"""
+
+import hashlib
+import importlib.util
+import os
+
+# ── Schema ──────────────────────────────────────────────────────────────────
+SCHEMA = {
+    "User_ID":                   "string",
+    "Age":                       "int8",
+    "Gender":                    "category",
+    "Occupation":                "category",
+    "Device_Type":               "category",
+    "Daily_Phone_Hours":         "float32",
+    "Social_Media_Hours":        "float32",
+    "Work_Productivity_Score":   "int8",
+    "Sleep_Hours":               "float32",
+    "Stress_Level":              "int8",
+    "App_Usage_Count":           "int16",
+    "Caffeine_Intake_Cups":      "int8",
+    "Weekend_Screen_Time_Hours": "float32",
+}
+
+NUMERIC_COLUMNS = [c for c, t in SCHEMA.items() if t not in ("string", "category")]
+
+CACHE_DIRNAME = ".data_cache"
+_HASH_BLOCK   = 1 << 20          # bytes hashed from each end of the file
+
+DEFAULT_CHUNKSIZE = 200_000      # rows per chunk for streamed reads
+
+# pandas (and pyarrow) are imported on first read, not at import time, so CLI
+# entry points that only parse arguments stay fast.
+_CACHE_EXT = ".parquet" if importlib.util.find_spec("pyarrow") else ".pkl"
+
+
+# ── Cache key ─────────────────────────────────────────────────────────────
+def file_fingerprint(path):
+    """Cheap content key: size + mtime + blake2b of the first/last 1 MiB."""
+    st = os.stat(path)
+    h = hashlib.blake2b(digest_size=12)
+    h.update(f"{st.st_size}:{st.st_mtime_ns}".encode())
+    with open(path, "rb") as f:
+        h.update(f.read(_HASH_BLOCK))
+        if st.st_size > _HASH_BLOCK:
+            f.seek(max(st.st_size - _HASH_BLOCK, _HASH_BLOCK))
+            h.update(f.read(_HASH_BLOCK))
+    return h.hexdigest()
+
+
+def cache_path(path, cache_dir=None):
+    path = os.path.abspath(path)
+    cache_dir = cache_dir or os.path.join(os.path.dirname(path), CACHE_DIRNAME)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir, f"{stem}-{file_fingerprint(path)}{_CACHE_EXT}")
+
+
+# ── Read / write ──────────────────────────────────────────────────────────
+def read_csv_typed(path, columns=None, **kwargs):
+    """Parse the CSV with the explicit schema, keeping only `columns`."""
+    import pandas as pd
+    return pd.read_csv(path, usecols=columns, dtype=SCHEMA, **kwargs)
+
+
+def _read_cache(path, columns):
+    import pandas as pd
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path, columns=columns)
+    df = pd.read_pickle(path)
+    return df[columns] if columns is not None else df
+
+
+def _write_cache(df, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    if path.endswith(".parquet"):
+        df.to_parquet(tmp, index=False)
+    else:
+        df.to_pickle(tmp)
+    os.replace(tmp, path)
+
+
+def load_dataset(path, columns=None, cache=True, cache_dir=None):
+    """
+    Load the smartphone dataset with typed columns.
+
+    columns   : list of column names to return (all columns when None)
+    cache     : read / populate the columnar cache next to the CSV
+    cache_dir : override the cache location
+    """
+    columns = list(columns) if columns is not None else None
+    if not cache:
+        return read_csv_typed(path, columns)
+
+    target = cache_path(path, cache_dir)
+    if os.path.exists(target):
+        try:
+            return _read_cache(target, columns)
+        except Exception as exc:  # corrupt / incompatible cache → re-parse
+            print(f"Ignoring unreadable cache {target}: {exc}")
+
+    # Miss: parse every column once so any later report can be served.
+    df = read_csv_typed(path)
+    try:
+        _write_cache(df, target)
+    except OSError as exc:
+        print(f"Could not write cache {target}: {exc}")
+    return df[columns] if columns is not None else df
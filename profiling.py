@@ -0,0 +1,160 @@
+"""
+Stage Instrumentation
+====================================
+Opt-in timing / memory tracing for the report pipeline. Code marks stages
+with `profiling.stage("name")`; while no tracer is enabled that is a no-op.
+
+An enabled Tracer records per stage:
+    wall time, CPU time, process peak RSS
+    peak traced allocation       (memory=True, via tracemalloc)
+    cProfile + tracemalloc dumps (profile_dir=...), one file per stage
+
+and writes a Chrome-trace JSON (open in chrome://tracing, Perfetto or
+speedscope) with one complete event per stage, nested by time.
+
+Usage:
+    import profiling
+    tracer = profiling.enable(memory=True)
+    with profiling.stage("load"):
+        ...
+    tracer.write_chrome_trace("trace.json")
+"""
+
+import cProfile
+import json
+import os
+import re
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+_tracer = None
+
+
+def peak_rss_mb():
+    """Process high-water-mark RSS in MB."""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+# ── Module-level switch ───────────────────────────────────────────────────
+def enable(profile_dir=None, memory=False):
+    global _tracer
+    _tracer = Tracer(profile_dir=profile_dir, memory=memory)
+    return _tracer
+
+
+def disable():
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer is not None:
+        tracer.close()
+    return tracer
+
+
+def active():
+    return _tracer
+
+
+def stage(name, **args):
+    """Time a block as stage `name` when tracing is enabled; no-op otherwise."""
+    return _tracer.stage(name, **args) if _tracer is not None else nullcontext()
+
+
+# ── Tracer ────────────────────────────────────────────────────────────────
+class Tracer:
+    def __init__(self, profile_dir=None, memory=False):
+        self.events = []
+        self.profile_dir = profile_dir
+        self.memory = memory or profile_dir is not None
+        self._mem = []            # open stages: [traced at entry, peak so far]
+        self._profiling = False   # cProfile cannot nest; only the outermost stage profiles
+        self._seq = 0
+        if profile_dir:
+            os.makedirs(profile_dir, exist_ok=True)
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def close(self):
+        if self.memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    @contextmanager
+    def stage(self, name, **args):
+        self._seq += 1
+        seq = self._seq
+        ts, wall, cpu = time.time(), time.perf_counter(), time.process_time()
+
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._mem:
+                # credit the enclosing stage with its peak so far before resetting
+                self._mem[-1][1] = max(self._mem[-1][1], peak)
+            self._mem.append([current, current])
+            tracemalloc.reset_peak()
+        prof = None
+        if self.profile_dir and not self._profiling:
+            prof, self._profiling = cProfile.Profile(), True
+            prof.enable()
+        try:
+            yield self
+        finally:
+            if prof is not None:
+                prof.disable()
+                self._profiling = False
+            event_args = dict(args)
+            event_args["cpu_s"] = round(time.process_time() - cpu, 6)
+            event_args["peak_rss_mb"] = round(peak_rss_mb(), 1)
+            if self.memory:
+                current, peak = tracemalloc.get_traced_memory()
+                entry, own_peak = self._mem.pop()
+                own_peak = max(own_peak, peak)
+                event_args["peak_alloc_mb"] = round(own_peak / 2 ** 20, 2)
+                event_args["alloc_delta_mb"] = round((current - entry) / 2 ** 20, 2)
+                if self._mem:
+                    self._mem[-1][1] = max(self._mem[-1][1], own_peak)
+                tracemalloc.reset_peak()
+            if self.profile_dir:
+                base = os.path.join(self.profile_dir, f"{seq:03d}_{_slug(name)}")
+                if prof is not None:
+                    prof.dump_stats(base + ".prof")
+                if self.memory:
+                    tracemalloc.take_snapshot().dump(base + ".tracemalloc")
+            self.events.append({
+                "name": name,
+                "ph": "X",
+                "ts": int(ts * 1e6),
+                "dur": int((time.perf_counter() - wall) * 1e6),
+                "pid": os.getpid(),
+                "tid": threading.get_ident() % 2 ** 31,
+                "args": event_args,
+            })
+
+    # Output ──────────────────────────────────────────────────────────────
+    def extend(self, events):
+        """Add events recorded in another process (e.g. a render worker)."""
+        self.events.extend(events)
+
+    def write_chrome_trace(self, path):
+        with open(path, "w") as f:
+            json.dump({"traceEvents": sorted(self.events, key=lambda e: e["ts"]),
+                       "displayTimeUnit": "ms"}, f, indent=1)
+
+    def summary(self):
+        lines = [f"{'stage':<40}{'wall s':>9}{'cpu s':>9}{'RSS MB':>9}"
+                 + (f"{'alloc MB':>10}" if self.memory else "")]
+        for e in sorted(self.events, key=lambda e: e["ts"]):
+            a = e["args"]
+            line = (f"{e['name']:<40}{e['dur'] / 1e6:>9.3f}{a['cpu_s']:>9.3f}"
+                    f"{a['peak_rss_mb']:>9.1f}")
+            if "peak_alloc_mb" in a:
+                line += f"{a['peak_alloc_mb']:>10.1f}"
+            lines.append(line)
+        return "\n".join(lines)
+
+
+def _slug(name):
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", name)[:60]
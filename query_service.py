@@ -0,0 +1,321 @@
+"""
+Local Query Service
+====================================
+Small asyncio HTTP service answering JSON queries over the smartphone
+dataset, so dashboards can poll single numbers without re-running the report
+or re-parsing the CSV.
+
+- The data is loaded once at startup: the compact dataset (dataset.py) for
+  correlations and a cross-tab cube (cube.py, built from the same rows or
+  loaded from --cube) for roll-ups.
+- Identical queries in flight at the same time are coalesced: one
+  computation, every caller gets its result.
+- Answers are kept in an LRU cache keyed by the normalized query.
+- Queries run on a worker thread; the event loop keeps accepting requests.
+
+Endpoints (GET with query-string parameters, or POST /query with a JSON
+object; dimension names used as parameters slice the rows):
+    /rollup?by=Occupation&measure=Stress_Level&stat=mean&Gender=Female
+    /corr?Occupation=Student[&method=spearman][&column=Age&column=Sleep_Hours]
+    /query    {"kind": "rollup", "by": ["Occupation"], "where": {"Gender": "Female"}}
+    /stats    cache / coalescing counters
+    /health
+
+Run:
+    python query_service.py --data data.csv [--cube cube.npz] [--port 8766]
+    curl 'http://127.0.0.1:8766/rollup?by=Occupation&measure=Stress_Level&Gender=Female'
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import sys
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qs, urlsplit
+
+DEFAULT_HOST       = "127.0.0.1"
+DEFAULT_PORT       = 8766
+DEFAULT_CACHE_SIZE = 256
+
+_STATUS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           500: "Internal Server Error"}
+_LIST_PARAMS = {"by": "by", "measure": "measures", "stat": "stats", "column": "columns"}
+
+
+class QueryError(ValueError):
+    """A query the service cannot answer (reported as HTTP 400)."""
+
+
+# ── Query evaluation ──────────────────────────────────────────────────────
+def _clean(value):
+    """JSON-safe copy: NaN / inf -> None, NumPy scalars -> Python."""
+    if isinstance(value, dict):
+        return {k: _clean(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_clean(v) for v in value]
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+class QueryEngine:
+    """Answers normalized queries from a dataset and / or a cube (no caching)."""
+
+    def __init__(self, data=None, cube=None):
+        from cube import Cube
+        if data is None and cube is None:
+            raise ValueError("need a dataset or a cube")
+        self.data = data
+        self.cube = cube if cube is not None else Cube.from_frame(data)
+
+    def run(self, query):
+        kind = query.get("kind")
+        if kind == "rollup":
+            return self.rollup(query)
+        if kind == "corr":
+            return self.corr(query)
+        raise QueryError(f"unknown query kind {kind!r} (expected rollup or corr)")
+
+    def rollup(self, query):
+        from cube import STATS
+        try:
+            frame = self.cube.rollup(query.get("by", []), query.get("measures"),
+                                     query.get("stats") or STATS, **query.get("where", {}))
+        except (KeyError, ValueError) as exc:
+            raise QueryError(str(exc.args[0] if exc.args else exc)) from None
+        by = list(query.get("by", []))
+        rows = []
+        for key, *values in frame.itertuples(name=None):
+            key = key if isinstance(key, tuple) else (key,)
+            row = dict(zip(by, key))
+            for (measure, stat), value in zip(frame.columns, values):
+                row[measure if not stat else f"{measure}.{stat}"] = value
+            rows.append(row)
+        return {"rows": rows}
+
+    def corr(self, query):
+        from correlation import correlate_frame
+        from cube import where_mask
+        from loader import NUMERIC_COLUMNS
+
+        if self.data is None:
+            raise QueryError("correlations need the raw data (start with --data)")
+        method = query.get("method", "pearson")
+        if method not in ("pearson", "spearman"):
+            raise QueryError(f"unknown method {method!r}")
+        columns = query.get("columns") or [c for c in NUMERIC_COLUMNS if c in self.data]
+        unknown = [c for c in columns if c not in self.data]
+        if unknown:
+            raise QueryError(f"unknown column(s) {unknown}")
+        data = self.data
+        if query.get("where"):
+            try:
+                data = data.filter(where_mask(data, query["where"]))
+            except KeyError as exc:
+                raise QueryError(str(exc.args[0])) from None
+        if len(data) < 3:
+            raise QueryError(f"only {len(data)} rows match")
+        result = correlate_frame(data.to_frame(columns), columns, group_by=None)
+        return {"rows": len(data), "columns": columns,
+                **{stat: result.matrix(method, stat=stat).to_numpy().tolist()
+                   for stat in ("r", "n", "p")}}
+
+
+def normalize(query):
+    """Canonical form of a query dict; its JSON is the cache / coalescing key."""
+    from cube import DIMENSIONS
+
+    query = dict(query)
+    out = {"kind": query.pop("kind", "rollup")}
+    where = query.pop("where", None) or {}
+    if not isinstance(where, dict):
+        raise QueryError("where must be an object of dimension -> level(s)")
+    where = dict(where)
+    for name, value in list(query.items()):
+        if name in DIMENSIONS:               # shorthand: dimension=level
+            where[name] = query.pop(name)
+    for name in ("by", "measures", "stats", "columns"):
+        value = query.pop(name, None)
+        if value:
+            out[name] = [value] if isinstance(value, str) else list(value)
+    if "method" in query:
+        out["method"] = query.pop("method")
+    if query:
+        raise QueryError(f"unknown parameter(s) {sorted(query)}")
+    if where:
+        out["where"] = {}
+        for dim, levels in sorted(where.items()):
+            levels = [levels] if isinstance(levels, str) else levels
+            if (not isinstance(levels, list) or not levels
+                    or not all(isinstance(level, str) for level in levels)):
+                raise QueryError(f"where {dim}: expected a level name or a list of them")
+            levels = sorted(levels)
+            out["where"][dim] = levels[0] if len(levels) == 1 else levels
+    return out
+
+
+def query_from_params(path, params):
+    """GET /rollup?... or /corr?... -> query dict (repeated keys become lists)."""
+    query = {"kind": path.strip("/")}
+    for name, values in parse_qs(params, keep_blank_values=False).items():
+        if name in _LIST_PARAMS:
+            query[_LIST_PARAMS[name]] = values
+        else:
+            query[name] = values[0] if len(values) == 1 else values
+    return query
+
+
+# ── Service: coalescing + LRU ─────────────────────────────────────────────
+class QueryService:
+    def __init__(self, engine, cache_size=DEFAULT_CACHE_SIZE):
+        self.engine = engine
+        self.cache_size = cache_size
+        self.cache = OrderedDict()          # key -> JSON-safe result
+        self.inflight = {}                  # key -> asyncio.Future
+        self.counters = {"queries": 0, "computed": 0, "cache_hits": 0, "coalesced": 0,
+                         "errors": 0}
+
+    async def answer(self, query):
+        """(result, source) with source "cache", "coalesced" or "computed"."""
+        query = normalize(query)
+        key = json.dumps(query, sort_keys=True)
+        self.counters["queries"] += 1
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            self.counters["cache_hits"] += 1
+            return self.cache[key], "cache"
+        if key in self.inflight:
+            self.counters["coalesced"] += 1
+            return await asyncio.shield(self.inflight[key]), "coalesced"
+
+        loop = asyncio.get_running_loop()
+        future = self.inflight[key] = loop.create_future()
+        try:
+            result = _clean(await loop.run_in_executor(None, self.engine.run, query))
+        except Exception as exc:
+            future.set_exception(exc)
+            future.exception()          # mark retrieved when nobody else waits
+            raise
+        else:
+            future.set_result(result)
+            self.counters["computed"] += 1
+            self.cache[key] = result
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+            return result, "computed"
+        finally:
+            del self.inflight[key]
+            if not future.done():       # cancelled (client gone, shutdown): release waiters
+                future.set_exception(RuntimeError("query cancelled before it finished; retry"))
+                future.exception()
+
+    def stats(self):
+        return {**self.counters, "cached": len(self.cache), "cache_size": self.cache_size,
+                "inflight": len(self.inflight)}
+
+    # HTTP ────────────────────────────────────────────────────────────────
+    async def dispatch(self, method, target, body):
+        url = urlsplit(target)
+        if url.path == "/health":
+            return 200, {"ok": True}
+        if url.path == "/stats":
+            return 200, {"ok": True, **self.stats()}
+        if url.path in ("/rollup", "/corr"):
+            if method != "GET":
+                return 405, {"ok": False, "error": f"use GET for {url.path}"}
+            query = query_from_params(url.path, url.query)
+        elif url.path == "/query":
+            if method != "POST":
+                return 405, {"ok": False, "error": "POST a JSON query to /query"}
+            query = json.loads(body or b"{}")
+            if not isinstance(query, dict):
+                raise QueryError("the query must be a JSON object")
+        else:
+            return 404, {"ok": False, "error": f"no endpoint {url.path}"}
+        start = time.perf_counter()
+        result, source = await self.answer(query)
+        return 200, {"ok": True, "source": source,
+                     "ms": round((time.perf_counter() - start) * 1e3, 3), "result": result}
+
+    async def handle(self, reader, writer):
+        """One HTTP/1.1 connection; requests are served until it closes."""
+        try:
+            while True:
+                request = await reader.readline()
+                if not request.strip():
+                    break
+                method, target, _ = request.decode("latin-1").split(" ", 2)
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                body = await reader.readexactly(length) if length else b""
+                try:
+                    status, payload = await self.dispatch(method, target, body)
+                except (QueryError, json.JSONDecodeError) as exc:
+                    self.counters["errors"] += 1
+                    status, payload = 400, {"ok": False, "error": str(exc)}
+                except Exception as exc:
+                    self.counters["errors"] += 1
+                    status, payload = 500, {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+                data = json.dumps(payload).encode()
+                close = headers.get("connection", "").lower() == "close"
+                writer.write(f"HTTP/1.1 {status} {_STATUS[status]}\r\n"
+                             f"Content-Type: application/json\r\n"
+                             f"Content-Length: {len(data)}\r\n"
+                             f"Connection: {'close' if close else 'keep-alive'}\r\n\r\n"
+                             .encode() + data)
+                await writer.drain()
+                if close:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"Serving queries on http://{host}:{port}", file=sys.stderr)
+        async with server:
+            await server.serve_forever()
+
+
+def load_engine(data_path=None, cube_path=None):
+    from cube import Cube
+    from dataset import load_compact
+
+    data = load_compact(data_path) if data_path else None
+    cube = Cube.load(cube_path) if cube_path else None
+    return QueryEngine(data, cube)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local JSON query service over the dataset.")
+    parser.add_argument("--data", default=None, help="input CSV (needed for /corr)")
+    parser.add_argument("--cube", default=None, help="saved cube (cube.py build) for /rollup")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE,
+                        help=f"answers kept in the LRU cache (default {DEFAULT_CACHE_SIZE})")
+    args = parser.parse_args(argv)
+    if not args.data and not args.cube:
+        parser.error("give --data and/or --cube")
+
+    start = time.perf_counter()
+    engine = load_engine(args.data, args.cube)
+    print(f"Loaded {engine.cube.n_rows} rows in {time.perf_counter() - start:.2f}s",
+          file=sys.stderr)
+    service = QueryService(engine, cache_size=args.cache_size)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Incremental Report Cache
+====================================
+Dependency-aware cache for smartphone_analysis.py.
+
+- Aggregates: each entry of aggregates.AGGREGATE_INPUTS is keyed by the
+  content hash of its input columns (plus the aggregation code), so only
+  aggregates whose inputs changed are recomputed.
+- Pages: each page declares the aggregates it consumes; its rendered PDF
+  fragment is keyed by the page's source, the source of report_pages.py
+  (helpers, constants and style code the page draws with) and cohorts.py
+  (verdict thresholds and labels), and the values
+  of those aggregates, so only affected pages are re-rendered.
+
+Layout:
+    <cache_dir>/aggregates/<name>-<key>.pkl
+    <cache_dir>/pages/<page>-<key>.pdf   (+ .png when PNGs are requested)
+"""
+
+import glob
+import hashlib
+import inspect
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+import aggregates
+import cohorts
+from aggregates import AGGREGATE_INPUTS, ReportAggregates, compute_aggregates
+from profiling import stage
+
+
+# ── Hashing ───────────────────────────────────────────────────────────────
+def digest(*parts):
+    h = hashlib.blake2b(digest_size=12)
+    for part in parts:
+        h.update(part if isinstance(part, bytes) else str(part).encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def column_hash(series):
+    """Content hash of one column, independent of its storage dtype."""
+    return digest(pd.util.hash_pandas_object(series, index=False).to_numpy().tobytes())
+
+
+def value_hash(value):
+    """Content hash of an aggregate value (Series / DataFrame / array / scalar)."""
+    if isinstance(value, (pd.Series, pd.DataFrame)):
+        return digest(pd.util.hash_pandas_object(value).to_numpy().tobytes(),
+                      list(value.index), getattr(value, "columns", None))
+    if isinstance(value, np.ndarray):              # repr() elides large arrays
+        return digest(np.ascontiguousarray(value).tobytes(), value.shape, value.dtype)
+    return digest(repr(value))
+
+
+# ── Cache ─────────────────────────────────────────────────────────────────
+class ReportCache:
+    def __init__(self, cache_dir):
+        self.agg_dir = os.path.join(cache_dir, "aggregates")
+        self.page_dir = os.path.join(cache_dir, "pages")
+        os.makedirs(self.agg_dir, exist_ok=True)
+        os.makedirs(self.page_dir, exist_ok=True)
+        self._code = digest(inspect.getsource(aggregates), inspect.getsource(cohorts))
+
+    # Aggregates ──────────────────────────────────────────────────────────
+    def aggregates(self, df, occs, genders=aggregates.GENDERS):
+        """Return ReportAggregates, recomputing only entries whose inputs changed."""
+        with stage("hash_columns"):
+            col_hashes = {c: column_hash(df[c])
+                          for c in sorted({c for cols in AGGREGATE_INPUTS.values() for c in cols})}
+        values, missing = {}, []
+        for name, cols in AGGREGATE_INPUTS.items():
+            key = digest(self._code, name, occs, genders, *(col_hashes[c] for c in cols))
+            path = self._path(self.agg_dir, name, key, "pkl")
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    values[name] = pickle.load(f)
+            else:
+                missing.append((name, path))
+
+        if missing:
+            fresh = compute_aggregates(df, occs, genders, names=[n for n, _ in missing])
+            for name, path in missing:
+                values[name] = getattr(fresh, name)
+                self._store(self.agg_dir, name, path,
+                            lambda f, v=values[name]: pickle.dump(v, f))
+        print(f"Aggregates: {len(missing)} computed, "
+              f"{len(AGGREGATE_INPUTS) - len(missing)} reused from cache")
+        return ReportAggregates(n_rows=len(df), **values)
+
+    # Pages ───────────────────────────────────────────────────────────────
+    def page_key(self, page, agg, shared=""):
+        inputs = getattr(page, "inputs", ())
+        return digest(inspect.getsource(page), shared,
+                      *(value_hash(getattr(agg, name)) for name in inputs))
+
+    def page_path(self, page, key, ext="pdf"):
+        return self._path(self.page_dir, page.__name__, key, ext)
+
+    def has_page(self, page, key, png=False):
+        return (os.path.exists(self.page_path(page, key))
+                and (not png or os.path.exists(self.page_path(page, key, "png"))))
+
+    def prune_pages(self, page, key):
+        """Drop fragments of `page` rendered for any other key."""
+        keep = {self.page_path(page, key), self.page_path(page, key, "png")}
+        for path in glob.glob(os.path.join(self.page_dir, f"{page.__name__}-*")):
+            if path not in keep:
+                os.remove(path)
+
+    # Helpers ─────────────────────────────────────────────────────────────
+    @staticmethod
+    def _path(directory, name, key, ext):
+        return os.path.join(directory, f"{name}-{key}.{ext}")
+
+    @staticmethod
+    def _store(directory, name, path, write):
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            write(f)
+        os.replace(tmp, path)
+        for stale in glob.glob(os.path.join(directory, f"{name}-*")):
+            if stale != path:
+                os.remove(stale)
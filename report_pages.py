@@ -0,0 +1,849 @@
+"""
+Report Pages & Rendering
+====================================
+The nine figures of the smartphone usage & stress report, built from
+precomputed aggregates (aggregates.ReportAggregates), and the PDF / PNG
+rendering around them: serial, pooled single-page fragments, or cached
+fragments (report_cache.ReportCache).
+
+Per-respondent distributions arrive pre-binned and are drawn as one mesh
+that is rasterized at RASTER_DPI inside the otherwise vector PDF, so page
+size and save time do not depend on the row count. PDF pages and PNGs are
+both saved at their full figure size in one draw (no bbox_inches='tight'
+measuring pass); a page's PNG is written by the same pool worker that
+writes its PDF fragment.
+
+This is the heavy half of smartphone_analysis.py (pandas, NumPy,
+matplotlib); the CLI imports it only once a report is actually built.
+
+Usage:
+    from report_pages import render_report
+    render_report(agg, "report.pdf", jobs=4, png_dir="charts")
+"""
+
+import inspect
+import io
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import matplotlib.pyplot as plt
+import matplotlib.patches as mpatches
+import matplotlib.gridspec as gridspec
+from matplotlib.colors import LinearSegmentedColormap
+from matplotlib.patches import FancyBboxPatch, PathPatch
+from matplotlib.path import Path
+from matplotlib.backends.backend_pdf import PdfPages
+from aggregates import DENSITY_X, DENSITY_Y, OCC_METRICS, PROFILE_COLS, STRESS_GROUPS
+import cohorts
+from cohorts import effect_label, meaningful
+from loader import SCHEMA
+import profiling
+import warnings
+warnings.filterwarnings("ignore")
+
+try:
+    from pypdf import PdfWriter
+except ImportError:
+    PdfWriter = None
+
+# ── Config ──────────────────────────────────────────────────────────────────
+REPORT_COLUMNS = ["Occupation", "Gender", "Daily_Phone_Hours", "Social_Media_Hours",
+                  "Sleep_Hours", "Stress_Level", "Caffeine_Intake_Cups",
+                  "Weekend_Screen_Time_Hours"]
+
+PNG_DPI    = 150
+RASTER_DPI = 200     # rasterized artists (density meshes) inside the PDF
+
+DARK   = "#0d0f14"
+SURF   = "#141720"
+SURF2  = "#1c2030"
+BORDER = "#252a3a"
+TEXT   = "#e8eaf0"
+MUTED  = "#7a8099"
+
+C_ORG  = "#f97316"
+C_BLUE = "#38bdf8"
+C_PURP = "#a78bfa"
+C_GRN  = "#34d399"
+C_RED  = "#fb7185"
+
+OCCS   = ["Business Owner", "Freelancer", "Professional", "Student"]
+COLORS = [C_ORG, C_BLUE, C_PURP, C_GRN]
+OCC_ICONS = {"Student": "🎓", "Business Owner": "💼", "Freelancer": "☕", "Professional": "💻"}
+DENSITY_COLORS = [SURF2, C_PURP, C_ORG, "#fde68a"]
+DENSITY_CMAP = LinearSegmentedColormap.from_list("report_density", DENSITY_COLORS)
+
+# Radar axis label -> per-occupation aggregate
+RADAR_METRICS = {
+    "Phone Hours":  "phone_occ",
+    "Social Media": "social_occ",
+    "Stress":       "stress_occ",
+    "Caffeine":     "caff_occ",
+    "Sleep":        "sleep_occ",
+}
+
+# ── Style sheet & figure templates ──────────────────────────────────────
+# The dark theme is an rcParams sheet: every axes, tick, grid line and legend
+# comes out styled when it is created, so pages only draw their data. Pages
+# run inside report_style(); figures start from pickled templates built once
+# per process and reused by every page and every (segment) report after it.
+STYLE_SHEET = {
+    "figure.facecolor":  DARK,
+    "savefig.facecolor": DARK,
+    "axes.facecolor":    SURF,
+    "axes.edgecolor":    BORDER,
+    "axes.labelcolor":   MUTED,
+    "axes.titlecolor":   TEXT,
+    "axes.grid":         True,
+    "axes.grid.axis":    "y",
+    "axes.axisbelow":    True,
+    "grid.color":        BORDER,
+    "grid.linewidth":    0.6,
+    "grid.alpha":        0.7,
+    "xtick.color":       MUTED,
+    "ytick.color":       MUTED,
+    "xtick.labelsize":   9,
+    "ytick.labelsize":   9,
+    "legend.facecolor":  SURF2,
+    "legend.edgecolor":  BORDER,
+    "legend.labelcolor": TEXT,
+}
+
+def report_style():
+    """Context manager applying STYLE_SHEET on top of the current rcParams."""
+    return plt.rc_context(STYLE_SHEET)
+
+def _recommendations_layout():
+    fig = plt.figure(figsize=(14, 8))
+    gs = gridspec.GridSpec(2, 2, figure=fig, hspace=0.55, wspace=0.35,
+                           top=0.88, bottom=0.05, left=0.08, right=0.95)
+    fig.add_subplot(gs[0, :])
+    return fig
+
+# template name -> builder of the empty, styled figure
+TEMPLATES = {
+    "cover":           lambda: plt.figure(figsize=(14, 9)),
+    "single":          lambda: plt.subplots(figsize=(14, 6))[0],
+    "pair":            lambda: plt.subplots(1, 2, figsize=(14, 6))[0],
+    "radar":           lambda: plt.figure(figsize=(14, 7)).add_subplot(111, polar=True).figure,
+    "recommendations": _recommendations_layout,
+}
+_TEMPLATE_CACHE = {}
+
+def new_figure(template):
+    """Fresh copy of a figure template: (fig, its axes)."""
+    blob = _TEMPLATE_CACHE.get(template)
+    if blob is None:
+        with report_style():
+            fig = TEMPLATES[template]()
+        blob = _TEMPLATE_CACHE[template] = pickle.dumps(fig)
+        plt.close(fig)
+    fig = pickle.loads(blob)
+    return fig, fig.axes
+
+def cards(fig, boxes, edgecolors, linewidth=1):
+    """
+    Rounded SURF2 cards at figure-fraction (x, y, w, h) boxes: one compound
+    path per edge colour instead of one patch per card.
+    """
+    if isinstance(edgecolors, str):
+        edgecolors = [edgecolors] * len(boxes)
+    outlines = {}
+    for (x, y, w, h), edge in zip(boxes, edgecolors):
+        box = FancyBboxPatch((x, y), w, h, boxstyle="round,pad=0.01")
+        outlines.setdefault(edge, []).append(box.get_path())
+    for edge, paths in outlines.items():
+        fig.add_artist(PathPatch(Path.make_compound_path(*paths), facecolor=SURF2,
+                                 edgecolor=edge, linewidth=linewidth,
+                                 transform=fig.transFigure, zorder=2))
+
+def add_subtitle(ax, text):
+    ax.text(0, 1.04, text, transform=ax.transAxes,
+            fontsize=8.5, color=MUTED, va='bottom')
+
+def fig_title(fig, title, subtitle=""):
+    fig.text(0.5, 0.97, title, ha='center', va='top',
+             fontsize=16, fontweight='bold', color=TEXT, fontfamily='monospace')
+    if subtitle:
+        fig.text(0.5, 0.935, subtitle, ha='center', va='top',
+                 fontsize=9, color=MUTED)
+
+def density_mesh(ax, counts, xspec, yspec):
+    """
+    Pre-binned 2-D counts (aggregates.DENSITY_X × DENSITY_Y) as one
+    rasterized mesh; empty cells stay transparent. Returns the mesh.
+    """
+    (_, x0, x1, nx), (_, y0, y1, ny) = xspec, yspec
+    mesh = ax.pcolormesh(np.linspace(x0, x1, nx + 1), np.linspace(y0, y1, ny + 1),
+                         np.ma.masked_equal(counts.T, 0), cmap=DENSITY_CMAP,
+                         rasterized=True)
+    ax.grid(False)
+    return mesh
+
+# ── Data-driven text & scale helpers ──────────────────────────────────────
+def plural(occ):
+    return occ + "s"
+
+def zoom_limits(values, rel=0.03, floor=None):
+    """Axis limits hugging `values`, padded by their spread (at least rel × max)."""
+    values = np.asarray(values, dtype=float)
+    lo, hi = np.nanmin(values), np.nanmax(values)
+    pad = max(hi - lo, rel * abs(hi), 1e-9)
+    lo = lo - pad if floor is None else max(floor, lo - pad)
+    return lo, hi + pad
+
+def occupied_limits(counts, spec, pad=1):
+    """Axis limits around the non-empty bins of `counts` (summed over other axes)."""
+    _, lo, hi, bins = spec
+    filled = np.flatnonzero(counts)
+    if not len(filled):
+        return lo, hi
+    width = (hi - lo) / bins
+    return (lo + max(filled[0] - pad, 0) * width,
+            lo + min(filled[-1] + 1 + pad, bins) * width)
+
+def cohort_verdict(test, names):
+    """One-line claim about high vs low stress, backed by agg.cohort_test."""
+    if test is None:
+        return "★  Compare profiles with cohorts.py before drawing conclusions."
+    hits = meaningful(test)
+    ci = f"{test.attrs['ci']:.0%}"
+    if not hits:
+        worst = test["g"].abs().max()
+        return (f"★  Near-identical profiles: every gap is {effect_label(worst)} "
+                f"(|g| ≤ {worst:.3f}, Welch/Holm p ≥ {test['p_holm'].min():.2f}; "
+                f"{ci} bootstrap CIs) — stress reduction requires holistic lifestyle "
+                f"changes, not just screen-time reduction.")
+    parts = [f"{names[m]} (g = {test.at[m, 'g']:+.2f}, {ci} CI "
+             f"{test.at[m, 'diff_lo']:+.2f} to {test.at[m, 'diff_hi']:+.2f})" for m in hits]
+    return f"★  High-stress respondents differ on {', '.join(parts)}."
+
+def is_uniform(counts, tol=0.05):
+    counts = np.asarray(counts, dtype=float)
+    return counts.std() <= tol * counts.mean()
+
+# ── Pages ─────────────────────────────────────────────────────────────────
+# Each page is an independent figure built only from the precomputed
+# aggregates, so pages can be rendered in any process and in any order.
+# @uses declares which aggregates a page reads (keys the page cache).
+def uses(*names):
+    def register(page):
+        page.inputs = names
+        return page
+    return register
+
+# ════════════════════════════════════════════════════════
+# PAGE 1 — Cover / Dataset Overview
+# ════════════════════════════════════════════════════════
+@uses("n_rows", "occ_counts", "overall")
+def page_cover(agg):
+    mean = agg.overall["mean"]
+    n_occ = int((agg.occ_counts > 0).sum())
+    fig, _ = new_figure("cover")
+    fig.text(0.5, 0.7, "Smartphone Usage &", ha='center', fontsize=36,
+             fontweight='bold', color=TEXT, fontfamily='monospace')
+    fig.text(0.5, 0.6, "Stress Reduction Analysis", ha='center', fontsize=36,
+             fontweight='bold', color=C_ORG, fontfamily='monospace')
+    fig.text(0.5, 0.5, f"{agg.n_rows:,} respondents  ·  {n_occ} occupations  ·  "
+                       f"{len(SCHEMA)} variables tracked",
+             ha='center', fontsize=12, color=MUTED)
+
+    stats = [
+        (f"{agg.n_rows:,}",                             "Respondents"),
+        (f"{n_occ}",                                    "Occupations"),
+        (f"~{mean['Daily_Phone_Hours']:.1f}h",          "Avg Phone / Day"),
+        (f"{mean['Stress_Level']:.1f}/10",              "Avg Stress Level"),
+        (f"~{mean['Social_Media_Hours']:.1f}h",         "Social Media / Day"),
+        (f"{mean['Sleep_Hours']:.1f}h",                 "Avg Sleep"),
+    ]
+    xy = [(0.2 + (i % 3) * 0.28, 0.28 if i < 3 else 0.12) for i in range(len(stats))]
+    cards(fig, [(x-0.08, y-0.04, 0.20, 0.10) for x, y in xy], BORDER)
+    for (x, y), (val, lbl) in zip(xy, stats):
+        fig.text(x + 0.02, y + 0.042, val, ha='center', fontsize=18,
+                 fontweight='bold', color=C_ORG, fontfamily='monospace', zorder=3)
+        fig.text(x + 0.02, y + 0.005, lbl, ha='center', fontsize=9,
+                 color=MUTED, zorder=3)
+
+    return fig
+
+
+# ════════════════════════════════════════════════════════
+# PAGE 2 — Occupation Distribution (Pie) + Phone Usage (Bar)
+# ════════════════════════════════════════════════════════
+@uses("occ_counts", "phone_occ")
+def page_occupation(agg):
+    occ_counts = agg.occ_counts
+    phone_occ = agg.phone_occ
+    fig, axes = new_figure("pair")
+    fig_title(fig, "Who Uses Their Phone the Most?",
+              "Dataset composition and average daily phone hours by occupation")
+
+    # --- Donut / Pie ---
+    ax = axes[0]
+    ax.set_facecolor(DARK)
+    for spine in ax.spines.values(): spine.set_visible(False)
+    ax.set_xticks([]); ax.set_yticks([])
+
+    wedges, texts, autotexts = ax.pie(
+        occ_counts,
+        labels=OCCS,
+        autopct='%1.1f%%',
+        colors=COLORS,
+        startangle=140,
+        wedgeprops=dict(width=0.55, edgecolor=DARK, linewidth=3),
+        textprops=dict(color=TEXT, fontsize=10),
+        pctdistance=0.75
+    )
+    for at in autotexts:
+        at.set_color(DARK); at.set_fontweight('bold'); at.set_fontsize(9)
+    ax.set_title("Respondent Share by Occupation", color=TEXT, pad=14, fontsize=12, fontweight='bold')
+    share = occ_counts / occ_counts.sum() * 100
+    if share.max() - share.min() < 5:
+        add_subtitle(ax, f"Nearly equal distribution — ~{share.mean():.0f}% each")
+    else:
+        add_subtitle(ax, f"{plural(share.idxmax())} largest group ({share.max():.0f}%)")
+
+    # --- Horizontal bar: phone hours ---
+    ax = axes[1]
+    bars = ax.barh(OCCS, phone_occ.values, color=COLORS, edgecolor=DARK, linewidth=1.5, height=0.5)
+    ax.set_xlim(*zoom_limits(phone_occ))
+    ax.set_xlabel("Average Daily Phone Hours", color=MUTED)
+    ax.set_title("Avg Daily Phone Hours by Occupation", color=TEXT, pad=14, fontsize=12, fontweight='bold')
+    if phone_occ.max() - phone_occ.min() < 0.5:
+        add_subtitle(ax, f"{plural(phone_occ.idxmax())} lead; all groups remarkably similar "
+                         f"(~{phone_occ.mean():.1f} hrs)")
+    else:
+        add_subtitle(ax, f"{plural(phone_occ.idxmax())} lead at {phone_occ.max():.2f} hrs; "
+                         f"{plural(phone_occ.idxmin())} lowest at {phone_occ.min():.2f} hrs")
+    for bar, val in zip(bars, phone_occ.values):
+        ax.text(val + 0.002, bar.get_y() + bar.get_height()/2,
+                f'{val:.2f}h', va='center', ha='left', color=TEXT, fontsize=10, fontweight='bold')
+    ax.tick_params(axis='y', colors=TEXT, labelsize=10)
+    ax.invert_yaxis()
+
+    fig.tight_layout(rect=[0, 0, 1, 0.92])
+
+    return fig
+
+
+# ════════════════════════════════════════════════════════
+# PAGE 3 — Social Media vs Phone Hours (Grouped Bar)
+# ════════════════════════════════════════════════════════
+@uses("phone_occ", "social_occ")
+def page_social_media(agg):
+    phone_occ = agg.phone_occ
+    social_occ = agg.social_occ
+    fig, (ax,) = new_figure("single")
+    fig_title(fig, "Social Media Hours vs Daily Phone Hours",
+              f"{plural(social_occ.idxmax())} spend the most time on social media "
+              f"({social_occ.max():.2f} hrs/day)")
+
+    x = np.arange(len(OCCS))
+    w = 0.35
+    b1 = ax.bar(x - w/2, phone_occ.values,  width=w, color=COLORS, edgecolor=DARK, linewidth=1.5, label='Daily Phone Hours')
+    b2 = ax.bar(x + w/2, social_occ.values, width=w, color=[c + '88' for c in ['#f97316','#38bdf8','#a78bfa','#34d399']],
+                edgecolor=DARK, linewidth=1.5, label='Social Media Hours')
+
+    ax.set_xticks(x); ax.set_xticklabels(OCCS, color=TEXT, fontsize=11)
+    ax.set_ylabel("Hours per Day", color=MUTED)
+    ax.set_ylim(0, max(phone_occ.max(), social_occ.max()) * 1.35)
+    for bar in b1:
+        ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.08,
+                f'{bar.get_height():.2f}', ha='center', color=TEXT, fontsize=9, fontweight='bold')
+    for bar in b2:
+        ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.08,
+                f'{bar.get_height():.2f}', ha='center', color=TEXT, fontsize=9, fontweight='bold')
+
+    ax.legend(fontsize=10)
+    social_share = social_occ.sum() / phone_occ.sum()
+    ax.annotate(f"Social media accounts for\n~{social_share:.0%} of total phone usage",
+                xy=(len(OCCS) - 1.5, phone_occ.mean()),
+                xytext=(len(OCCS) - 1.2, phone_occ.mean() * 1.2),
+                arrowprops=dict(arrowstyle='->', color=C_ORG, lw=1.5),
+                color=C_ORG, fontsize=9, fontweight='bold')
+
+    fig.tight_layout(rect=[0, 0, 1, 0.92])
+
+    return fig
+
+
+# ════════════════════════════════════════════════════════
+# PAGE 4 — Stress by Occupation + Stress Distribution
+# ════════════════════════════════════════════════════════
+@uses("stress_occ", "stress_dist")
+def page_stress(agg):
+    stress_occ = agg.stress_occ
+    stress_dist = agg.stress_dist
+    fig, axes = new_figure("pair")
+    uniform = is_uniform(stress_dist.values)
+    fig_title(fig, "Stress Level Analysis",
+              f"{plural(stress_occ.idxmax())} carry the highest stress; "
+              + ("stress is uniformly distributed across the population" if uniform
+                 else f"stress level {stress_dist.idxmax()} is the most common"))
+
+    # Bar: stress by occupation
+    ax = axes[0]
+    bars = ax.bar(OCCS, stress_occ.values, color=COLORS, edgecolor=DARK, linewidth=1.5, width=0.5)
+    ax.set_ylim(*zoom_limits(stress_occ, rel=0.02))
+    ax.set_ylabel("Average Stress Level (1–10)", color=MUTED)
+    ax.set_title("Avg Stress by Occupation", color=TEXT, pad=14, fontsize=12, fontweight='bold')
+    add_subtitle(ax, f"{plural(stress_occ.idxmax())} highest ({stress_occ.max():.2f}); "
+                     f"{plural(stress_occ.idxmin())} lowest ({stress_occ.min():.2f})")
+    ax.tick_params(axis='x', colors=TEXT, labelsize=10, rotation=10)
+    for bar, val in zip(bars, stress_occ.values):
+        ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.003,
+                f'{val:.2f}', ha='center', color=TEXT, fontsize=11, fontweight='bold')
+    # Highlight the most stressed occupation
+    top = int(np.nanargmax(stress_occ.values))
+    bars[top].set_edgecolor(C_RED); bars[top].set_linewidth(2.5)
+
+    # Bar: stress distribution
+    ax = axes[1]
+    stress_colors = [C_GRN if lvl <= 3 else C_ORG if lvl <= 6 else C_RED
+                     for lvl in stress_dist.index]
+    ax.bar(stress_dist.index, stress_dist.values, color=stress_colors,
+           edgecolor=DARK, linewidth=1.5, width=0.7)
+    ax.set_xlabel("Stress Level", color=MUTED)
+    ax.set_ylabel("Number of Respondents", color=MUTED)
+    ax.set_title("Stress Distribution — All Respondents", color=TEXT, pad=14, fontsize=12, fontweight='bold')
+    if uniform:
+        add_subtitle(ax, "Uniform distribution: stress is not concentrated — it affects everyone")
+    else:
+        add_subtitle(ax, f"Most common level: {stress_dist.idxmax()} "
+                         f"({stress_dist.max() / stress_dist.sum():.0%} of respondents)")
+    ax.set_ylim(*zoom_limits(stress_dist.values, rel=0.05, floor=0))
+    ax.set_xticks(stress_dist.index)
+    legend_handles = [
+        mpatches.Patch(color=C_GRN,  label='Low (1–3)'),
+        mpatches.Patch(color=C_ORG,  label='Medium (4–6)'),
+        mpatches.Patch(color=C_RED,  label='High (7–10)'),
+    ]
+    ax.legend(handles=legend_handles, fontsize=9)
+
+    fig.tight_layout(rect=[0, 0, 1, 0.92])
+
+    return fig
+
+
+# ════════════════════════════════════════════════════════
+# PAGE 5 — Stress by Gender & Occupation (Grouped Bar)
+# ════════════════════════════════════════════════════════
+@uses("stress_gender")
+def page_gender(agg):
+    stress_gender = agg.stress_gender
+    fig, (ax,) = new_figure("single")
+    cells = stress_gender.stack()
+    (hi_occ, hi_g), (lo_occ, lo_g) = cells.idxmax(), cells.idxmin()
+    fig_title(fig, "Stress Level by Occupation & Gender",
+              f"{hi_g} {plural(hi_occ)} report highest stress ({cells.max():.2f}); "
+              f"{lo_g} {plural(lo_occ)} lowest ({cells.min():.2f})")
+
+    x = np.arange(len(OCCS))
+    w = 0.26
+    gcols = ['#f472b6', '#38bdf8', '#a78bfa']
+    genders = list(stress_gender.columns)
+    offsets = [-w, 0, w]
+    for g, c, off in zip(genders, gcols, offsets):
+        vals = [stress_gender.loc[occ, g] for occ in OCCS]
+        bars = ax.bar(x + off, vals, width=w, color=c, edgecolor=DARK, linewidth=1.2, label=g)
+        for bar, v in zip(bars, vals):
+            ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.003,
+                    f'{v:.2f}', ha='center', va='bottom', color=TEXT, fontsize=8)
+
+    ax.set_xticks(x); ax.set_xticklabels(OCCS, color=TEXT, fontsize=11)
+    ax.set_ylim(*zoom_limits(stress_gender.values, rel=0.02))
+    ax.set_ylabel("Average Stress Level", color=MUTED)
+    ax.legend(fontsize=10)
+
+    fig.tight_layout(rect=[0, 0, 1, 0.92])
+
+    return fig
+
+
+# ════════════════════════════════════════════════════════
+# PAGE 6 — Radar Chart
+# ════════════════════════════════════════════════════════
+@uses(*RADAR_METRICS.values(), "overall")
+def page_radar(agg):
+    fig, (ax,) = new_figure("radar")
+    fig_title(fig, "Multi-Metric Radar — Occupation Profiles",
+              "Normalized comparison of Phone Hours, Social Media, Stress, Caffeine, Sleep")
+
+    # occupation × metric means, min/max-normalized to 0–10 over the
+    # observed range of each metric across all respondents
+    labels = list(RADAR_METRICS)
+    raw = np.column_stack([getattr(agg, name).to_numpy() for name in RADAR_METRICS.values()])
+    columns = [OCC_METRICS[name] for name in RADAR_METRICS.values()]
+    norms_min = agg.overall.loc[columns, "min"].to_numpy()
+    norms_max = agg.overall.loc[columns, "max"].to_numpy()
+    span = np.where(norms_max > norms_min, norms_max - norms_min, 1.0)
+    norm = (raw - norms_min) / span * 10
+
+    N = len(labels)
+    angles = np.linspace(0, 2*np.pi, N, endpoint=False).tolist()
+    angles += angles[:1]
+
+    ax.set_xticks(angles[:-1])
+    ax.set_xticklabels(labels, color=TEXT, fontsize=11)
+    ax.yaxis.set_tick_params(labelsize=7)
+    ax.set_ylim(0, 10)
+    ax.set_yticks([2,4,6,8,10])
+    ax.set_yticklabels(['2','4','6','8','10'], fontsize=7)
+
+    for occ, col, row in zip(OCCS, COLORS, norm):
+        vals = row.tolist()
+        vals += vals[:1]
+        ax.plot(angles, vals, color=col, linewidth=2, label=occ)
+        ax.fill(angles, vals, color=col, alpha=0.08)
+        ax.scatter(angles[:-1], vals[:-1], color=col, s=40, zorder=5)
+
+    ax.legend(loc='upper right', bbox_to_anchor=(1.35, 1.1), fontsize=10)
+
+    fig.tight_layout(rect=[0, 0, 1, 0.92])
+
+    return fig
+
+
+# ════════════════════════════════════════════════════════
+# PAGE 7 — Caffeine & Sleep + Weekend vs Weekday
+# ════════════════════════════════════════════════════════
+@uses("caff_occ", "sleep_occ", "wkdy_stress", "wknd_stress")
+def page_caffeine_weekend(agg):
+    caff_occ = agg.caff_occ
+    sleep_occ = agg.sleep_occ
+    wkdy_stress = agg.wkdy_stress
+    wknd_stress = agg.wknd_stress
+    fig, axes = new_figure("pair")
+    wknd_top = wknd_stress.idxmax().split()[0]
+    fig_title(fig, "Caffeine, Sleep & Screen Time by Stress Group",
+              f"{plural(caff_occ.idxmax())} highest caffeine ({caff_occ.max():.2f} cups); "
+              f"{wknd_top}-stress individuals use screens most on weekends")
+
+    # Caffeine & Sleep dual-bar
+    ax = axes[0]
+    x = np.arange(len(OCCS))
+    w = 0.35
+    b1 = ax.bar(x - w/2, caff_occ.values, width=w, color=COLORS, edgecolor=DARK, linewidth=1.5, label='Caffeine (cups)')
+    ax2 = ax.twinx()
+    b2 = ax2.bar(x + w/2, sleep_occ.values, width=w,
+                 color=[c+'66' for c in ['#f97316','#38bdf8','#a78bfa','#34d399']],
+                 edgecolor=DARK, linewidth=1.5, label='Sleep (hrs)')
+    ax.set_xticks(x); ax.set_xticklabels(OCCS, color=TEXT, fontsize=9, rotation=10)
+    ax.set_ylabel("Caffeine (cups)", color=C_ORG)
+    ax2.set_ylabel("Sleep Hours", color=C_BLUE)
+    ax.tick_params(axis='y', colors=C_ORG)
+    ax2.tick_params(axis='y', colors=C_BLUE)
+    ax.set_ylim(*zoom_limits(caff_occ, rel=0.05)); ax2.set_ylim(*zoom_limits(sleep_occ))
+    ax.set_title("Caffeine vs Sleep by Occupation", color=TEXT, pad=14, fontsize=12, fontweight='bold')
+    ax2.grid(False)
+    handles = [mpatches.Patch(color=C_ORG, label='Caffeine (cups)'),
+               mpatches.Patch(color=C_BLUE+'66', label='Sleep (hrs)')]
+    ax.legend(handles=handles, fontsize=9)
+
+    # Weekend vs Weekday screen time
+    ax = axes[1]
+    sg = ['Low (1–3)', 'Medium (4–6)', 'High (7–10)']
+    sg_colors = [C_GRN, C_ORG, C_RED]
+    x = np.arange(len(sg))
+    b1 = ax.bar(x - w/2, [wkdy_stress[g] for g in sg], width=w, color=sg_colors, edgecolor=DARK, linewidth=1.5, label='Weekday Phone')
+    b2 = ax.bar(x + w/2, [wknd_stress[g] for g in sg], width=w,
+                color=[c+'77' for c in [C_GRN, C_ORG, C_RED]],
+                edgecolor=DARK, linewidth=1.5, label='Weekend Screen')
+    ax.set_xticks(x); ax.set_xticklabels(sg, color=TEXT, fontsize=10)
+    ax.set_ylabel("Average Hours", color=MUTED)
+    both = np.concatenate([wkdy_stress.values, wknd_stress.values])
+    ax.set_ylim(np.floor(np.nanmin(both) * 0.8), np.ceil(np.nanmax(both) * 1.25))
+    ax.set_title("Weekday vs Weekend Screen Time\nby Stress Group", color=TEXT, pad=10, fontsize=12, fontweight='bold')
+    spike = wknd_stress / wkdy_stress - 1
+    if (spike > 0).all():
+        add_subtitle(ax, f"Weekend screen time spikes ~{spike.mean():.0%} above weekday "
+                         f"across all stress groups")
+    else:
+        add_subtitle(ax, f"Weekend vs weekday screen time: {spike.mean():+.0%} on average")
+    for bar in list(b1) + list(b2):
+        ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.04,
+                f'{bar.get_height():.2f}', ha='center', color=TEXT, fontsize=8.5, fontweight='bold')
+    ax.legend(fontsize=9)
+
+    fig.tight_layout(rect=[0, 0, 1, 0.92])
+
+    return fig
+
+
+# ════════════════════════════════════════════════════════
+# PAGE 8 — Per-respondent Usage Density
+# ════════════════════════════════════════════════════════
+@uses("n_rows", "usage_density", "phone_hist")
+def page_usage_density(agg):
+    dens, hist = agg.usage_density, agg.phone_hist
+    if dens is None or hist is None:            # aggregate store built before the bins existed
+        fig, _ = new_figure("cover")
+        fig_title(fig, "Per-respondent Usage Density")
+        fig.text(0.5, 0.5, "No binned distributions in this aggregate store — rebuild it "
+                           "to add this page.", ha='center', fontsize=12, color=MUTED)
+        return fig
+    fig, axes = new_figure("pair")
+    ix, iy = np.unravel_index(np.argmax(dens), dens.shape)
+    x_width = (DENSITY_X[2] - DENSITY_X[1]) / DENSITY_X[3]
+    y_width = (DENSITY_Y[2] - DENSITY_Y[1]) / DENSITY_Y[3]
+    fig_title(fig, "Per-respondent Usage Density",
+              f"{agg.n_rows:,} respondents binned into "
+              f"{x_width * 60:.0f}-minute cells; the busiest cell is ~"
+              f"{DENSITY_X[1] + (ix + 0.5) * x_width:.1f} hrs phone, "
+              f"~{DENSITY_Y[1] + (iy + 0.5) * y_width:.1f} hrs social media")
+
+    # 2-D histogram: phone vs social media hours
+    ax = axes[0]
+    mesh = density_mesh(ax, dens, DENSITY_X, DENSITY_Y)
+    cbar = fig.colorbar(mesh, ax=ax, pad=0.02)
+    cbar.solids.set_rasterized(True)
+    cbar.ax.tick_params(colors=MUTED, labelsize=8)
+    cbar.outline.set_edgecolor(BORDER)
+    cbar.set_label("Respondents per cell", color=MUTED)
+    xlim = occupied_limits(dens.sum(axis=1), DENSITY_X)
+    ylim = occupied_limits(dens.sum(axis=0), DENSITY_Y)
+    edge = min(xlim[1], ylim[1])
+    ax.plot([0, edge], [0, edge], color=TEXT, lw=1, ls='--', alpha=0.6,
+            label='Social media = phone hours')
+    ax.set_xlim(*xlim); ax.set_ylim(*ylim)
+    ax.set_xlabel("Daily Phone Hours"); ax.set_ylabel("Social Media Hours")
+    ax.set_title("Phone vs Social Media Hours", color=TEXT, pad=22, fontsize=12, fontweight='bold')
+    ax.legend(fontsize=9, loc='upper left')
+
+    # Phone-hour distribution per stress group (share of the group per bin)
+    ax = axes[1]
+    edges = np.linspace(DENSITY_X[1], DENSITY_X[2], DENSITY_X[3] + 1)
+    totals = hist.sum(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        shares = np.where(totals > 0, hist / totals, 0.0)
+    for share, group, color in zip(shares, STRESS_GROUPS, [C_GRN, C_ORG, C_RED]):
+        ax.stairs(share * 100, edges, color=color, linewidth=1.8, label=group)
+    ax.set_xlim(*occupied_limits(hist.sum(axis=0), DENSITY_X))
+    ax.set_ylim(0, shares.max() * 100 * 1.25)
+    ax.set_xlabel("Daily Phone Hours"); ax.set_ylabel("% of Stress Group", color=MUTED)
+    ax.set_title("Daily Phone Hours by Stress Group", color=TEXT, pad=22, fontsize=12, fontweight='bold')
+    means = (hist * (edges[:-1] + x_width / 2)).sum(axis=1) / np.maximum(totals[:, 0], 1)
+    add_subtitle(ax, f"Binned means: {means[0]:.2f} hrs (low) vs {means[-1]:.2f} hrs (high stress)")
+    ax.legend(fontsize=9)
+
+    fig.tight_layout(rect=[0, 0, 1, 0.92])
+
+    return fig
+
+
+# ════════════════════════════════════════════════════════
+# PAGE 9 — High vs Low Stress Profile + Recommendations
+# ════════════════════════════════════════════════════════
+@uses("high_s", "low_s", "cohort_test", "stress_occ", "phone_occ", "caff_occ", "social_occ",
+      "wknd_stress")
+def page_recommendations(agg):
+    high_s = agg.high_s
+    low_s = agg.low_s
+    fig, (ax_bar,) = new_figure("recommendations")
+    fig_title(fig, "High Stress vs Low Stress — Habit Profile & Recommendations")
+
+    # Grouped bar: high vs low stress comparison
+
+    metrics = ['Phone Hours', 'Social Media (hrs)', 'Sleep Hours', 'Caffeine (cups)']
+    h_vals  = [high_s['Daily_Phone_Hours'], high_s['Social_Media_Hours'],
+               high_s['Sleep_Hours'],       high_s['Caffeine_Intake_Cups']]
+    l_vals  = [low_s['Daily_Phone_Hours'],  low_s['Social_Media_Hours'],
+               low_s['Sleep_Hours'],        low_s['Caffeine_Intake_Cups']]
+
+    x = np.arange(len(metrics))
+    w = 0.35
+    ax_bar.bar(x - w/2, h_vals, width=w, color=C_RED,  edgecolor=DARK, linewidth=1.5, label='High Stress (7–10)')
+    ax_bar.bar(x + w/2, l_vals, width=w, color=C_GRN,  edgecolor=DARK, linewidth=1.5, label='Low Stress (1–3)')
+    test = agg.cohort_test
+    ticks = (metrics if test is None else
+             [f"{m}\ng = {g:+.3f}" for m, g in zip(metrics, test["g"][PROFILE_COLS])])
+    ax_bar.set_xticks(x); ax_bar.set_xticklabels(ticks, color=TEXT, fontsize=10)
+    ax_bar.set_ylabel("Average Value", color=MUTED)
+    ax_bar.set_title("High vs Low Stress — Habit Comparison", color=TEXT, pad=12, fontsize=12, fontweight='bold')
+    ax_bar.legend(fontsize=10)
+    ax_bar.text(0.5, -0.18 if test is None else -0.28,
+                cohort_verdict(test, dict(zip(PROFILE_COLS, metrics))),
+                transform=ax_bar.transAxes, ha='center', fontsize=9, color=C_ORG, style='italic')
+
+    # 4 recommendation boxes
+    stressed = agg.stress_occ.idxmax()
+    phoned   = agg.phone_occ.idxmax()
+    caffed   = agg.caff_occ.idxmax()
+    icon = lambda occ: OCC_ICONS.get(occ, "👤")
+    recs = [
+        (C_RED,  f"{icon(stressed)}  {plural(stressed)}",
+         f"Highest stress ({agg.stress_occ[stressed]:.2f}). Focus on sleep\nconsistency and structured breaks.\nLimit weekend screens to 5 hrs."),
+        (C_ORG,  f"{icon(phoned)}  {plural(phoned)}",
+         f"Most phone usage ({agg.phone_occ[phoned]:.2f} hrs). Set 9 PM\ndigital cutoff and 'no-phone' work blocks\nto protect deep focus time."),
+        (C_BLUE, f"{icon(caffed)}  {plural(caffed)}",
+         f"Highest caffeine ({agg.caff_occ[caffed]:.2f} cups) + social media\n({agg.social_occ[caffed]:.2f} hrs). Swap afternoon caffeine for\nwater and batch social media checks."),
+        (C_GRN,  "📵  All Groups",
+         f"Weekend screen spikes to {agg.wknd_stress.iloc[-1]:.0f} hrs for high-stress\nindividuals. A 4-hour Sunday digital detox is\nthe highest-impact stress recovery habit."),
+    ]
+    # Use text boxes in lower half
+    corners = [(0.08 + (i % 2) * 0.47, 0.08 if i // 2 == 1 else 0.22) for i in range(len(recs))]
+    cards(fig, [(x0, y0, 0.42, 0.12) for x0, y0 in corners],
+          [col for col, _, _ in recs], linewidth=1.5)
+    for (x0, y0), (col, title, body) in zip(corners, recs):
+        fig.text(x0 + 0.01, y0 + 0.085, title, fontsize=10.5, fontweight='bold',
+                 color=col, transform=fig.transFigure, zorder=3)
+        fig.text(x0 + 0.01, y0 + 0.008, body, fontsize=8.5, color=MUTED,
+                 transform=fig.transFigure, zorder=3, va='bottom', linespacing=1.5)
+
+    return fig
+
+
+PAGES = [page_cover, page_occupation, page_social_media, page_stress,
+         page_gender, page_radar, page_caffeine_weekend, page_usage_density,
+         page_recommendations]
+
+
+# ── Rendering ─────────────────────────────────────────────────────────────
+def save_png(fig, path, dpi=PNG_DPI):
+    """PNG at the full figure size: one draw, no tight-bbox measuring pass."""
+    fig.savefig(path, facecolor=DARK, dpi=dpi)
+
+def save_pdf(fig, target, dpi=RASTER_DPI):
+    """PDF page at the full figure size into a PdfPages or a path / file object."""
+    if isinstance(target, PdfPages):
+        target.savefig(fig, facecolor=DARK, dpi=dpi)
+    else:
+        fig.savefig(target, format='pdf', facecolor=DARK, dpi=dpi)
+
+def style_fingerprint():
+    """
+    Part of every page key: this module's whole source (pages, helpers,
+    constants, style code, templates), so editing anything a page draws
+    with re-renders it, plus the sheet, palette and imported constants.
+    cohorts.py is included too: its thresholds and effect labels decide
+    the verdict text on the recommendations page.
+    """
+    palette = (DARK, SURF, SURF2, BORDER, TEXT, MUTED, OCCS, COLORS, PNG_DPI, DENSITY_COLORS)
+    imported = (DENSITY_X, DENSITY_Y, OCC_METRICS, PROFILE_COLS, STRESS_GROUPS, SCHEMA)
+    return (inspect.getsource(sys.modules[__name__]) + inspect.getsource(cohorts)
+            + repr(sorted(STYLE_SHEET.items())) + repr(palette) + repr(imported))
+
+def page_filename(index, ext):
+    return f"page_{index + 1:02d}_{PAGES[index].__name__[len('page_'):]}.{ext}"
+
+def draw_page(index, agg):
+    """Build page `index` under the report style sheet."""
+    with report_style():
+        return PAGES[index](agg)
+
+def save_page(fig, pdf, index, png_dir=None, raster_dpi=RASTER_DPI):
+    if png_dir:
+        save_png(fig, os.path.join(png_dir, page_filename(index, "png")))
+    save_pdf(fig, pdf, raster_dpi)
+    plt.close(fig)
+
+def render_fragment(index, agg, pdf_path, png_path=None, raster_dpi=RASTER_DPI):
+    """Render one page to its own single-page PDF (and optional PNG)."""
+    with profiling.stage(f"render:{PAGES[index].__name__}"):
+        fig = draw_page(index, agg)
+        if png_path:
+            save_png(fig, png_path)
+        save_pdf(fig, pdf_path, raster_dpi)
+        plt.close(fig)
+    return pdf_path
+
+def render_fragment_traced(index, agg, pdf_path, png_path=None, raster_dpi=RASTER_DPI,
+                           memory=False):
+    """Pool-worker variant of render_fragment that returns its trace events."""
+    tracer = profiling.enable(memory=memory)
+    try:
+        render_fragment(index, agg, pdf_path, png_path, raster_dpi)
+    finally:
+        profiling.disable()
+    return tracer.events
+
+def render_fragments(agg, targets, jobs=1, raster_dpi=RASTER_DPI):
+    """targets: [(page index, pdf path, png path or None)]; pool when jobs > 1."""
+    if jobs <= 1 or len(targets) <= 1:
+        for index, pdf_path, png_path in targets:
+            render_fragment(index, agg, pdf_path, png_path, raster_dpi)
+        return
+    tracer = profiling.active()
+    with ProcessPoolExecutor(max_workers=min(jobs, len(targets))) as pool:
+        if tracer is None:
+            futures = [pool.submit(render_fragment, index, agg, pdf_path, png_path, raster_dpi)
+                       for index, pdf_path, png_path in targets]
+        else:
+            futures = [pool.submit(render_fragment_traced, index, agg, pdf_path, png_path,
+                                   raster_dpi, tracer.memory)
+                       for index, pdf_path, png_path in targets]
+        for f in futures:
+            result = f.result()
+            if tracer is not None:
+                tracer.extend(result)
+
+def merge_fragments(paths, output_pdf):
+    with profiling.stage("merge_fragments", pages=len(paths)):
+        writer = PdfWriter()
+        for path in paths:
+            writer.append(path)
+        with open(output_pdf, "wb") as f:
+            writer.write(f)
+
+def render_report(agg, output_pdf, jobs=1, png_dir=None, cache=None, raster_dpi=RASTER_DPI):
+    """
+    Render every page into `output_pdf`.
+    jobs > 1 : pages are drawn on a process pool as single-page fragments
+               and merged back in order; each worker also writes its PNG.
+    raster_dpi: resolution of the rasterized artists (density meshes) in the PDF.
+    cache    : ReportCache; pages whose inputs, code and style are unchanged
+               reuse their cached fragment instead of being re-rendered.
+    Fragment merging requires pypdf; without it pages render serially.
+    """
+    if png_dir:
+        os.makedirs(png_dir, exist_ok=True)
+    if PdfWriter is None and (jobs > 1 or cache is not None):
+        print("pypdf not installed — rendering pages serially without page cache")
+        jobs, cache = 1, None
+
+    if cache is None and jobs <= 1:
+        with PdfPages(output_pdf) as pdf:
+            for i, page in enumerate(PAGES):
+                with profiling.stage(f"render:{page.__name__}"):
+                    save_page(draw_page(i, agg), pdf, i, png_dir, raster_dpi)
+        return
+
+    if cache is None:
+        with tempfile.TemporaryDirectory() as frag_dir:
+            targets = [(i, os.path.join(frag_dir, page_filename(i, "pdf")),
+                        os.path.join(png_dir, page_filename(i, "png")) if png_dir else None)
+                       for i in range(len(PAGES))]
+            render_fragments(agg, targets, jobs, raster_dpi)
+            merge_fragments([pdf_path for _, pdf_path, _ in targets], output_pdf)
+        return
+
+    shared = style_fingerprint() + f"raster_dpi={raster_dpi}"
+    keys = [cache.page_key(page, agg, shared) for page in PAGES]
+    targets = [(i, cache.page_path(page, key),
+                cache.page_path(page, key, "png") if png_dir else None)
+               for i, (page, key) in enumerate(zip(PAGES, keys))
+               if not cache.has_page(page, key, png=bool(png_dir))]
+    render_fragments(agg, targets, jobs, raster_dpi)
+    print(f"Pages: {len(targets)} rendered, {len(PAGES) - len(targets)} reused from cache")
+
+    merge_fragments([cache.page_path(page, key) for page, key in zip(PAGES, keys)], output_pdf)
+    for i, (page, key) in enumerate(zip(PAGES, keys)):
+        if png_dir:
+            shutil.copyfile(cache.page_path(page, key, "png"),
+                            os.path.join(png_dir, page_filename(i, "png")))
+        cache.prune_pages(page, key)
+
+def warm_up():
+    """Load fonts, the PDF / PNG backends and the figure templates ahead of the first job."""
+    for template in TEMPLATES:
+        plt.close(new_figure(template)[0])
+    fig = plt.figure(figsize=(2, 1))
+    fig_title(fig, "warm-up", "🎓 💼 ☕ 💻 📵")
+    for fmt in ("pdf", "png"):
+        fig.savefig(io.BytesIO(), format=fmt, facecolor=DARK, dpi=PNG_DPI)
+    plt.close(fig)
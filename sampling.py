@@ -0,0 +1,391 @@
+"""
+Sampled Preview
+====================================
+Approximate EDA summaries from a sample of a CSV, with 95% confidence
+intervals next to every estimate. Same keys as streaming.summarize_csv, plus
+"ci" (half-widths, same shapes) and "sample" (how it was drawn).
+
+Sampling methods:
+    blocks    : the file is cut into fixed byte blocks and whole blocks are
+                drawn without replacement by seeking to them, so the cost
+                depends on the sample size only, not on the file size
+                (seconds on a 20 GB file). Each row is in the sample with the
+                same probability; blocks are the clusters for the variance.
+                Blocks shrink for small samples so at least MIN_BLOCKS are
+                drawn. This is the default: it is the only method that gives
+                first numbers in seconds on a 20 GB file, since anything that
+                streams every row is bound by the full read.
+    reservoir : streams every row and keeps a bottom-k random-key sample
+                (vectorized reservoir), optionally per stratum (e.g.
+                Occupation × Gender) with exact stratum sizes, so small
+                groups still get `sample_rows / strata` rows. Reads the whole
+                file but only holds the sample (eda.py --preview-method
+                reservoir); use it when small strata matter more than speed.
+
+Estimates are weighted ratio means; their variance is linearized and taken
+between clusters within strata (finite-population corrected), and intervals
+use Student's t on (clusters − strata) degrees of freedom, so a block sample
+of few blocks gets honestly wide intervals. Quantile
+intervals use Woodruff's method (the wider side, as the columns are discrete);
+correlation intervals use Fisher's z.
+
+Usage:
+    from sampling import preview_csv
+    summary = preview_csv("huge.csv", sample_rows=100_000)
+    summary["avg_phone"], summary["ci"]["avg_phone"]
+"""
+
+import io
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from correlation import t_critical
+from loader import DEFAULT_CHUNKSIZE, SCHEMA, read_csv_typed
+from streaming import GROUP_MEANS, VALUE_COUNTS
+
+DEFAULT_SAMPLE_ROWS = 100_000
+DEFAULT_BLOCK_BYTES = 1 << 16
+MIN_BLOCKS          = 30         # small samples use smaller blocks to reach this many
+DEFAULT_STRATA      = ["Occupation", "Gender"]
+Z95                 = 1.959964
+
+
+# ── Drawing the sample ────────────────────────────────────────────────────
+def _read_block(f, lo, hi, data_start, size):
+    """Bytes of every line that starts in [lo, hi)."""
+    skip = False
+    if lo > data_start:
+        f.seek(lo - 1)
+        skip = f.read(1) != b"\n"
+    f.seek(lo)
+    buf = f.read(hi - lo)
+    if skip:
+        cut = buf.find(b"\n")
+        if cut < 0:
+            return b""
+        buf = buf[cut + 1:]
+    if buf and not buf.endswith(b"\n") and hi < size:
+        buf += f.readline()          # finish the last line started in the block
+    return buf
+
+
+def _multiline_records(buf):
+    """True if a quoted field in `buf` spans a line break (odd quotes on a line)."""
+    return b'"' in buf and any(line.count(b'"') % 2 for line in buf.split(b"\n"))
+
+
+def block_sample(path, sample_rows=DEFAULT_SAMPLE_ROWS, block_bytes=DEFAULT_BLOCK_BYTES,
+                 columns=None, seed=0):
+    """
+    Rows of randomly chosen byte blocks of `path`, until `sample_rows` are
+    drawn. Blocks shrink (to no less than a few rows) when `sample_rows`
+    would otherwise fit in fewer than MIN_BLOCKS of them. Rows are found by
+    line, so records with quoted line breaks are rejected (ValueError).
+    Returns (frame, block id per row, blocks drawn, total blocks).
+    """
+    rng = np.random.default_rng(seed)
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        header = f.readline()
+        data_start = len(header)
+        head = f.read(DEFAULT_BLOCK_BYTES)
+        row_bytes = len(head) / max(head.count(b"\n"), 1)
+        block_bytes = int(max(min(block_bytes, sample_rows * row_bytes / MIN_BLOCKS),
+                              8 * row_bytes, 1))
+        n_blocks = max(1, -(-(size - data_start) // block_bytes))
+        parts, counts, rows = [], [], 0
+        order = rng.permutation(n_blocks)
+        for drawn, block in enumerate(order, 1):
+            lo = data_start + int(block) * block_bytes
+            buf = _read_block(f, lo, min(lo + block_bytes, size), data_start, size)
+            if _multiline_records(buf):
+                raise ValueError(f"{path} has quoted fields spanning lines; block sampling "
+                                 f"needs one record per line (use method='reservoir')")
+            n = buf.count(b"\n") + (1 if buf and not buf.endswith(b"\n") else 0)
+            if buf and not buf.endswith(b"\n"):
+                buf += b"\n"
+            parts.append(buf)
+            counts.append(n)
+            rows += n
+            if rows >= sample_rows:
+                break
+    df = read_csv_typed(io.BytesIO(header + b"".join(parts)), columns=columns,
+                        skip_blank_lines=False)
+    psu = np.repeat(np.arange(len(counts)), counts)
+    return df, psu, drawn, n_blocks
+
+
+class StratifiedReservoir:
+    """
+    Bottom-k sample per stratum: every row gets a uniform random key and each
+    stratum keeps the `k` rows with the smallest keys, which is a simple
+    random sample of that stratum. Stratum sizes are counted exactly.
+    """
+
+    def __init__(self, k, strata=(), seed=0):
+        self.k, self.strata = k, list(strata)
+        self._rng = np.random.default_rng(seed)
+        self._ids = {}                # stratum tuple -> dense id
+        self.sizes = np.zeros(0, dtype=np.int64)
+        self.sample, self.keys, self.stratum = None, np.empty(0), np.empty(0, dtype=np.intp)
+
+    def _stratum_ids(self, chunk):
+        if not self.strata:
+            return np.zeros(len(chunk), dtype=np.intp)
+        codes, uniques = pd.MultiIndex.from_frame(
+            chunk[self.strata].astype(object)).factorize()
+        local = np.array([self._ids.setdefault(u, len(self._ids)) for u in uniques],
+                         dtype=np.intp)
+        return local[codes]
+
+    def update(self, chunk):
+        ids = self._stratum_ids(chunk)
+        if len(self._ids) > len(self.sizes):
+            self.sizes = np.pad(self.sizes, (0, len(self._ids) - len(self.sizes)))
+        self.sizes += np.bincount(ids, minlength=len(self.sizes))
+        keys = self._rng.random(len(chunk))
+
+        # only rows below their stratum's current k-th key can enter
+        threshold = np.full(len(self.sizes), np.inf)
+        if self.sample is not None:
+            full = np.bincount(self.stratum, minlength=len(self.sizes)) >= self.k
+            order = np.lexsort((self.keys, self.stratum))
+            last = np.searchsorted(self.stratum[order], np.arange(len(self.sizes)), "right") - 1
+            threshold[full] = self.keys[order][last[full]]
+        enter = keys < threshold[ids]
+
+        frames = [chunk[enter]] if self.sample is None else [self.sample, chunk[enter]]
+        keys = np.concatenate([self.keys, keys[enter]])
+        stratum = np.concatenate([self.stratum, ids[enter]])
+        order = np.lexsort((keys, stratum))
+        first = np.searchsorted(stratum[order], stratum[order], "left")
+        keep = order[np.arange(len(order)) - first < self.k]
+        keep.sort()
+        self.sample = pd.concat(frames, ignore_index=True).iloc[keep].reset_index(drop=True)
+        self.keys, self.stratum = keys[keep], stratum[keep]
+        return self
+
+
+def reservoir_sample(path, sample_rows=DEFAULT_SAMPLE_ROWS, strata=(), columns=None,
+                     chunksize=DEFAULT_CHUNKSIZE, seed=0):
+    """Stream `path`; returns (sample frame, stratum id per row, stratum sizes)."""
+    k = sample_rows
+    if strata:
+        # equal allocation across the strata seen in the first chunk
+        with read_csv_typed(path, columns=list(strata), chunksize=chunksize) as reader:
+            first = next(reader, None)
+        n_strata = len(first.drop_duplicates()) if first is not None else 1
+        k = max(2, -(-sample_rows // max(n_strata, 1)))
+    res = StratifiedReservoir(k, strata, seed)
+    usecols = None if columns is None else list(dict.fromkeys(list(columns) + list(strata)))
+    for chunk in read_csv_typed(path, columns=usecols, chunksize=chunksize):
+        res.update(chunk)
+    if res.sample is None:
+        raise ValueError(f"{path} contains no rows")
+    return res.sample, res.stratum, res.sizes
+
+
+# ── Estimation ────────────────────────────────────────────────────────────
+class Design:
+    """
+    Weights and structure of a sample: stratum and cluster (PSU) of each row,
+    population size of each stratum. Rows of a stratum share one weight.
+    """
+
+    def __init__(self, stratum, psu, stratum_sizes, n_psu_total=None):
+        self.stratum = np.asarray(stratum, dtype=np.intp)
+        self.psu = np.asarray(psu, dtype=np.intp)
+        n_h = np.bincount(self.stratum, minlength=len(stratum_sizes)).astype(np.float64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.weights = (np.asarray(stratum_sizes, dtype=np.float64) / n_h)[self.stratum]
+        self.psu_stratum = np.zeros(self.psu.max() + 1 if len(self.psu) else 0, dtype=np.intp)
+        self.psu_stratum[self.psu] = self.stratum
+        m_h = np.bincount(self.psu_stratum, minlength=len(stratum_sizes)).astype(np.float64)
+        # sampled / population clusters per stratum, for the finite-population correction
+        population = n_psu_total if n_psu_total is not None else np.asarray(stratum_sizes)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.fpc = np.clip(1 - m_h / np.asarray(population, dtype=np.float64), 0, 1)
+            self.scale = np.where(m_h > 1, m_h / (m_h - 1), np.nan) * self.fpc
+        self.m_h = m_h
+        # t quantile on (clusters − strata) df: few blocks => wider intervals
+        self.df = float(m_h.sum() - np.count_nonzero(m_h))
+        self.crit = t_critical(self.df) if self.df < 10_000 else Z95
+        self.n = len(self.stratum)
+        self.population = float(np.sum(stratum_sizes))
+
+    def total_var(self, z):
+        """Variance of the weighted total of per-row values `z`."""
+        t = np.bincount(self.psu, self.weights * z, minlength=len(self.psu_stratum))
+        mean = np.bincount(self.psu_stratum, t, minlength=len(self.m_h)) / np.maximum(self.m_h, 1)
+        dev = (t - mean[self.psu_stratum]) ** 2
+        return float(np.nansum(self.scale * np.bincount(self.psu_stratum, dev,
+                                                         minlength=len(self.m_h))))
+
+    def ratio(self, y, domain=None):
+        """Weighted mean of `y` over `domain` rows, and its 95% CI half-width."""
+        y = np.asarray(y, dtype=np.float64)
+        m = ~np.isnan(y) if domain is None else (~np.isnan(y) & domain)
+        W = np.sum(self.weights * m)
+        if W <= 0:
+            return np.nan, np.nan
+        y0 = np.where(m, y, 0.0)
+        r = np.sum(self.weights * y0) / W
+        z = np.where(m, y0 - r, 0.0) / W
+        return r, self.crit * np.sqrt(self.total_var(z))
+
+    def total(self, indicator):
+        """Weighted count of `indicator` rows, and its 95% CI half-width."""
+        x = np.asarray(indicator, dtype=np.float64)
+        return np.sum(self.weights * x), self.crit * np.sqrt(self.total_var(x))
+
+
+def weighted_quantile(values, weights, qs):
+    ok = ~np.isnan(values)
+    values, weights = values[ok], weights[ok]
+    if not len(values):
+        return np.full(len(qs), np.nan)
+    order = np.argsort(values, kind="stable")
+    values, weights = values[order], weights[order]
+    # weight before each value over the total; with equal weights this is
+    # pandas' default linear interpolation (position p * (n - 1))
+    before = np.cumsum(weights) - weights
+    span = before[-1] if before[-1] > 0 else 1.0
+    return np.interp(qs, before / span, values)
+
+
+def _weighted_corr(x, w):
+    ok = ~np.isnan(x)
+    k = x.shape[1]
+    r, n = np.full((k, k), np.nan), np.zeros((k, k))
+    for i in range(k):
+        for j in range(i, k):
+            m = ok[:, i] & ok[:, j]
+            n[i, j] = n[j, i] = m.sum()
+            if m.sum() < 3:
+                continue
+            xi, xj, wm = x[m, i], x[m, j], w[m]
+            di, dj = xi - np.average(xi, weights=wm), xj - np.average(xj, weights=wm)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                r[i, j] = r[j, i] = (np.sum(wm * di * dj)
+                                     / np.sqrt(np.sum(wm * di * di) * np.sum(wm * dj * dj)))
+    return r, n
+
+
+def estimate_summary(df, design):
+    """streaming.summarize_csv-shaped estimates (+ "ci") from a weighted sample."""
+    w = design.weights
+    numeric = [c for c in df.select_dtypes(include="number").columns]
+    ci = {}
+
+    non_null = pd.Series({c: design.total(df[c].notna().to_numpy())[0] for c in df.columns})
+    ci["non_null"] = pd.Series({c: design.total(df[c].notna().to_numpy())[1] for c in df.columns})
+
+    qs = np.array([0.25, 0.5, 0.75])
+    stats, half = {}, {}
+    for c in numeric:
+        x = df[c].to_numpy(dtype=np.float64)
+        mean, mean_hw = design.ratio(x)
+        ok = ~np.isnan(x)
+        var = np.sum(w[ok] * (x[ok] - mean) ** 2) / np.sum(w[ok]) * ok.sum() / max(ok.sum() - 1, 1)
+        q = weighted_quantile(x, w, qs)
+        q_hw = []
+        for p, qv in zip(qs, q):          # Woodruff: CI of F(q), mapped back through Q
+            _, f_hw = design.ratio(np.where(ok, (x <= qv).astype(np.float64), np.nan))
+            lo, hi = weighted_quantile(x, w, np.clip([p - f_hw, p + f_hw], 0, 1))
+            q_hw.append(max(qv - lo, hi - qv))
+        stats[c] = [non_null[c], mean, np.sqrt(var), np.nanmin(x), *q, np.nanmax(x)]
+        half[c] = [ci["non_null"][c], mean_hw, np.nan, np.nan, *q_hw, np.nan]
+    index = ["count", "mean", "std", "min", "25%", "50%", "75%", "max"]
+    describe = pd.DataFrame(stats, index=index, columns=numeric)
+    ci["describe"] = pd.DataFrame(half, index=index, columns=numeric)
+
+    r, n = _weighted_corr(df[numeric].to_numpy(dtype=np.float64), w)
+    corr = pd.DataFrame(r, index=numeric, columns=numeric)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        fz, fz_hw = np.arctanh(np.clip(r, -0.999999, 0.999999)), Z95 / np.sqrt(n - 3)
+        ci["corr"] = pd.DataFrame((np.tanh(fz + fz_hw) - np.tanh(fz - fz_hw)) / 2,
+                                  index=numeric, columns=numeric)
+
+    out = {
+        "rows": int(round(design.population)),
+        "columns": list(df.columns),
+        "non_null": non_null.round().astype(np.int64),
+        "describe": describe,
+        "corr": corr,
+    }
+    for name, (key, value) in GROUP_MEANS.items():
+        if key not in df.columns or value not in df.columns:
+            out[name] = ci[name] = None
+            continue
+        groups = df[key]
+        y = df[value].to_numpy(dtype=np.float64)
+        labels = sorted(groups.dropna().unique())
+        est = [design.ratio(y, (groups == g).to_numpy()) for g in labels]
+        idx = pd.Index(labels, name=key)
+        out[name] = pd.Series([e for e, _ in est], index=idx, name=value)
+        ci[name] = pd.Series([h for _, h in est], index=idx, name=value)
+    for name, column in VALUE_COUNTS.items():
+        if column not in df.columns:
+            out[name] = ci[name] = None
+            continue
+        labels = df[column].dropna().unique()
+        est = [design.total((df[column] == v).to_numpy()) for v in labels]
+        counts = pd.Series([e for e, _ in est], index=pd.Index(labels, name=column), name="count")
+        hw = pd.Series([h for _, h in est], index=counts.index, name="count")
+        order = (counts.sort_index().index if name == "stress_counts"
+                 else counts.sort_values(ascending=False, kind="stable").index)
+        out[name] = counts.reindex(order).round().astype(np.int64)
+        ci[name] = hw.reindex(order)
+    out["ci"] = ci
+    return out
+
+
+def preview_csv(path, sample_rows=DEFAULT_SAMPLE_ROWS, method="blocks", strata=None,
+                block_bytes=DEFAULT_BLOCK_BYTES, chunksize=DEFAULT_CHUNKSIZE, seed=0):
+    """Approximate EDA summary of `path` from a sample of about `sample_rows` rows."""
+    start = time.perf_counter()
+    if method == "blocks":
+        df, psu, drawn, n_blocks = block_sample(path, sample_rows, block_bytes, seed=seed)
+        if not len(df):
+            raise ValueError(f"{path} contains no rows")
+        # one stratum; blocks are the clusters, population size estimated from them
+        rows_per_block = np.bincount(psu, minlength=drawn)
+        design = Design(np.zeros(len(df)), psu, [rows_per_block.mean() * n_blocks],
+                        n_psu_total=[n_blocks])
+        info = {"method": method, "blocks": int(drawn), "of_blocks": int(n_blocks)}
+    elif method == "reservoir":
+        strata = list(DEFAULT_STRATA if strata is None else strata)
+        strata = [s for s in strata if s in SCHEMA]
+        df, stratum, sizes = reservoir_sample(path, sample_rows, strata, chunksize=chunksize,
+                                              seed=seed)
+        design = Design(stratum, np.arange(len(df)), sizes)
+        info = {"method": method, "strata": strata, "n_strata": int(len(sizes))}
+    else:
+        raise ValueError(f"unknown sampling method {method!r}")
+    summary = estimate_summary(df, design)
+    if method == "blocks":
+        summary["ci"]["rows"] = design.crit * np.sqrt(design.total_var(np.ones(len(df))))
+    else:
+        summary["ci"]["rows"] = 0.0
+    info.update(rows=len(df), seconds=round(time.perf_counter() - start, 3))
+    summary["sample"] = info
+    return summary
+
+
+def with_ci(values, half_widths, fmt="{:.3g}"):
+    """Format estimates as 'value ± half-width' strings (same shape)."""
+    def cell(v, h):
+        if v is None or (isinstance(v, float) and np.isnan(v)):
+            return "NaN"
+        if h is None or np.isnan(h):
+            return fmt.format(v)
+        return f"{fmt.format(v)} ± {fmt.format(h)}"
+    if isinstance(values, pd.DataFrame):
+        return pd.DataFrame([[cell(v, h) for v, h in zip(rv, rh)]
+                             for rv, rh in zip(values.to_numpy(), half_widths.to_numpy())],
+                            index=values.index, columns=values.columns)
+    return pd.Series([cell(v, h) for v, h in zip(values, half_widths)],
+                     index=values.index, name=values.name)
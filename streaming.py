@@ -0,0 +1,315 @@
+"""
+Streaming Accumulators
+====================================
+Mergeable, chunk-at-a-time summaries so the EDA can run on CSVs larger than
+RAM. Peak memory is bounded by the chunk size (plus small per-group and
+sketch state), not by the file size.
+
+Every accumulator exposes:
+    update(chunk)   fold one chunk in
+    merge(other)    combine with an accumulator built on other chunks
+    result()        produce the pandas object the in-memory EDA would
+
+Usage:
+    from streaming import summarize_csv
+    summary = summarize_csv("big.csv", chunksize=200_000)
+    summary["describe"], summary["corr"], summary["avg_phone"], ...
+"""
+
+import numpy as np
+import pandas as pd
+
+from loader import DEFAULT_CHUNKSIZE, read_csv_typed
+
+
+# ── Moments: describe() + pairwise correlation ────────────────────────────
+class MomentAccumulator:
+    """
+    Count / sum / sum-of-squares / min / max per column plus pairwise-complete
+    cross-products, all taken around a per-column shift (the first chunk's
+    mean) to keep the sums well conditioned.
+    """
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.shift = None
+        self.n = np.zeros(k)
+        self.sum = np.zeros(k)
+        self.sumsq = np.zeros(k)
+        self.min = np.full(k, np.inf)
+        self.max = np.full(k, -np.inf)
+        # pairwise: both-valid counts, sums of x_i, sums of x_i², and Σ x_i·x_j
+        self.pn = np.zeros((k, k))
+        self.psum = np.zeros((k, k))
+        self.psumsq = np.zeros((k, k))
+        self.pxy = np.zeros((k, k))
+
+    def update(self, chunk):
+        x = chunk[self.columns].to_numpy(dtype=np.float64)
+        valid = ~np.isnan(x)
+        if self.shift is None:
+            with np.errstate(invalid="ignore"):
+                self.shift = np.nan_to_num(np.nanmean(x, axis=0)) if len(x) else np.zeros(x.shape[1])
+        x0 = np.where(valid, x - self.shift, 0.0)
+        m = valid.astype(np.float64)
+
+        self.n += m.sum(axis=0)
+        self.sum += x0.sum(axis=0)
+        self.sumsq += (x0 * x0).sum(axis=0)
+        if len(x):
+            self.min = np.fmin(self.min, np.nanmin(np.where(valid, x, np.inf), axis=0))
+            self.max = np.fmax(self.max, np.nanmax(np.where(valid, x, -np.inf), axis=0))
+
+        self.pn += m.T @ m
+        self.psum += x0.T @ m
+        self.psumsq += (x0 * x0).T @ m
+        self.pxy += x0.T @ x0
+        return self
+
+    def merge(self, other):
+        if other.shift is None:
+            return self
+        if self.shift is None:
+            self.__dict__.update({k: np.copy(v) if isinstance(v, np.ndarray) else v
+                                  for k, v in other.__dict__.items()})
+            return self
+        # Re-centre `other` onto our shift: x - a = (x - b) + d, with d = b - a
+        d = other.shift - self.shift
+        self.n += other.n
+        self.sum += other.sum + d * other.n
+        self.sumsq += other.sumsq + 2 * d * other.sum + d * d * other.n
+        self.min = np.fmin(self.min, other.min)
+        self.max = np.fmax(self.max, other.max)
+
+        di, dj = d[:, None], d[None, :]
+        sum_j = other.psum.T              # Σ x_j over rows where both i, j valid
+        self.pn += other.pn
+        self.psum += other.psum + di * other.pn
+        self.psumsq += other.psumsq + 2 * di * other.psum + di * di * other.pn
+        self.pxy += (other.pxy + di * sum_j + dj * other.psum + di * dj * other.pn)
+        return self
+
+    def mean(self):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.sum / self.n + (self.shift if self.shift is not None else 0.0)
+
+    def std(self):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            var = (self.sumsq - self.sum ** 2 / self.n) / (self.n - 1)
+        return np.sqrt(np.maximum(var, 0.0))
+
+    def corr(self):
+        n, sx, sy = self.pn, self.psum, self.psum.T
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cov = n * self.pxy - sx * sy
+            vx = n * self.psumsq - sx * sx
+            vy = vx.T
+            r = cov / np.sqrt(vx * vy)
+        r = np.clip(r, -1.0, 1.0)
+        r[n < 2] = np.nan
+        return pd.DataFrame(r, index=self.columns, columns=self.columns)
+
+
+# ── Approximate quantiles (KLL-style compactor) ────────────────────────────
+class QuantileSketch:
+    """
+    Mergeable quantile sketch: level h holds items of weight 2**h; a level
+    that outgrows `k` is sorted and every other item promoted. Exact while
+    fewer than `k` values have been seen; rank error is O(1/k) otherwise.
+    """
+
+    def __init__(self, k=4096, seed=0):
+        self.k = k
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        for h, items in enumerate(other.levels):
+            if h >= len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self._compress()
+        return self
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            items = self.levels[h]
+            if len(items) > self.k:
+                items = np.sort(items)
+                if len(items) % 2:          # keep the odd one out at this level
+                    keep, items = items[-1:], items[:-1]
+                else:
+                    keep = np.empty(0)
+                promoted = items[self._rng.integers(2)::2]
+                self.levels[h] = keep
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+            h += 1
+
+    def quantile(self, qs):
+        vals = np.concatenate(self.levels)
+        if not len(vals):
+            return np.full(len(qs), np.nan)
+        wts = np.concatenate([np.full(len(l), 2.0 ** h) for h, l in enumerate(self.levels)])
+        order = np.argsort(vals, kind="stable")
+        vals, wts = vals[order], wts[order]
+        # Linear interpolation on (cumulative weight - 1) reproduces pandas'
+        # default quantile exactly when every weight is 1.
+        pos = np.cumsum(wts) - 1
+        return np.interp(np.asarray(qs) * pos[-1], pos, vals)
+
+
+# ── Per-group means and value counts ──────────────────────────────────────
+class GroupMeanAccumulator:
+    """Running per-group sum and count of one value column."""
+
+    def __init__(self, key, value):
+        self.key, self.value = key, value
+        self.table = None
+
+    def update(self, chunk):
+        part = chunk[self.value].astype(np.float64).groupby(
+            chunk[self.key], observed=True).agg(["sum", "count"])
+        return self._add(part)
+
+    def merge(self, other):
+        return self._add(other.table) if other.table is not None else self
+
+    def _add(self, part):
+        part.index = part.index.astype(object)
+        self.table = part if self.table is None else self.table.add(part, fill_value=0)
+        return self
+
+    def result(self):
+        if self.table is None:
+            return pd.Series(dtype=np.float64, name=self.value)
+        out = (self.table["sum"] / self.table["count"]).sort_index()
+        out.index.name, out.name = self.key, self.value
+        return out
+
+
+class ValueCountAccumulator:
+    """Running value_counts() of one column."""
+
+    def __init__(self, column):
+        self.column = column
+        self.counts = None
+
+    def update(self, chunk):
+        part = chunk[self.column].value_counts()
+        part.index = part.index.astype(object)
+        return self._add(part)
+
+    def merge(self, other):
+        return self._add(other.counts) if other.counts is not None else self
+
+    def _add(self, part):
+        self.counts = part if self.counts is None else self.counts.add(part, fill_value=0)
+        return self
+
+    def result(self):
+        if self.counts is None:
+            return pd.Series(dtype=np.int64, name="count")
+        out = self.counts.astype(np.int64).sort_values(ascending=False, kind="stable")
+        out.index.name, out.name = self.column, "count"
+        return out
+
+
+# ── EDA summary over a chunked CSV ─────────────────────────────────────────
+GROUP_MEANS = {
+    "avg_phone":      ("Occupation", "Daily_Phone_Hours"),
+    "avg_stress_occ": ("Occupation", "Stress_Level"),
+    "avg_stress_age": ("Age",        "Stress_Level"),
+    "avg_caffeine":   ("Occupation", "Caffeine_Intake_Cups"),
+}
+VALUE_COUNTS = {
+    "stress_counts":     "Stress_Level",
+    "occupation_counts": "Occupation",
+}
+
+
+class EDAAccumulator:
+    """Everything generate_eda() reports, folded chunk by chunk."""
+
+    def __init__(self, columns, numeric_columns, sketch_k=4096):
+        self.columns = list(columns)
+        self.numeric = list(numeric_columns)
+        self.rows = 0
+        self.non_null = pd.Series(0, index=self.columns, dtype=np.int64)
+        self.moments = MomentAccumulator(self.numeric)
+        self.sketches = {c: QuantileSketch(sketch_k) for c in self.numeric}
+        self.groups = {name: GroupMeanAccumulator(k, v) for name, (k, v) in GROUP_MEANS.items()
+                       if k in self.columns and v in self.columns}
+        self.counts = {name: ValueCountAccumulator(c) for name, c in VALUE_COUNTS.items()
+                       if c in self.columns}
+
+    def update(self, chunk):
+        self.rows += len(chunk)
+        self.non_null = self.non_null.add(chunk.notna().sum(), fill_value=0).astype(np.int64)
+        self.moments.update(chunk)
+        for c, sk in self.sketches.items():
+            sk.update(chunk[c].to_numpy(dtype=np.float64))
+        for acc in list(self.groups.values()) + list(self.counts.values()):
+            acc.update(chunk)
+        return self
+
+    def merge(self, other):
+        self.rows += other.rows
+        self.non_null = self.non_null.add(other.non_null, fill_value=0).astype(np.int64)
+        self.moments.merge(other.moments)
+        for c, sk in self.sketches.items():
+            sk.merge(other.sketches[c])
+        for name, acc in self.groups.items():
+            acc.merge(other.groups[name])
+        for name, acc in self.counts.items():
+            acc.merge(other.counts[name])
+        return self
+
+    def describe(self):
+        m = self.moments
+        q = np.array([sk.quantile([0.25, 0.5, 0.75]) for sk in self.sketches.values()])
+        if not len(q):
+            q = np.empty((0, 3))
+        return pd.DataFrame(
+            [m.n, m.mean(), m.std(), m.min, q[:, 0], q[:, 1], q[:, 2], m.max],
+            index=["count", "mean", "std", "min", "25%", "50%", "75%", "max"],
+            columns=self.numeric)
+
+    def result(self):
+        out = {
+            "rows": self.rows,
+            "columns": self.columns,
+            "non_null": self.non_null,
+            "describe": self.describe(),
+            "corr": self.moments.corr(),
+        }
+        for name in GROUP_MEANS:
+            out[name] = self.groups[name].result() if name in self.groups else None
+        for name in VALUE_COUNTS:
+            out[name] = self.counts[name].result() if name in self.counts else None
+        out["stress_counts"] = (out["stress_counts"].sort_index()
+                                if out["stress_counts"] is not None else None)
+        return out
+
+
+def summarize_csv(path, chunksize=DEFAULT_CHUNKSIZE):
+    """Stream `path` in chunks of `chunksize` rows and return the EDA summary."""
+    acc = None
+    for chunk in read_csv_typed(path, chunksize=chunksize):
+        if acc is None:
+            numeric = chunk.select_dtypes(include="number").columns
+            acc = EDAAccumulator(chunk.columns, numeric)
+        acc.update(chunk)
+    if acc is None:
+        raise ValueError(f"{path} contains no rows")
+    return acc.result()
@@ -0,0 +1,81 @@
+"""
+Synthetic Smartphone Dataset
+====================================
+Generates rows with the same 13-column schema and value distributions as
+Smartphone_Usage_Productivity_Dataset_50000.csv (every field is uniform over
+the ranges / categories observed there), at any size.
+
+Run: python synthetic_data.py ROWS OUTPUT.csv [--seed N]
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+GENDER_CHOICES     = ["Male", "Female", "Other"]
+OCCUPATION_CHOICES = ["Professional", "Student", "Business Owner", "Freelancer"]
+DEVICE_CHOICES     = ["Android", "iOS"]
+
+# column -> (low, high, decimals), inclusive range
+NUMERIC_RANGES = {
+    "Age":                       (18, 60, 0),
+    "Daily_Phone_Hours":         (1.0, 12.0, 1),
+    "Social_Media_Hours":        (0.5, 8.0, 1),
+    "Work_Productivity_Score":   (1, 10, 0),
+    "Sleep_Hours":               (4.0, 9.0, 1),
+    "Stress_Level":              (1, 10, 0),
+    "App_Usage_Count":           (5, 60, 0),
+    "Caffeine_Intake_Cups":      (0, 6, 0),
+    "Weekend_Screen_Time_Hours": (2.0, 14.0, 1),
+}
+
+COLUMN_ORDER = ["User_ID", "Age", "Gender", "Occupation", "Device_Type",
+                "Daily_Phone_Hours", "Social_Media_Hours", "Work_Productivity_Score",
+                "Sleep_Hours", "Stress_Level", "App_Usage_Count",
+                "Caffeine_Intake_Cups", "Weekend_Screen_Time_Hours"]
+
+DEFAULT_CHUNK = 1_000_000
+
+
+def generate(n_rows, seed=0, start_id=1):
+    """
+    Return a DataFrame of `n_rows` synthetic respondents (User_ID from
+    start_id); `seed` is an int or a np.random.SeedSequence.
+    """
+    rng = np.random.default_rng(seed)
+    cols = {"User_ID": np.char.add("U", np.arange(start_id, start_id + n_rows).astype(str))}
+    cols["Gender"] = np.array(GENDER_CHOICES)[rng.integers(len(GENDER_CHOICES), size=n_rows)]
+    cols["Occupation"] = np.array(OCCUPATION_CHOICES)[rng.integers(len(OCCUPATION_CHOICES), size=n_rows)]
+    cols["Device_Type"] = np.array(DEVICE_CHOICES)[rng.integers(len(DEVICE_CHOICES), size=n_rows)]
+    for name, (lo, hi, dec) in NUMERIC_RANGES.items():
+        scale = 10 ** dec
+        steps = rng.integers(round(lo * scale), round(hi * scale) + 1, size=n_rows)
+        cols[name] = steps / scale if dec else steps
+    return pd.DataFrame(cols)[COLUMN_ORDER]
+
+
+def write_csv(path, n_rows, seed=0, chunk=DEFAULT_CHUNK):
+    """
+    Write `n_rows` synthetic rows to `path` in chunks (bounded memory). Each
+    chunk draws from its own child of SeedSequence(seed), so the streams of
+    different seeds never overlap.
+    """
+    written = 0
+    seeds = np.random.SeedSequence(seed).spawn(max(1, -(-n_rows // chunk)))
+    for i, start in enumerate(range(0, n_rows, chunk)):
+        n = min(chunk, n_rows - start)
+        generate(n, seed=seeds[i], start_id=start + 1).to_csv(
+            path, mode="w" if i == 0 else "a", header=(i == 0), index=False)
+        written += n
+    return written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic smartphone dataset.")
+    parser.add_argument("rows", type=int)
+    parser.add_argument("output")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    write_csv(args.output, args.rows, seed=args.seed)
+    print(f"Wrote {args.rows:,} rows → {args.output}")
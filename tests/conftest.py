@@ -0,0 +1,26 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DATA_CSV = os.path.join(ROOT, "Smartphone_Usage_Productivity_Dataset_50000.csv")
+ROWS = 4000
+
+
+@pytest.fixture(scope="session")
+def sample_csv(tmp_path_factory):
+    """The first ROWS rows of the bundled dataset, as its own CSV."""
+    path = tmp_path_factory.mktemp("data") / "sample.csv"
+    with open(DATA_CSV) as src, open(path, "w") as dst:
+        for _ in range(ROWS + 1):
+            dst.write(src.readline())
+    return str(path)
+
+
+@pytest.fixture(scope="session")
+def frame(sample_csv):
+    from loader import read_csv_typed
+    return read_csv_typed(sample_csv)
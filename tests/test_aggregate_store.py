@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from aggregate_store import AggregateStore
+from aggregates import compute_aggregates
+from loader import read_csv_typed
+
+
+def _lines(path):
+    with open(path) as f:
+        return f.readlines()
+
+
+def _assert_matches(store, csv_path):
+    got = store.report_aggregates()
+    want = compute_aggregates(read_csv_typed(csv_path))
+    assert got.n_rows == want.n_rows
+    for name in ("phone_occ", "stress_gender", "wknd_stress", "high_s", "low_s"):
+        np.testing.assert_allclose(np.asarray(getattr(got, name), dtype=float),
+                                   np.asarray(getattr(want, name), dtype=float), rtol=1e-6)
+    pd.testing.assert_series_equal(got.stress_dist, want.stress_dist, check_names=False,
+                                   check_dtype=False)
+    np.testing.assert_array_equal(got.usage_density, want.usage_density)
+
+
+def test_ingest_in_pieces_matches_full_recompute(sample_csv, tmp_path):
+    lines = _lines(sample_csv)
+    csv_path, store_path = str(tmp_path / "drop.csv"), str(tmp_path / "store.pkl")
+    with open(csv_path, "w") as f:
+        f.writelines(lines[:1501])
+    store = AggregateStore()
+    assert store.ingest(csv_path, chunksize=400) == 1500
+    store.save(store_path)
+
+    with open(csv_path, "a") as f:
+        f.writelines(lines[1501:])
+        f.write(lines[1][:20])                 # a partial last line is left for later
+    store = AggregateStore.load(store_path)
+    assert store.ingest(csv_path) == len(lines) - 1501
+    assert store.ingest(csv_path) == 0
+    assert store.sources[str(csv_path)]["rows"] == len(lines) - 1
+
+    with open(csv_path, "w") as f:             # drop the partial line before comparing
+        f.writelines(lines)
+    _assert_matches(store, csv_path)
+
+
+def test_rewritten_file_is_rejected(sample_csv, tmp_path):
+    lines = _lines(sample_csv)
+    csv_path = str(tmp_path / "drop.csv")
+    with open(csv_path, "w") as f:
+        f.writelines(lines[:101])
+    store = AggregateStore()
+    store.ingest(csv_path)
+    with open(csv_path, "w") as f:
+        f.writelines(lines[:1] + lines[201:401])
+    with pytest.raises(ValueError, match="rewritten"):
+        store.ingest(csv_path)
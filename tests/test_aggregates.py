@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from aggregates import (AGGREGATE_INPUTS, OCCS, PROFILE_COLS, STRESS_BINS, STRESS_GROUPS,
+                        aggregate_sums, compute_aggregates)
+
+
+@pytest.fixture(scope="module")
+def agg(frame):
+    return compute_aggregates(frame)
+
+
+def test_means_match_pandas_groupby(frame, agg):
+    by_occ = frame.groupby("Occupation", observed=True)
+    for name, column in [("phone_occ", "Daily_Phone_Hours"), ("stress_occ", "Stress_Level"),
+                         ("social_occ", "Social_Media_Hours"),
+                         ("caff_occ", "Caffeine_Intake_Cups"), ("sleep_occ", "Sleep_Hours")]:
+        expected = by_occ[column].mean()[OCCS]
+        np.testing.assert_allclose(getattr(agg, name).to_numpy(), expected.to_numpy())
+    np.testing.assert_array_equal(agg.occ_counts.to_numpy(),
+                                  frame["Occupation"].value_counts()[OCCS].to_numpy())
+
+
+def test_stress_breakdowns_match_pandas(frame, agg):
+    expected = (frame.groupby(["Occupation", "Gender"], observed=True)["Stress_Level"]
+                .mean().unstack()[["Female", "Male", "Other"]].loc[OCCS])
+    np.testing.assert_allclose(agg.stress_gender.to_numpy(), expected.to_numpy())
+
+    groups = pd.cut(frame["Stress_Level"], bins=STRESS_BINS, labels=STRESS_GROUPS)
+    for name, column in [("wkdy_stress", "Daily_Phone_Hours"),
+                         ("wknd_stress", "Weekend_Screen_Time_Hours")]:
+        expected = frame.groupby(groups, observed=True)[column].mean()
+        np.testing.assert_allclose(getattr(agg, name).to_numpy(), expected.to_numpy())
+
+    stress_dist = frame["Stress_Level"].value_counts().sort_index()
+    np.testing.assert_array_equal(agg.stress_dist.index, stress_dist.index)
+    np.testing.assert_array_equal(agg.stress_dist.to_numpy(), stress_dist.to_numpy())
+
+
+def test_cohort_profiles_match_pandas(frame, agg):
+    high = frame.loc[frame["Stress_Level"] >= 7, PROFILE_COLS].mean()
+    low = frame.loc[frame["Stress_Level"] <= 3, PROFILE_COLS].mean()
+    np.testing.assert_allclose(agg.high_s.to_numpy(), high.to_numpy(), rtol=1e-6)
+    np.testing.assert_allclose(agg.low_s.to_numpy(), low.to_numpy(), rtol=1e-6)
+    np.testing.assert_allclose(agg.cohort_test["mean_a"].to_numpy(), high.to_numpy(), rtol=1e-6)
+    assert agg.cohort_test["n_a"].iloc[0] == (frame["Stress_Level"] >= 7).sum()
+
+
+def test_names_limit_the_work(frame):
+    agg = compute_aggregates(frame, names=["phone_occ"])
+    assert agg.phone_occ is not None
+    assert agg.stress_gender is None and agg.cohort_test is None
+
+
+def _assert_same(a, b):
+    for name in AGGREGATE_INPUTS:
+        x, y = getattr(a, name), getattr(b, name)
+        if isinstance(x, pd.DataFrame) and name == "cohort_test":
+            pd.testing.assert_frame_equal(x, y, check_exact=False, rtol=1e-9)
+        elif isinstance(x, (pd.Series, pd.DataFrame)):
+            np.testing.assert_allclose(np.asarray(x, dtype=float), np.asarray(y, dtype=float),
+                                       rtol=1e-9)
+        else:
+            np.testing.assert_array_equal(x, y)
+
+
+def test_merged_chunks_equal_single_pass(frame):
+    whole = aggregate_sums(frame)
+    merged = aggregate_sums(frame.iloc[:1234])
+    for start in range(1234, len(frame), 1000):
+        merged.merge(aggregate_sums(frame.iloc[start:start + 1000]))
+    assert merged.n_rows == whole.n_rows == len(frame)
+    _assert_same(merged.finalize(), whole.finalize())
+
+
+def test_merge_rejects_other_categories(frame):
+    sums = aggregate_sums(frame.iloc[:10])
+    with pytest.raises(ValueError):
+        sums.merge(aggregate_sums(frame.iloc[10:20], occs=OCCS[::-1]))
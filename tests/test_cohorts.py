@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from cohorts import (compare_counts, grouped_value_counts, hedges_g, holm, merge_counts,
+                     moments, value_counts, welch)
+
+# Welch's t-test, worked example 1 on Wikipedia: t = -2.46, df = 25.0, p = 0.021
+A1 = [27.5, 21.0, 19.0, 23.6, 17.0, 17.9, 16.9, 20.1, 21.9, 22.6, 23.1, 19.6, 19.0, 21.7, 21.4]
+A2 = [27.1, 22.0, 20.8, 23.4, 23.4, 23.5, 25.8, 22.0, 24.8, 20.2, 21.9, 22.1, 22.9, 20.5, 24.4]
+
+
+def test_moments_from_value_counts():
+    n, mean, var = moments(value_counts(A1 + [np.nan]))
+    assert n == len(A1)
+    assert mean == pytest.approx(np.mean(A1))
+    assert var == pytest.approx(np.var(A1, ddof=1))
+
+
+def test_welch_reference_values():
+    (n_a, mean_a, var_a), (n_b, mean_b, var_b) = moments(value_counts(A1)), moments(value_counts(A2))
+    t, df, p = welch(mean_a, var_a, n_a, mean_b, var_b, n_b)
+    assert t == pytest.approx(-2.4554, abs=1e-4)
+    assert df == pytest.approx(24.9885, abs=1e-4)
+    assert p == pytest.approx(0.0214, abs=1e-4)
+
+
+def test_hedges_g_against_pooled_sd():
+    (n_a, mean_a, var_a), (n_b, mean_b, var_b) = moments(value_counts(A1)), moments(value_counts(A2))
+    pooled = np.sqrt((np.var(A1, ddof=1) + np.var(A2, ddof=1)) / 2)        # equal n
+    d = (np.mean(A1) - np.mean(A2)) / pooled
+    assert hedges_g(mean_a, var_a, n_a, mean_b, var_b, n_b) == pytest.approx(d * (1 - 3 / 111))
+
+
+def test_holm_step_down():
+    np.testing.assert_allclose(holm([0.01, 0.04, 0.03, 0.005]), [0.03, 0.06, 0.06, 0.02])
+    np.testing.assert_allclose(holm([0.5, 0.9]), [1.0, 1.0])
+
+
+def test_grouped_value_counts_match_per_group():
+    rng = np.random.default_rng(1)
+    codes = rng.integers(-1, 3, 1000)
+    values = rng.integers(0, 12, 1000) / 2
+    values[::97] = np.nan
+    for group, (distinct, counts) in enumerate(grouped_value_counts(codes, 3, values)):
+        want = value_counts(values[codes == group])
+        np.testing.assert_array_equal(distinct, want[0])
+        np.testing.assert_array_equal(counts, want[1])
+
+
+def test_merge_counts_equals_counts_of_union():
+    merged = merge_counts(value_counts(A1), value_counts(A2))
+    want = value_counts(A1 + A2)
+    np.testing.assert_array_equal(merged[0], want[0])
+    np.testing.assert_array_equal(merged[1], want[1])
+
+
+def test_compare_counts_table():
+    a, b = [value_counts(A1)], [value_counts(A2)]
+    result = compare_counts(a, b, ["x"], n_boot=400, seed=3)
+    row = result.loc["x"]
+    assert row["diff"] == pytest.approx(np.mean(A1) - np.mean(A2))
+    assert row["p"] == pytest.approx(0.0214, abs=1e-4)
+    assert row["p_holm"] == row["p"]                       # a family of one
+    assert row["diff_lo"] < row["diff"] < row["diff_hi"] < 0
+    again = compare_counts(a, b, ["x"], n_boot=400, seed=3)
+    assert again.loc["x", "diff_lo"] == row["diff_lo"]    # fixed seed, same interval
+    assert result.attrs["n_boot"] == 400
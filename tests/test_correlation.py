@@ -0,0 +1,80 @@
+import math
+
+import numpy as np
+import pytest
+
+from correlation import _betainc, corr_pvalue, correlate_csv, t_critical, t_pvalue
+from loader import NUMERIC_COLUMNS
+
+
+@pytest.mark.parametrize("a, b, x, expected", [
+    (3.0, 1.0, 0.4, 0.4 ** 3),                   # I_x(a, 1) = x^a
+    (1.0, 2.5, 0.3, 1 - 0.7 ** 2.5),             # I_x(1, b) = 1 - (1 - x)^b
+    (4.5, 4.5, 0.5, 0.5),                        # symmetry
+    (2.0, 3.0, 0.0, 0.0),
+    (2.0, 3.0, 1.0, 1.0),
+])
+def test_betainc_closed_forms(a, b, x, expected):
+    assert _betainc(a, b, x) == pytest.approx(expected, abs=1e-12)
+
+
+@pytest.mark.parametrize("t, df, p", [
+    (1.0, 1, 0.5),                               # Cauchy: 1 - 2/pi * atan(t)
+    (3.0, 1, 1 - 2 / math.pi * math.atan(3.0)),
+    (1.0, 2, 1 - 1 / math.sqrt(3)),              # df = 2: 1 - t / sqrt(2 + t^2)
+    (2.228, 10, 0.0500),                         # table values
+    (4.032, 5, 0.0100),
+    (2.086, 20, 0.0500),
+    (2.750, 30, 0.0100),
+    (0.0, 7, 1.0),
+])
+def test_t_pvalue_reference_values(t, df, p):
+    assert float(t_pvalue(t, df)) == pytest.approx(p, abs=1e-4)
+    assert float(t_pvalue(-t, df)) == pytest.approx(p, abs=1e-4)
+
+
+def test_t_pvalue_broadcasts():
+    p = t_pvalue([1.0, 1.0, np.nan], [1, 2, 5])
+    np.testing.assert_allclose(p[:2], [0.5, 1 - 1 / math.sqrt(3)])
+    assert np.isnan(p[2])
+
+
+@pytest.mark.parametrize("df, level, t", [
+    (1, 0.95, 12.7062), (4, 0.95, 2.7764), (10, 0.95, 2.2281), (30, 0.95, 2.0423),
+    (5, 0.99, 4.0321), (1e6, 0.95, 1.9600),
+])
+def test_t_critical_reference_values(df, level, t):
+    assert t_critical(df, level) == pytest.approx(t, abs=1e-4)
+    assert np.isnan(t_critical(0))
+
+
+def test_corr_pvalue():
+    np.testing.assert_allclose(corr_pvalue([0.0, 1.0], [50, 50]), [1.0, 0.0])
+    assert np.isnan(corr_pvalue(0.5, 2))
+
+
+def test_pearson_and_spearman_match_pandas(sample_csv, frame):
+    values = frame[NUMERIC_COLUMNS].astype(np.float64)
+    result = correlate_csv(sample_csv, chunksize=10_000)        # one chunk: exact ranks
+    np.testing.assert_allclose(result.matrix("pearson").to_numpy(),
+                               values.corr("pearson").to_numpy(), atol=1e-12)
+    np.testing.assert_allclose(result.matrix("spearman").to_numpy(),
+                               values.corr("spearman").to_numpy(), atol=1e-12)
+    students = values[frame["Occupation"] == "Student"]
+    np.testing.assert_allclose(result.matrix("spearman", group="Student").to_numpy(),
+                               students.corr("spearman").to_numpy(), atol=1e-12)
+    assert result.matrix("pearson", stat="n").iloc[0, 0] == len(frame)
+
+
+@pytest.mark.parametrize("chunksize, rank_bins, tol", [
+    (500, 128, 1e-3),        # edges from the first chunk miss a few rare values
+    (500, 16, 1e-2),         # quantile bins: ties within a bin approximated
+])
+def test_binned_spearman_within_tolerance(sample_csv, frame, chunksize, rank_bins, tol):
+    result = correlate_csv(sample_csv, chunksize=chunksize, rank_bins=rank_bins)
+    expected = frame[NUMERIC_COLUMNS].astype(np.float64).corr("spearman")
+    np.testing.assert_allclose(result.matrix("spearman").to_numpy(), expected.to_numpy(),
+                               atol=tol)
+    np.testing.assert_allclose(result.matrix("pearson").to_numpy(),
+                               frame[NUMERIC_COLUMNS].astype(np.float64).corr().to_numpy(),
+                               atol=1e-12)
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from aggregates import AGE_BANDS, AGE_BINS
+from cube import Cube, where_mask
+
+MEASURES = ["Stress_Level", "Sleep_Hours"]
+
+
+@pytest.fixture(scope="module")
+def cube(frame):
+    return Cube.from_frame(frame)
+
+
+def _groups(frame, by):
+    keys = [pd.cut(frame["Age"], AGE_BINS, labels=AGE_BANDS) if d == "age_band" else frame[d]
+            for d in by]
+    return frame[MEASURES].astype(np.float64).groupby(keys, observed=True)
+
+
+@pytest.mark.parametrize("by", [["Occupation"], ["Gender", "age_band"], ["Device_Type"]])
+def test_rollup_matches_groupby(cube, frame, by):
+    got = cube.rollup(by, MEASURES, ["count", "sum", "mean", "std"])
+    groups = _groups(frame, by)
+    want = groups.agg(["count", "sum", "mean", "std"])
+    assert [tuple(np.atleast_1d(k)) for k in got.index] == \
+        [tuple(np.atleast_1d(k)) for k in want.index]
+    np.testing.assert_array_equal(got["rows"].to_numpy().ravel(), groups.size().to_numpy())
+    for measure in MEASURES:
+        for stat in ("count", "sum", "mean", "std"):
+            np.testing.assert_allclose(got[(measure, stat)].to_numpy(),
+                                       want[(measure, stat)].to_numpy(), rtol=1e-9)
+
+
+def test_rollup_of_everything(cube, frame):
+    got = cube.rollup([], ["Sleep_Hours"], ["mean"])
+    assert got.loc["all", ("rows", "")] == len(frame)
+    assert got.loc["all", ("Sleep_Hours", "mean")] == pytest.approx(
+        frame["Sleep_Hours"].astype(np.float64).mean())
+
+
+def test_slice_matches_filtered_groupby(cube, frame):
+    where = {"Gender": "Female", "Occupation": ["Student", "Freelancer"]}
+    got = cube.rollup(["Device_Type"], MEASURES, ["count", "mean"], **where)
+    rows = frame[where_mask(frame, where)]
+    assert set(rows["Gender"]) == {"Female"}
+    want = rows[MEASURES].astype(np.float64).groupby(rows["Device_Type"], observed=True).mean()
+    np.testing.assert_allclose(got.xs("mean", axis=1, level="stat").to_numpy(),
+                               want.to_numpy(), rtol=1e-9)
+    sliced = cube.slice(**where)
+    assert sliced.levels["Occupation"] == ["Student", "Freelancer"]
+    assert sliced.rows.sum() == len(rows)
+    with pytest.raises(KeyError):
+        cube.slice(Gender="Robot")
+
+
+def test_merged_halves_equal_whole(cube, frame):
+    merged = Cube.from_frame(frame.iloc[:1500]).merge(Cube.from_frame(frame.iloc[1500:]))
+    assert merged.levels == cube.levels
+    for mine, whole in zip(merged._arrays(), cube._arrays()):
+        np.testing.assert_allclose(mine, whole, rtol=1e-12)
+    assert merged.n_rows == cube.n_rows == len(frame)
+
+
+def test_npz_round_trip(cube, tmp_path):
+    path = str(tmp_path / "cube.npz")
+    cube.save(path)
+    back = Cube.load(path)
+    assert (back.dims, back.measures, back.levels) == (cube.dims, cube.measures, cube.levels)
+    for mine, saved in zip(back._arrays(), cube._arrays()):
+        np.testing.assert_array_equal(mine, saved)
+    pd.testing.assert_frame_equal(back.rollup(["Occupation"]), cube.rollup(["Occupation"]))
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from aggregates import compute_aggregates
+from dataset import CompactDataset, is_snapshot, load_compact, open_snapshot, write_snapshot
+
+
+@pytest.fixture(scope="module")
+def compact(frame):
+    return CompactDataset.from_frame(frame)
+
+
+def test_snapshot_round_trip(compact, frame, tmp_path):
+    path = write_snapshot(compact, str(tmp_path / "data.cds"))
+    assert is_snapshot(path)
+    back = open_snapshot(path)
+    assert len(back) == len(frame) and back.columns == compact.columns
+    for name in compact.columns:
+        np.testing.assert_array_equal(back.arrays[name], compact.arrays[name])
+        assert back.encodings[name] == compact.encodings[name]
+    pd.testing.assert_frame_equal(back.to_frame(), frame, check_dtype=False,
+                                  check_categorical=False)
+
+
+def test_snapshot_column_subset(compact, tmp_path):
+    path = write_snapshot(compact, str(tmp_path / "data.cds"))
+    back = load_compact(path, columns=["Occupation", "Sleep_Hours"])
+    assert back.columns == ["Occupation", "Sleep_Hours"]
+    with pytest.raises(KeyError):
+        open_snapshot(path, columns=["Nope"])
+
+
+def test_snapshot_aggregates_match_frame(compact, frame, tmp_path):
+    back = open_snapshot(write_snapshot(compact, str(tmp_path / "data.cds")))
+    got, want = compute_aggregates(back), compute_aggregates(frame)
+    np.testing.assert_allclose(got.stress_gender.to_numpy(), want.stress_gender.to_numpy(),
+                               rtol=1e-6)
+    np.testing.assert_array_equal(got.occ_counts.to_numpy(), want.occ_counts.to_numpy())
+
+
+def test_csv_is_not_a_snapshot(sample_csv):
+    assert not is_snapshot(sample_csv)
+    with pytest.raises(ValueError):
+        open_snapshot(sample_csv)
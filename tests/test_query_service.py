@@ -0,0 +1,111 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from query_service import QueryEngine, QueryError, QueryService, normalize
+
+
+class SlowEngine:
+    """Stands in for QueryEngine: counts calls, each taking `delay` seconds."""
+
+    def __init__(self, delay=0.05, fail=False):
+        self.delay, self.fail = delay, fail
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def run(self, query):
+        with self.lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise QueryError("bad query")
+        return {"by": query.get("by"), "value": float("nan")}
+
+
+def rollup(by):
+    return {"kind": "rollup", "by": [by]}
+
+
+def test_concurrent_identical_queries_are_coalesced():
+    engine = SlowEngine()
+    service = QueryService(engine)
+
+    async def go():
+        answers = await asyncio.gather(*[service.answer(rollup("Gender")) for _ in range(5)])
+        return answers + [await service.answer(rollup("Gender"))]
+
+    answers = asyncio.run(go())
+    assert engine.calls == 1
+    assert sorted(source for _, source in answers) == ["cache"] + ["coalesced"] * 4 + ["computed"]
+    assert all(result == {"by": ["Gender"], "value": None} for result, _ in answers)
+    assert service.stats()["inflight"] == 0
+
+
+def test_lru_evicts_least_recently_used():
+    engine = SlowEngine(delay=0)
+    service = QueryService(engine, cache_size=2)
+
+    async def go():
+        sources = []
+        for by in ["Gender", "Occupation", "Gender", "Device_Type", "Gender", "Occupation"]:
+            sources.append((await service.answer(rollup(by)))[1])
+        return sources
+
+    assert asyncio.run(go()) == ["computed", "computed", "cache", "computed", "cache", "computed"]
+    assert engine.calls == 4 and service.stats()["cached"] == 2
+
+
+def test_errors_reach_every_waiter_and_are_not_cached():
+    engine = SlowEngine(fail=True)
+    service = QueryService(engine)
+
+    async def go():
+        return await asyncio.gather(*[service.answer(rollup("Gender")) for _ in range(3)],
+                                    return_exceptions=True)
+
+    assert all(isinstance(r, QueryError) for r in asyncio.run(go()))
+    asyncio.run(go())
+    assert engine.calls == 2 and service.stats()["cached"] == 0
+
+
+def test_cancelled_leader_releases_coalesced_waiters():
+    service = QueryService(SlowEngine(delay=0.3))
+
+    async def go():
+        leader = asyncio.create_task(service.answer(rollup("Gender")))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(service.answer(rollup("Gender")))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await asyncio.wait_for(asyncio.gather(waiter, return_exceptions=True), 1)
+
+    (result,) = asyncio.run(go())
+    assert isinstance(result, RuntimeError)
+    assert service.stats()["inflight"] == 0
+
+
+def test_normalize_is_canonical_and_validates_where():
+    assert (normalize({"by": "Gender", "Occupation": ["Student", "Freelancer"]})
+            == normalize({"kind": "rollup", "by": ["Gender"],
+                          "where": {"Occupation": ["Freelancer", "Student"]}}))
+    for where in [{"Gender": 1}, {"Gender": []}, {"Gender": ["Male", None]}, ["Gender"]]:
+        with pytest.raises(QueryError):
+            normalize({"where": where})
+    with pytest.raises(QueryError):
+        normalize({"bogus": 1})
+
+
+def test_engine_rollup_matches_pandas(frame):
+    from dataset import CompactDataset
+
+    engine = QueryEngine(CompactDataset.from_frame(frame))
+    query = normalize({"by": "Occupation", "measures": "Stress_Level", "stats": "mean",
+                       "Gender": "Female"})
+    rows = engine.run(query)["rows"]
+    want = (frame[frame["Gender"] == "Female"]
+            .groupby("Occupation", observed=True)["Stress_Level"].mean())
+    assert {r["Occupation"]: r["Stress_Level.mean"] for r in rows} == pytest.approx(want.to_dict())
+    with pytest.raises(QueryError):
+        engine.run(normalize({"by": "Nope"}))
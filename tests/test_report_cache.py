@@ -0,0 +1,86 @@
+import importlib.util
+import itertools
+import sys
+
+import pytest
+
+import cohorts
+import report_pages
+from aggregates import compute_aggregates
+from report_cache import ReportCache
+
+
+@pytest.fixture(scope="module")
+def agg(frame):
+    return compute_aggregates(frame)
+
+
+@pytest.fixture
+def page_keys(agg, tmp_path, monkeypatch):
+    """Page keys of report_pages.py after replacing `old` with `new` in its source."""
+    cache = ReportCache(str(tmp_path / "cache"))
+    with open(report_pages.__file__, encoding="utf-8") as f:
+        source = f.read()
+    copies = itertools.count()
+
+    def keys(old="", new=""):
+        assert source.count(old) >= 1
+        path = tmp_path / f"edited_pages_{next(copies)}.py"
+        path.write_text(source.replace(old, new, 1), encoding="utf-8")
+        spec = importlib.util.spec_from_file_location(path.stem, path)
+        module = importlib.util.module_from_spec(spec)
+        monkeypatch.setitem(sys.modules, path.stem, module)
+        spec.loader.exec_module(module)
+        shared = module.style_fingerprint()
+        return [cache.page_key(page, agg, shared) for page in module.PAGES]
+
+    return keys
+
+
+def test_unchanged_source_keeps_page_keys(page_keys):
+    assert page_keys() == page_keys()
+
+
+@pytest.mark.parametrize("old, new", [
+    ('    return occ + "s"', '    return occ + "es"'),                      # plural
+    ('OCC_ICONS = {"Student": "🎓"', 'OCC_ICONS = {"Student": "📚"'),
+])
+def test_editing_a_page_helper_invalidates_every_page(page_keys, old, new):
+    before, after = page_keys(), page_keys(old, new)
+    assert all(a != b for a, b in zip(before, after))
+
+
+@pytest.mark.parametrize("old, new", [
+    ("def zoom_limits(values, rel=0.03,", "def zoom_limits(values, rel=0.05,"),
+    ("def occupied_limits(counts, spec, pad=1):", "def occupied_limits(counts, spec, pad=2):"),
+    ("def is_uniform(counts, tol=0.05):", "def is_uniform(counts, tol=0.10):"),
+])
+def test_editing_scale_and_label_helpers_invalidates_pages(page_keys, old, new):
+    before, after = page_keys(), page_keys(old, new)
+    assert all(a != b for a, b in zip(before, after))
+
+
+@pytest.mark.parametrize("old, new", [
+    ("def meaningful(result, alpha=0.05, min_g=0.2):",
+     "def meaningful(result, alpha=0.05, min_g=0.3):"),
+    ('(0.5, "small")', '(0.5, "modest")'),
+])
+def test_editing_cohort_thresholds_invalidates_pages(agg, tmp_path, monkeypatch, old, new):
+    cache = ReportCache(str(tmp_path / "cache"))
+
+    def keys():
+        shared = report_pages.style_fingerprint()
+        return [cache.page_key(page, agg, shared) for page in report_pages.PAGES]
+
+    before = keys()
+    with open(cohorts.__file__, encoding="utf-8") as f:
+        source = f.read()
+    assert old in source
+    path = tmp_path / "edited_cohorts.py"
+    path.write_text(source.replace(old, new, 1), encoding="utf-8")
+    spec = importlib.util.spec_from_file_location(path.stem, path)
+    edited = importlib.util.module_from_spec(spec)
+    monkeypatch.setitem(sys.modules, path.stem, edited)
+    spec.loader.exec_module(edited)
+    monkeypatch.setattr(report_pages, "cohorts", edited)
+    assert all(a != b for a, b in zip(before, keys()))
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from correlation import t_critical
+from loader import NUMERIC_COLUMNS
+from sampling import MIN_BLOCKS, Design, block_sample, preview_csv
+
+
+def test_block_sample_draws_whole_rows_from_enough_blocks(sample_csv, frame):
+    df, psu, drawn, n_blocks = block_sample(sample_csv, sample_rows=500, seed=3)
+    assert len(df) >= 500 and len(psu) == len(df)
+    assert drawn >= MIN_BLOCKS and n_blocks > drawn
+    np.testing.assert_array_equal(np.unique(psu), np.arange(drawn))
+    assert df["User_ID"].is_unique
+    assert set(df["User_ID"]) <= set(frame["User_ID"])
+    assert df[NUMERIC_COLUMNS].notna().all().all()
+
+
+def test_block_sample_rejects_multiline_records(sample_csv, tmp_path):
+    with open(sample_csv) as f:
+        lines = f.readlines()
+    first = lines[1].split(",")
+    first[3] = '"Free\nlancer"'                       # Occupation with a line break
+    path = tmp_path / "multiline.csv"
+    path.write_text("".join(lines[:1] + [",".join(first)] + lines[2:300]))
+    with pytest.raises(ValueError, match="spanning lines"):
+        block_sample(str(path), sample_rows=1000)
+
+
+def test_design_matches_simple_random_sample_formula():
+    rng = np.random.default_rng(0)
+    y, population = rng.normal(10, 2, 50), 1000
+    design = Design(np.zeros(len(y)), np.arange(len(y)), [population])
+    mean, half = design.ratio(y)
+    expected = t_critical(len(y) - 1) * np.sqrt((1 - len(y) / population)
+                                                * y.var(ddof=1) / len(y))
+    assert mean == pytest.approx(y.mean())
+    assert half == pytest.approx(expected)
+    total, total_half = design.total(np.ones(len(y)))
+    assert total == pytest.approx(population) and total_half == pytest.approx(0)
+
+
+@pytest.mark.parametrize("method", ["blocks", "reservoir"])
+def test_ratio_estimator_intervals_cover_the_full_data_means(sample_csv, frame, method):
+    true = frame[NUMERIC_COLUMNS].astype(np.float64).mean()
+    by_occ = frame.groupby("Occupation", observed=True)["Daily_Phone_Hours"].mean()
+    covered = []
+    for seed in range(30):
+        summary = preview_csv(sample_csv, sample_rows=400, method=method, seed=seed)
+        mean, half = summary["describe"].loc["mean"], summary["ci"]["describe"].loc["mean"]
+        covered += list((mean - true).abs() <= half)
+        covered += list((summary["avg_phone"] - by_occ).abs() <= summary["ci"]["avg_phone"])
+    assert np.mean(covered) >= 0.88                    # nominal 95%
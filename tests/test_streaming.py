@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from loader import NUMERIC_COLUMNS
+from streaming import MomentAccumulator, QuantileSketch, summarize_csv
+
+
+@pytest.fixture(scope="module")
+def summary(sample_csv):
+    return summarize_csv(sample_csv, chunksize=333)
+
+
+def test_describe_and_corr_match_in_memory(summary, frame):
+    numeric = frame[NUMERIC_COLUMNS].astype(np.float64)
+    assert summary["rows"] == len(frame)
+    pd.testing.assert_series_equal(summary["non_null"], frame.notna().sum(), check_dtype=False)
+    # fewer rows than the sketch size, so the quartiles are exact too
+    pd.testing.assert_frame_equal(summary["describe"], numeric.describe(), rtol=1e-9)
+    pd.testing.assert_frame_equal(summary["corr"], numeric.corr(), rtol=1e-9)
+
+
+@pytest.mark.parametrize("name, key, value", [
+    ("avg_phone", "Occupation", "Daily_Phone_Hours"),
+    ("avg_stress_occ", "Occupation", "Stress_Level"),
+    ("avg_stress_age", "Age", "Stress_Level"),
+    ("avg_caffeine", "Occupation", "Caffeine_Intake_Cups"),
+])
+def test_group_means_match_groupby(summary, frame, name, key, value):
+    expected = frame[value].astype(np.float64).groupby(frame[key], observed=True).mean()
+    got = summary[name]
+    assert list(got.index) == list(expected.index)
+    np.testing.assert_allclose(got.to_numpy(), expected.to_numpy(), rtol=1e-12)
+
+
+def test_value_counts_match(summary, frame):
+    stress = frame["Stress_Level"].value_counts().sort_index()
+    np.testing.assert_array_equal(summary["stress_counts"].index, stress.index)
+    np.testing.assert_array_equal(summary["stress_counts"].to_numpy(), stress.to_numpy())
+    occupations = frame["Occupation"].value_counts()
+    assert summary["occupation_counts"].to_dict() == occupations.to_dict()
+
+
+def test_merged_moments_equal_one_pass(frame):
+    whole = MomentAccumulator(NUMERIC_COLUMNS).update(frame)
+    merged = MomentAccumulator(NUMERIC_COLUMNS).update(frame.iloc[:1000])
+    merged.merge(MomentAccumulator(NUMERIC_COLUMNS).update(frame.iloc[1000:]))
+    np.testing.assert_allclose(merged.mean(), whole.mean(), rtol=1e-12)
+    np.testing.assert_allclose(merged.std(), whole.std(), rtol=1e-9)
+    np.testing.assert_allclose(merged.corr().to_numpy(), whole.corr().to_numpy(), atol=1e-12)
+    np.testing.assert_array_equal(merged.min, whole.min)
+    np.testing.assert_array_equal(merged.max, whole.max)
+
+
+def test_sketch_is_exact_below_k():
+    values = np.random.default_rng(0).normal(size=500)
+    qs = [0.1, 0.25, 0.5, 0.9]
+    np.testing.assert_allclose(QuantileSketch(k=512).update(values).quantile(qs),
+                               np.quantile(values, qs))
+
+
+@pytest.mark.parametrize("k", [64, 256])
+def test_merged_sketch_rank_error_is_order_one_over_k(k):
+    rng = np.random.default_rng(1)
+    values = rng.lognormal(size=100_000)
+    parts = [QuantileSketch(k, seed=i).update(part)
+             for i, part in enumerate(np.array_split(values, 23))]
+    sketch = parts[0]
+    for part in parts[1:]:
+        sketch.merge(part)
+    qs = np.linspace(0.01, 0.99, 99)
+    ranks = np.searchsorted(np.sort(values), sketch.quantile(qs)) / len(values)
+    assert np.abs(ranks - qs).max() <= 4 / k
@@ -0,0 +1,26 @@
+import pandas as pd
+
+from loader import SCHEMA, read_csv_typed
+from synthetic_data import NUMERIC_RANGES, write_csv
+
+
+def test_rows_follow_the_schema_and_ranges(tmp_path):
+    path = str(tmp_path / "synthetic.csv")
+    assert write_csv(path, 2500, seed=0, chunk=1000) == 2500
+    df = read_csv_typed(path)
+    assert list(df.columns) == list(SCHEMA) and df["User_ID"].is_unique
+    for name, (lo, hi, _) in NUMERIC_RANGES.items():
+        assert lo <= df[name].min() and df[name].max() <= hi + 1e-6
+
+
+def test_chunk_streams_of_neighbouring_seeds_do_not_overlap(tmp_path):
+    frames = {}
+    for seed in (1, 2):
+        path = str(tmp_path / f"seed{seed}.csv")
+        write_csv(path, 2000, seed=seed, chunk=1000)
+        frames[seed] = pd.read_csv(path).drop(columns="User_ID")
+    # with seed + i per chunk, seed 1's second chunk was seed 2's first
+    assert not frames[1].iloc[1000:].reset_index(drop=True).equals(frames[2].iloc[:1000])
+    same_seed = str(tmp_path / "again.csv")
+    write_csv(same_seed, 2000, seed=1, chunk=1000)
+    assert pd.read_csv(same_seed).drop(columns="User_ID").equals(frames[1])
@@ -0,0 +1,81 @@
+import pandas as pd
+import pytest
+
+from validate import Validator, load_validated, validate_csv
+
+FAULTS = {
+    "range:Age": 1,
+    "category:Gender": 1,
+    "schema:Daily_Phone_Hours": 1,
+    "rule:phone_plus_sleep_le_24h": 1,
+    "duplicate:User_ID": 1,
+    "missing:Sleep_Hours": 1,
+}
+
+
+@pytest.fixture(scope="module")
+def dirty_csv(sample_csv, tmp_path_factory):
+    """First 500 rows with one row per quarantining fault in FAULTS."""
+    df = pd.read_csv(sample_csv, dtype=str, nrows=500, keep_default_na=False)
+    df.loc[0, "Age"] = "5"
+    df.loc[1, "Gender"] = "Robot"
+    df.loc[2, "Daily_Phone_Hours"] = "abc"
+    df.loc[3, ["Daily_Phone_Hours", "Sleep_Hours"]] = ["20", "8"]
+    df.loc[5, "User_ID"] = df.loc[4, "User_ID"]
+    df.loc[6, "Sleep_Hours"] = ""
+    path = tmp_path_factory.mktemp("dirty") / "dirty.csv"
+    df.to_csv(path, index=False)
+    return str(path)
+
+
+def test_quarantine_counts(dirty_csv, tmp_path):
+    bad, clean = str(tmp_path / "bad.csv"), str(tmp_path / "clean.csv")
+    summary = validate_csv(dirty_csv, quarantine=bad, clean=clean, chunksize=128)
+    assert (summary["rows"], summary["quarantined"], summary["clean"]) == (500, 6, 494)
+    rules = {r["rule"]: r for r in summary["rules"]}
+    for rule, rows in FAULTS.items():
+        assert rules[rule]["rows"] == rows and rules[rule]["action"] == "quarantine"
+    assert rules["rule:social_media_le_phone"]["action"] == "flag"
+
+    quarantined = pd.read_csv(bad)
+    assert len(quarantined) == 6 and len(pd.read_csv(clean)) == 494
+    labels = [set(text.split(";")) & set(FAULTS) for text in quarantined["_violations"]]
+    assert sorted(rule for found in labels for rule in found) == sorted(FAULTS)
+
+
+def test_strict_quarantines_flagged_rows(dirty_csv):
+    lenient, strict = validate_csv(dirty_csv), validate_csv(dirty_csv, strict=True)
+    flagged = {r["rule"]: r["rows"] for r in lenient["rules"]}["rule:social_media_le_phone"]
+    assert lenient["quarantined"] < strict["quarantined"] <= lenient["quarantined"] + flagged
+
+
+def test_load_validated_drops_quarantined_rows(dirty_csv):
+    data, validator = load_validated(dirty_csv, chunksize=128)
+    assert len(data) == 494 and validator.quarantined == 6
+    assert data.values("Age").min() >= 13
+    assert set(data["Gender"].dropna()) <= {"Female", "Male", "Other"}
+
+
+def test_clean_frame_passes(frame):
+    result = Validator().check(frame)
+    assert result.keep.all()
+
+
+def test_fractional_values_in_integer_columns_are_quarantined(sample_csv, tmp_path):
+    df = pd.read_csv(sample_csv, dtype=str, nrows=50, keep_default_na=False)
+    df.loc[0, "Stress_Level"] = "5.5"
+    df.loc[1, "Age"] = "30.7"
+    df.loc[2, "App_Usage_Count"] = "12.0"          # integral: loads as 12
+    path, bad = str(tmp_path / "fractional.csv"), str(tmp_path / "bad.csv")
+    df.to_csv(path, index=False)
+
+    summary = validate_csv(path, quarantine=bad)
+    rules = {r["rule"]: r["rows"] for r in summary["rules"]}
+    assert rules["integer:Stress_Level"] == 1 and rules["integer:Age"] == 1
+    assert "integer:App_Usage_Count" not in rules
+    assert summary["quarantined"] == 2
+    assert set(pd.read_csv(bad)["User_ID"]) == set(df["User_ID"][:2])
+
+    data, _ = load_validated(path)
+    assert len(data) == 48
+    assert data.values("App_Usage_Count")[0] == 12
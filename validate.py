@@ -0,0 +1,380 @@
+"""
+Data Validation
+====================================
+Schema-and-rules check of the smartphone dataset, run chunk by chunk with one
+vectorized mask per rule, before the data reaches the analysis:
+
+- schema   : expected columns present; numeric columns actually numeric
+- missing  : no empty values in the schema columns
+- range    : numeric values inside RANGES (Stress_Level 1–10, hours 0–24, …)
+- integer  : no fractional values in the integer-typed columns (Age,
+             Stress_Level, …), which would otherwise be truncated on load
+- category : Gender / Occupation / Device_Type inside CATEGORIES
+- duplicate: User_ID seen before (in this chunk or an earlier one)
+- rule     : cross-column constraints (CROSS_RULES)
+
+Each rule either quarantines the row (it is left out of the clean output and
+written to the quarantine file with its violations) or only flags it (counted
+in the summary). Social_Media_Hours > Daily_Phone_Hours only flags by
+default: it holds for ~29% of the shipped sample, so quarantining it would
+discard a third of the data; --strict quarantines on every rule.
+
+Duplicate User_IDs are found without keeping the IDs as Python objects:
+"<prefix><digits>" IDs become integers (pyarrow compute when available,
+else a hash), kept in sorted NumPy runs that merge as they grow.
+
+Run:
+    python validate.py data.csv [--quarantine bad.csv] [--clean clean.csv] [--summary s.json]
+    python smartphone_analysis.py --data data.csv --validate   # drop quarantined rows first
+
+Usage:
+    from validate import Validator, validate_csv
+    summary = validate_csv("data.csv", quarantine="bad.csv")
+    keep = Validator().check(df).keep          # in-memory frame or CompactDataset
+    data, validator = load_validated("data.csv")   # CompactDataset of the clean rows
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from aggregates import DEVICE_TYPES, GENDERS, OCCS
+from loader import DEFAULT_CHUNKSIZE, NUMERIC_COLUMNS, SCHEMA
+
+# column -> (min, max), inclusive
+RANGES = {
+    "Age":                       (13, 100),
+    "Daily_Phone_Hours":         (0, 24),
+    "Social_Media_Hours":        (0, 24),
+    "Work_Productivity_Score":   (1, 10),
+    "Sleep_Hours":               (0, 24),
+    "Stress_Level":              (1, 10),
+    "App_Usage_Count":           (0, 10_000),
+    "Caffeine_Intake_Cups":      (0, 30),
+    "Weekend_Screen_Time_Hours": (0, 24),
+}
+INTEGER_COLUMNS = [c for c in NUMERIC_COLUMNS if SCHEMA[c].startswith("int")]
+CATEGORIES = {
+    "Gender":      GENDERS,
+    "Occupation":  OCCS,
+    "Device_Type": DEVICE_TYPES,
+}
+# name -> (columns, violation mask of a chunk, default action)
+CROSS_RULES = {
+    "social_media_le_phone": (
+        ("Social_Media_Hours", "Daily_Phone_Hours"),
+        lambda col: col("Social_Media_Hours") > col("Daily_Phone_Hours"),
+        "flag"),
+    "phone_plus_sleep_le_24h": (
+        ("Daily_Phone_Hours", "Sleep_Hours"),
+        lambda col: col("Daily_Phone_Hours") + col("Sleep_Hours") > 24,
+        "quarantine"),
+}
+ID_COLUMN = "User_ID"
+ACTIONS = ("quarantine", "flag")
+
+_HAVE_ARROW = importlib.util.find_spec("pyarrow") is not None
+
+
+# ── Duplicate keys ────────────────────────────────────────────────────────
+def id_keys(series):
+    """
+    int64 key per ID: the number of "<prefix><digits>" IDs (same rule as
+    dataset._parse_ids), otherwise a 64-bit hash of the string.
+    """
+    values = series.array
+    if _HAVE_ARROW and len(values):
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        try:
+            arr = pa.array(values, type=pa.string())
+            prefix = str(values[0]).rstrip("0123456789")
+            digits = pc.utf8_slice_codeunits(arr, len(prefix))
+            if (pc.all(pc.starts_with(arr, prefix)).as_py()
+                    and not pc.any(pc.and_(pc.starts_with(digits, "0"),
+                                           pc.greater(pc.utf8_length(digits), 1))).as_py()):
+                return pc.cast(digits, pa.int64()).to_numpy(zero_copy_only=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError):
+            pass
+    return pd.util.hash_array(np.asarray(series.astype(object))).view(np.int64)
+
+
+class SeenKeys:
+    """Set of integer keys as sorted runs of doubling size (vectorized lookups)."""
+
+    def __init__(self):
+        self.runs = []
+
+    def __len__(self):
+        return sum(len(r) for r in self.runs)
+
+    def add(self, keys):
+        """Mark keys seen; returns a mask of keys already seen (earlier or in `keys`)."""
+        keys = np.asarray(keys)
+        order = np.argsort(keys, kind="stable")
+        ordered = keys[order]
+        repeat = np.zeros(len(keys), dtype=bool)
+        repeat[order[1:]] = ordered[1:] == ordered[:-1]     # later copies in this batch
+        for run in self.runs:
+            pos = np.searchsorted(run, keys)
+            repeat |= (pos < len(run)) & (run[np.minimum(pos, len(run) - 1)] == keys)
+        fresh = ordered[~repeat[order]]                      # sorted, distinct, unseen
+        while self.runs and len(self.runs[-1]) <= len(fresh):
+            # disjoint sorted runs: the stable sort (timsort) merges them in O(n)
+            fresh = np.concatenate([self.runs.pop(), fresh])
+            fresh.sort(kind="stable")
+        if len(fresh):
+            self.runs.append(fresh)
+        return repeat
+
+
+# ── Rule evaluation ───────────────────────────────────────────────────────
+class ChunkResult:
+    """Violation masks for one chunk."""
+
+    def __init__(self, n, violations, actions):
+        self.violations = violations        # rule -> bool mask
+        quarantine = np.zeros(n, dtype=bool)
+        for rule, mask in violations.items():
+            if actions[rule] == "quarantine":
+                quarantine |= mask
+        self.quarantine = quarantine
+        self.keep = ~quarantine
+
+    def labels(self, mask):
+        """';'-joined violated rules for the rows selected by `mask`."""
+        rows = np.flatnonzero(mask)
+        out = np.full(len(rows), "", dtype=object)
+        for rule, violated in self.violations.items():
+            hit = violated[rows]
+            out[hit] = out[hit] + np.where(out[hit] == "", "", ";") + rule
+        return out
+
+
+class Validator:
+    """
+    Applies the rules to successive chunks (or one in-memory frame /
+    CompactDataset) and accumulates per-rule counts for the summary.
+    """
+
+    def __init__(self, strict=False, ranges=RANGES, integers=INTEGER_COLUMNS,
+                 categories=CATEGORIES, cross_rules=CROSS_RULES, check_ids=True,
+                 expected=tuple(SCHEMA)):
+        self.strict = strict
+        self.expected = list(expected)
+        self.ranges = ranges
+        self.integers = list(integers)
+        self.categories = categories
+        self.cross_rules = cross_rules
+        self.check_ids = check_ids
+        self.seen = SeenKeys()
+        self.counts = {}
+        self.actions = {}
+        self.schema_issues = []
+        self.rows = 0
+        self.quarantined = 0
+
+    def _action(self, default):
+        return "quarantine" if self.strict else default
+
+    def _record(self, violations, rule, mask, action):
+        mask = np.asarray(mask, dtype=bool)
+        self.actions.setdefault(rule, action)
+        self.counts[rule] = self.counts.get(rule, 0) + int(mask.sum())
+        violations[rule] = mask
+
+    def _check_schema(self, columns):
+        if self.rows or self.schema_issues:
+            return
+        missing = [c for c in self.expected if c not in columns]
+        extra = [c for c in columns if c not in SCHEMA]
+        self.schema_issues += [f"missing column {c}" for c in missing]
+        self.schema_issues += [f"unexpected column {c}" for c in extra]
+
+    def check(self, data):
+        """Violation masks for `data`; counts are added to the summary."""
+        columns = list(data.columns)
+        self._check_schema(columns)
+        n = len(data)
+        violations = {}
+        numeric = {}
+
+        def col(name):
+            if name not in numeric:
+                values = data[name]
+                if not pd.api.types.is_numeric_dtype(values.dtype):
+                    parsed = pd.to_numeric(values, errors="coerce")
+                    self._record(violations, f"schema:{name}",
+                                 parsed.isna().to_numpy() & values.notna().to_numpy(),
+                                 "quarantine")
+                    values = parsed
+                numeric[name] = values.to_numpy(dtype=np.float64, na_value=np.nan)
+            return numeric[name]
+
+        for name in SCHEMA:
+            if name in columns:
+                self._record(violations, f"missing:{name}", data[name].isna().to_numpy(),
+                             "quarantine")
+        for name, (lo, hi) in self.ranges.items():
+            if name in columns:
+                values = col(name)
+                self._record(violations, f"range:{name}", (values < lo) | (values > hi),
+                             "quarantine")
+        for name in self.integers:
+            if name in columns:
+                values = col(name)
+                self._record(violations, f"integer:{name}",
+                             ~np.isnan(values) & (values != np.round(values)), "quarantine")
+        for name, allowed in self.categories.items():
+            if name in columns:
+                values = data[name]
+                if isinstance(values.dtype, pd.CategoricalDtype):
+                    # check the dictionary once, then look the codes up
+                    codes = values.cat.codes.to_numpy()
+                    bad = np.append(~values.cat.categories.isin(allowed), False)
+                    mask = bad[codes]               # code -1 (missing) -> trailing False
+                else:
+                    mask = values.notna().to_numpy() & ~values.isin(allowed).to_numpy()
+                self._record(violations, f"category:{name}", mask, "quarantine")
+        for name, (needs, rule, action) in self.cross_rules.items():
+            if all(c in columns for c in needs):
+                with np.errstate(invalid="ignore"):
+                    self._record(violations, f"rule:{name}", rule(col), self._action(action))
+        if self.check_ids and ID_COLUMN in columns:
+            ids = data[ID_COLUMN]
+            present = ids.notna().to_numpy()
+            repeat = np.zeros(n, dtype=bool)
+            repeat[present] = self.seen.add(id_keys(ids[present]))
+            self._record(violations, f"duplicate:{ID_COLUMN}", repeat, "quarantine")
+
+        result = ChunkResult(n, violations, self.actions)
+        self.rows += n
+        self.quarantined += int(result.quarantine.sum())
+        return result
+
+    def summary(self):
+        """Per-rule counts plus totals (JSON-able)."""
+        rules = [{"rule": rule, "action": self.actions[rule], "rows": count,
+                  "share": count / self.rows if self.rows else 0.0}
+                 for rule, count in self.counts.items() if count]
+        return {"rows": self.rows, "clean": self.rows - self.quarantined,
+                "quarantined": self.quarantined, "schema": self.schema_issues,
+                "rules": sorted(rules, key=lambda r: -r["rows"])}
+
+
+def format_summary(summary):
+    lines = [f"{summary['rows']} rows: {summary['clean']} clean, "
+             f"{summary['quarantined']} quarantined"]
+    lines += [f"  schema: {issue}" for issue in summary["schema"]]
+    for r in summary["rules"]:
+        lines.append(f"  {r['rule']:<36} {r['action']:<10} {r['rows']:>10}  {r['share']:7.2%}")
+    if not summary["rules"]:
+        lines.append("  no rule violations")
+    return "\n".join(lines)
+
+
+def filter_rows(data, keep):
+    """Rows of a DataFrame or CompactDataset where `keep` is True."""
+    return data[keep] if isinstance(data, pd.DataFrame) else data.filter(keep)
+
+
+# ── CSV driver ────────────────────────────────────────────────────────────
+def read_chunks(path, chunksize=DEFAULT_CHUNKSIZE, columns=None):
+    """
+    CSV chunks with the string / categorical columns typed as in
+    loader.SCHEMA; numerics are inferred so a stray value cannot abort the
+    parse (it surfaces as a schema:<column> violation instead).
+    """
+    dtype = {c: t for c, t in SCHEMA.items() if c not in NUMERIC_COLUMNS}
+    return pd.read_csv(path, usecols=columns, dtype=dtype, chunksize=chunksize)
+
+
+def _typed(frame):
+    """Clean rows cast to the loader.SCHEMA dtypes (quarantine removed the misfits)."""
+    frame = frame.copy()
+    for name in frame.columns:
+        if name in NUMERIC_COLUMNS:
+            frame[name] = pd.to_numeric(frame[name]).astype(SCHEMA[name])
+        elif isinstance(frame[name].dtype, pd.CategoricalDtype):
+            frame[name] = frame[name].cat.remove_unused_categories()
+    return frame
+
+
+def load_validated(path, columns=None, strict=False, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    (CompactDataset of the passing rows, Validator) for a CSV or snapshot.
+    Unlike dataset.load_compact the CSV is parsed leniently, so a file with
+    stray values still loads; quarantined rows are dropped chunk by chunk.
+    """
+    from dataset import CompactDataset, is_snapshot, open_snapshot
+
+    validator = Validator(strict=strict, expected=columns or tuple(SCHEMA))
+    if is_snapshot(path):
+        data = open_snapshot(path, columns)
+        return filter_rows(data, validator.check(data).keep), validator
+    parts = [CompactDataset.from_frame(_typed(chunk[validator.check(chunk).keep]))
+             for chunk in read_chunks(path, chunksize, columns)]
+    if not parts:
+        raise ValueError(f"{path}: no rows")
+    return CompactDataset.concat(parts), validator
+
+
+def _append_csv(frame, path, started):
+    frame.to_csv(path, mode="a" if started else "w", header=not started, index=False)
+
+
+def validate_csv(path, quarantine=None, clean=None, strict=False, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Validate `path` chunk by chunk. Quarantined rows (with a _violations
+    column) go to `quarantine`, passing rows to `clean`; returns the summary.
+    """
+    validator = Validator(strict=strict)
+    start = time.perf_counter()
+    wrote_bad = wrote_clean = False
+    for chunk in read_chunks(path, chunksize):
+        result = validator.check(chunk)
+        if quarantine and result.quarantine.any():
+            bad = chunk[result.quarantine].assign(_violations=result.labels(result.quarantine))
+            _append_csv(bad, quarantine, wrote_bad)
+            wrote_bad = True
+        if clean:
+            _append_csv(chunk[result.keep], clean, wrote_clean)
+            wrote_clean = True
+    if quarantine and not wrote_bad:            # leave an empty, headed file
+        pd.DataFrame(columns=list(SCHEMA) + ["_violations"]).to_csv(quarantine, index=False)
+    summary = validator.summary()
+    summary["seconds"] = round(time.perf_counter() - start, 3)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate a smartphone dataset CSV.")
+    parser.add_argument("path", help="input CSV")
+    parser.add_argument("--quarantine", default=None,
+                        help="write quarantined rows here (default: <name>.quarantine.csv)")
+    parser.add_argument("--clean", default=None, help="also write the passing rows here")
+    parser.add_argument("--summary", default=None, metavar="JSON", help="write the summary here")
+    parser.add_argument("--strict", action="store_true",
+                        help="quarantine on every rule, flag-only rules included")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    args = parser.parse_args(argv)
+
+    quarantine = args.quarantine or os.path.splitext(args.path)[0] + ".quarantine.csv"
+    summary = validate_csv(args.path, quarantine=quarantine, clean=args.clean,
+                           strict=args.strict, chunksize=args.chunksize)
+    print(format_summary(summary))
+    print(f"\nQuarantine → {quarantine}  ({summary['seconds']}s)")
+    if args.summary:
+        with open(args.summary, "w") as f:
+            json.dump(summary, f, indent=1)
+    return 1 if summary["schema"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())